@@ -1,8 +1,14 @@
-from fastapi import APIRouter
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy import select, func
 from backend.db import get_session
-from database.models import Run
+from database.analytics import Analytics, AnalyticsUnavailable, open_analytics
+from database.models import RunRollup
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 router = APIRouter()
 
@@ -18,14 +24,19 @@ class SummaryStats(BaseModel):
 
 @router.get("/summary", response_model=SummaryStats)
 def get_summary_stats() -> SummaryStats:
+    # Read from the (job, symbol, run_month) rollups: one row per group, not per run
     with get_session() as session:
         # Get total profit per symbol
-        symbol_profit_stmt = select(Run.symbol, func.sum(Run.profit)).group_by(Run.symbol)
+        symbol_profit_stmt = select(
+            RunRollup.symbol, func.sum(RunRollup.profit_sum)
+        ).group_by(RunRollup.symbol)
         symbol_results = session.execute(symbol_profit_stmt).all()
         symbol_profit = dict(symbol_results)
 
         # Get total profit per run month
-        month_profit_stmt = select(Run.run_month, func.sum(Run.profit)).group_by(Run.run_month)
+        month_profit_stmt = select(
+            RunRollup.run_month, func.sum(RunRollup.profit_sum)
+        ).group_by(RunRollup.run_month)
         month_results = session.execute(month_profit_stmt).all()
         month_profit = dict(month_results)
 
@@ -36,8 +47,10 @@ def get_summary_stats() -> SummaryStats:
         best_month = max(month_profit, key=month_profit.get)
         worst_month = min(month_profit, key=month_profit.get)
 
-        avg_profit_stmt = select(func.avg(Run.profit))
-        average_profit = session.scalar(avg_profit_stmt)
+        profit_sum, profit_n = session.execute(
+            select(func.sum(RunRollup.profit_sum), func.sum(RunRollup.profit_n))
+        ).one()
+        average_profit = profit_sum / profit_n if profit_n else 0.0
 
         return SummaryStats(
             top_symbol=top_symbol,
@@ -45,3 +58,67 @@ def get_summary_stats() -> SummaryStats:
             worst_month=worst_month,
             average_profit=average_profit
         )
+
+
+def _analyze(query: Callable[[Analytics], Any]) -> Any:
+    """Run `query` on a DuckDB connection of its own (one per request)."""
+    try:
+        with open_analytics() as analytics:
+            return query(analytics)
+    except AnalyticsUnavailable as err:
+        raise HTTPException(status_code=503, detail=str(err))
+    except ValueError as err:  # unknown column / aggregate
+        raise HTTPException(status_code=400, detail=str(err))
+
+
+def _records(df: "pd.DataFrame") -> list[dict[str, Any]]:
+    # NaN -> None so the response is valid JSON
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+@router.get("/top")
+def get_top_runs(
+    metric: str = "custom_score",
+    n: int = Query(10, ge=1, le=1000),
+    per: list[str] = Query(["symbol"]),
+    job_id: Optional[str] = None,
+    symbol: Optional[list[str]] = Query(None),
+    month: Optional[list[str]] = Query(None),
+) -> list[dict[str, Any]]:
+    """The `n` best passes by `metric` per group, params included as columns."""
+    return _analyze(
+        lambda a: _records(
+            a.top_n(metric, n, per, job_id=job_id, symbols=symbol, months=month)
+        )
+    )
+
+
+@router.get("/params")
+def get_param_stats(
+    param: list[str] = Query(...),
+    metric: str = "profit",
+    job_id: Optional[str] = None,
+    symbol: Optional[list[str]] = Query(None),
+    month: Optional[list[str]] = Query(None),
+) -> list[dict[str, Any]]:
+    """Runs and mean/min/max/std of `metric` per value of the given params."""
+    return _analyze(
+        lambda a: _records(
+            a.param_stats(param, metric, job_id=job_id, symbols=symbol, months=month)
+        )
+    )
+
+
+@router.get("/months")
+def get_month_pivot(
+    metric: str = "profit",
+    agg: str = "sum",
+    index: str = "symbol",
+    job_id: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    """One row per `index` value with the `agg` of `metric` in each run month."""
+    return _analyze(
+        lambda a: _records(
+            a.month_pivot(metric, agg, index, job_id=job_id).reset_index()  # type: ignore[arg-type]
+        )
+    )
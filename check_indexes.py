@@ -1,16 +1,60 @@
-import sqlite3
+# File: check_indexes.py
+# Purpose: Verify that the indexes declared on `runs` (database/models.py) exist in the database
+# Notes: python check_indexes.py [DATABASE_URL]   (default: settings.DATABASE_URL)
+#        Exits with status 1 if any is missing — run `alembic upgrade head` to add them.
 
-conn = sqlite3.connect(".optibatch/optibatch.db")
-cursor = conn.cursor()
+import sys
 
-print("Indexes on 'runs':")
-cursor.execute("PRAGMA index_list('runs')")
-for row in cursor.fetchall():
-    print(row)
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Engine
 
-print("\nIndex info for 'uq_result_hash':")
-cursor.execute("PRAGMA index_info('uq_result_hash')")
-for row in cursor.fetchall():
-    print(row)
+from database.models import Run
 
-conn.close()
+
+def expected_indexes() -> dict[str, list[str]]:
+    """Index name -> column names, as declared on the Run model."""
+    return {
+        index.name: [getattr(expr, "name", str(expr).split()[0]) for expr in index.expressions]
+        for index in Run.__table__.indexes
+    }
+
+
+def missing_indexes(engine: Engine) -> list[str]:
+    """Declared `runs` indexes (and the result_hash unique key) the database lacks."""
+    inspector = inspect(engine)
+    present = {ix["name"]: ix["column_names"] for ix in inspector.get_indexes("runs")}
+
+    missing = [
+        name
+        for name, columns in expected_indexes().items()
+        if present.get(name) != columns
+    ]
+
+    unique = [uc["column_names"] for uc in inspector.get_unique_constraints("runs")]
+    unique += [ix["column_names"] for ix in inspector.get_indexes("runs") if ix["unique"]]
+    if ["result_hash"] not in unique:
+        missing.append("unique(result_hash)")
+    return missing
+
+
+def main(url: str | None = None) -> int:
+    if url is None:
+        from settings import DATABASE_URL
+
+        url = DATABASE_URL
+    engine = create_engine(url)
+
+    print("Indexes on 'runs':")
+    for ix in inspect(engine).get_indexes("runs"):
+        print(f"  {ix['name']}: {', '.join(ix['column_names'])}")
+
+    missing = missing_indexes(engine)
+    if missing:
+        print(f"\n❌ Missing: {', '.join(missing)} (run `alembic upgrade head`)")
+        return 1
+    print("\n✅ All expected indexes are present")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -2,26 +2,65 @@
 
 from __future__ import annotations
 from pathlib import Path
-from datetime import datetime
 from core.automation import optimize_with_mt5
 from report_util.reporter import export_and_confirm_xml
 from loguru import logger
 from core.job_context import JobContext
-from database.ingest.ingest_job import ingest_single_xml, extract_job_metadata
-from database.session import get_engine, get_session
-from database.models import Job
-from sqlalchemy.exc import SQLAlchemyError
+from core.state import registry
+from typing import TYPE_CHECKING
 from xml.etree.ElementTree import ParseError
 
+# The database layer (SQLAlchemy, NumPy, ...) is imported where it is used, so
+# importing the runner (and the GUI that imports it) stays cheap
+if TYPE_CHECKING:
+    from database.ingest.frames import FrameFollower
+
 
 def xml_exists(context: JobContext) -> bool:
     return context.final_xml_path.is_file()
 
 
+def start_frame_follower(context: JobContext) -> FrameFollower | None:
+    """Tail the EA's frame file for this run so passes land in the DB live."""
+    from core.run_utils import get_mt5_data_path
+    from database.ingest.frames import FrameFollower, frame_file_candidates
+
+    logs_dir = get_mt5_data_path(context.mt5_path)
+    if logs_dir is None:
+        logger.warning("⚠️ MT5 data folder not found; cannot follow frame files")
+        return None
+
+    files_dir = logs_dir.parent.parent / "MQL5" / "Files"
+    return FrameFollower(
+        frame_file_candidates(files_dir, context.basename),
+        context.run_folder / "job_config.json",
+        context.job_id,
+    ).start()
+
+
 def run_symbol_optimization(context: JobContext, timeout: int = 300) -> bool:
+    from database.ingest.ingest_job import (
+        ensure_job,
+        ingest_single_xml,
+        xml_has_traded_pass,
+    )
+    from database.ingest.plan import get_ingest_plan
+    from database.session import get_engine, get_session
+    from sqlalchemy.exc import SQLAlchemyError
+
     logger.info(f"🧪 Running optimization for {context.basename}")
 
-    if not optimize_with_mt5(context, timeout=timeout):
+    follower = start_frame_follower(context) if registry.get("ingest_frames") else None
+    optimized = optimize_with_mt5(context, timeout=timeout)
+    if follower is not None:
+        stats = follower.finish()
+        if follower.error is None and stats.parsed:
+            if not optimized:
+                logger.warning(f"⚠️ MT5 did not finish {context.basename}; keeping partial frames")
+            logger.success(f"📡 Ingested {stats.inserted} runs live from EA frames")
+            return stats.parsed > stats.skipped_zero_trades
+
+    if not optimized:
         logger.warning(f"⚠️ MT5 optimization failed or timed out for {context.basename}")
         return False
 
@@ -29,24 +68,34 @@ def run_symbol_optimization(context: JobContext, timeout: int = 300) -> bool:
         logger.warning(f"⚠️ Failed to export XML for {context.basename}")
         return False
 
+    if registry.get("deferred_ingest"):
+        # The ingest watcher (database.ingest.watcher) picks the XML up from
+        # generated/; only check it has usable passes so symbol skipping still works
+        if not xml_has_traded_pass(context.final_xml_path):
+            logger.warning(
+                f"⚠️ No passes found in {context.final_xml_path.name}, skipping ingest."
+            )
+            return False
+        logger.info(f"📨 Left {context.final_xml_path.name} for the ingest watcher")
+        return True
+
     # ✅ Ingest the XML result into the database
     job_folder = context.run_folder
     config_path = job_folder / "job_config.json"
     xml_path = context.final_xml_path
     job_id = context.job_id
+    plan = get_ingest_plan(config_path)
 
     engine = get_engine()
-    with get_session(engine) as session, session.begin():
+    with get_session(engine) as session:
         # Ensure job record exists
-        if not session.get(Job, job_id):
-            job_meta = extract_job_metadata(config_path)
-            job = Job(
-                id=job_id, job_name=job_id, created_at=datetime.utcnow(), **job_meta
-            )
-            session.add(job)
+        ensure_job(session, job_id, plan)
 
         try:
-            added = ingest_single_xml(xml_path, config_path, session, job_id)
+            # Chunked commits with a checkpoint: a retry resumes where this one stopped
+            added = ingest_single_xml(
+                xml_path, config_path, session, job_id, plan=plan, resumable=True
+            )
             if added == 0:
                 logger.warning(
                     f"⚠️ No passes found in {xml_path.name}, skipping ingest."
@@ -0,0 +1,303 @@
+# File: database/analytics.py
+# Purpose: Analytical queries (top-N, per-param aggregates, month pivots) on DuckDB
+# Notes: An in-process DuckDB connection reads the OptiBatch SQLite file (attached
+#        read-only through DuckDB's sqlite extension) or the Parquet pass store. Either
+#        way the queries run against one `passes` view shaped like the Parquet layout:
+#        job_id, symbol, run_month, the per-pass metrics and one typed column per input.
+#            with open_analytics() as analytics:
+#                analytics.top_n("custom_score", n=5, per=["symbol"])
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, Sequence, get_args
+
+from loguru import logger
+
+from database.parquet_store import BASE_SCHEMA, FORWARD_SCHEMA, PARTITION_COLUMNS
+
+if TYPE_CHECKING:
+    import duckdb
+    import pandas as pd
+
+Aggregate = Literal["sum", "avg", "min", "max", "count", "median"]
+
+# Columns of the `passes` view besides the params, in the Parquet store's order
+PASS_COLUMNS = (
+    *PARTITION_COLUMNS,
+    *BASE_SCHEMA.names,
+    *FORWARD_SCHEMA.names,
+)
+
+_SQLITE_CATALOG = "optibatch"
+
+# JSON value types of one param across param_sets -> its column type
+_INTEGER_TYPES = {"BIGINT", "UBIGINT"}
+_NUMBER_TYPES = _INTEGER_TYPES | {"DOUBLE"}
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """DuckDB is not installed, or there is nothing it can read."""
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _connect() -> duckdb.DuckDBPyConnection:
+    try:
+        import duckdb
+    except ImportError as err:
+        raise AnalyticsUnavailable("duckdb not installed. Run: pip install duckdb") from err
+    return duckdb.connect()
+
+
+def _param_type(json_types: set[str]) -> str:
+    json_types = json_types - {"NULL"}
+    if json_types and json_types <= _INTEGER_TYPES:
+        return "BIGINT"
+    if json_types and json_types <= _NUMBER_TYPES:
+        return "DOUBLE"
+    if json_types == {"BOOLEAN"}:
+        return "BOOLEAN"
+    return "VARCHAR"
+
+
+def _create_database_views(con: duckdb.DuckDBPyConnection, catalog: str) -> None:
+    """
+    Build `passes` over the runs and param_sets tables of an attached database.
+
+    The params are expanded once per parameter set (into the temp table
+    `params`) rather than once per run; each key gets the narrowest type that
+    fits all of its values, and values that do not fit it read as null.
+    """
+    runs = f"{_quote(catalog)}.runs"
+    param_sets = f"{_quote(catalog)}.param_sets"
+
+    key_types = con.execute(
+        f"""
+        SELECT key, list_distinct(list(json_type(params, '$."' || key || '"')))
+        FROM (SELECT params, unnest(json_keys(params)) AS key FROM {param_sets})
+        GROUP BY key
+        ORDER BY key
+        """
+    ).fetchall()
+
+    param_columns = []
+    for key, json_types in key_types:
+        if key in PASS_COLUMNS:
+            logger.warning(f"⚠️ Param {key!r} shadows a run column; left out of `passes`")
+            continue
+        path = _literal(f'$."{key}"')
+        column_type = _param_type(set(json_types))
+        param_columns.append(
+            f"TRY_CAST(json_extract_string(params, {path}) AS {column_type})"
+            f" AS {_quote(key)}"
+        )
+
+    con.execute(
+        "CREATE OR REPLACE TEMP TABLE params AS "
+        f"SELECT {', '.join(['id AS param_set_id', *param_columns])} FROM {param_sets}"
+    )
+    run_columns = ", ".join(f"r.{_quote(c)}" for c in PASS_COLUMNS)
+    con.execute(
+        "CREATE OR REPLACE TEMP VIEW passes AS "
+        f"SELECT {run_columns}, p.* EXCLUDE (param_set_id) "
+        f"FROM {runs} AS r LEFT JOIN params AS p ON p.param_set_id = r.param_set_id"
+    )
+
+
+class Analytics:
+    """
+    Query helpers over the `passes` view of one DuckDB connection.
+
+    Every helper takes the job/symbol/month shortcuts of
+    parquet_store.read_passes() and returns a pandas DataFrame. Column names
+    are checked against the view before they are put into SQL.
+    """
+
+    def __init__(self, con: duckdb.DuckDBPyConnection, source: str) -> None:
+        self.con = con
+        self.source = source
+        self.columns: list[str] = [
+            row[0] for row in con.execute("DESCRIBE passes").fetchall()
+        ]
+
+    @classmethod
+    def from_sqlite(cls, path: str | Path) -> Analytics:
+        """Attach an OptiBatch SQLite file read-only (loads DuckDB's sqlite extension)."""
+        path = Path(path)
+        if not path.is_file():
+            raise AnalyticsUnavailable(f"No SQLite database at {path}")
+        con = _connect()
+        try:
+            con.execute(
+                f"ATTACH {_literal(str(path))} AS {_SQLITE_CATALOG} "
+                "(TYPE sqlite, READ_ONLY)"
+            )
+            _create_database_views(con, _SQLITE_CATALOG)
+        except Exception:
+            con.close()
+            raise
+        return cls(con, f"sqlite:{path}")
+
+    @classmethod
+    def from_parquet(cls, root: str | Path) -> Analytics:
+        """Read the hive-partitioned Parquet pass store (see parquet_store)."""
+        root = Path(root)
+        if not root.is_dir() or next(root.rglob("*.parquet"), None) is None:
+            raise AnalyticsUnavailable(f"No Parquet passes under {root}")
+        con = _connect()
+        # Jobs have different inputs: union the file schemas by column name
+        hive_types = ", ".join(f"{_literal(c)}: 'VARCHAR'" for c in PARTITION_COLUMNS)
+        pattern = _literal((root / "**" / "*.parquet").as_posix())
+        con.execute(
+            "CREATE OR REPLACE TEMP VIEW passes AS SELECT * FROM read_parquet("
+            f"{pattern}, hive_partitioning = true, hive_types = {{{hive_types}}}, "
+            "union_by_name = true)"
+        )
+        return cls(con, f"parquet:{root}")
+
+    def close(self) -> None:
+        self.con.close()
+
+    def __enter__(self) -> Analytics:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def param_columns(self) -> list[str]:
+        return [c for c in self.columns if c not in PASS_COLUMNS]
+
+    def _column(self, name: str) -> str:
+        if name not in self.columns:
+            raise ValueError(f"Unknown passes column {name!r}")
+        return _quote(name)
+
+    def _where(
+        self,
+        job_id: str | None,
+        symbols: Sequence[str] | None,
+        months: Sequence[str] | None,
+    ) -> tuple[str, list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if job_id is not None:
+            clauses.append("job_id = ?")
+            params.append(job_id)
+        for column, values in (("symbol", symbols), ("run_month", months)):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def query(self, sql: str, params: Sequence[Any] | None = None) -> pd.DataFrame:
+        """Run any SQL (typically over `passes`) and return the result."""
+        return self.con.execute(sql, params or []).df()
+
+    def top_n(
+        self,
+        metric: str = "custom_score",
+        n: int = 10,
+        per: Sequence[str] = ("symbol",),
+        ascending: bool = False,
+        columns: Sequence[str] | None = None,
+        job_id: str | None = None,
+        symbols: Sequence[str] | None = None,
+        months: Sequence[str] | None = None,
+    ) -> pd.DataFrame:
+        """The `n` best passes by `metric` within each `per` group (nulls rank last)."""
+        order = f"{self._column(metric)} {'ASC' if ascending else 'DESC'} NULLS LAST"
+        group = [self._column(c) for c in per]
+        partition = f"PARTITION BY {', '.join(group)} " if group else ""
+        selected = (
+            ", ".join(self._column(c) for c in dict.fromkeys([*per, *columns, metric]))
+            if columns is not None
+            else "*"
+        )
+        where, params = self._where(job_id, symbols, months)
+        return self.query(
+            f"SELECT {selected} FROM passes {where} "
+            f"QUALIFY row_number() OVER ({partition}ORDER BY {order}) <= ? "
+            f"ORDER BY {', '.join([*group, order])}",
+            [*params, n],
+        )
+
+    def param_stats(
+        self,
+        params: str | Sequence[str],
+        metric: str = "profit",
+        job_id: str | None = None,
+        symbols: Sequence[str] | None = None,
+        months: Sequence[str] | None = None,
+    ) -> pd.DataFrame:
+        """Runs and mean/min/max/std of `metric` per value (combination) of `params`."""
+        if isinstance(params, str):
+            params = [params]
+        group = ", ".join(self._column(p) for p in params)
+        value = self._column(metric)
+        where, values = self._where(job_id, symbols, months)
+        return self.query(
+            f"SELECT {group}, count(*) AS runs, "
+            f"avg({value}) AS {_quote(metric + '_mean')}, "
+            f"min({value}) AS {_quote(metric + '_min')}, "
+            f"max({value}) AS {_quote(metric + '_max')}, "
+            f"stddev_samp({value}) AS {_quote(metric + '_std')} "
+            f"FROM passes {where} GROUP BY {group} ORDER BY {group}",
+            values,
+        )
+
+    def month_pivot(
+        self,
+        metric: str = "profit",
+        agg: Aggregate = "sum",
+        index: str = "symbol",
+        job_id: str | None = None,
+        symbols: Sequence[str] | None = None,
+        months: Sequence[str] | None = None,
+    ) -> pd.DataFrame:
+        """`agg` of `metric` with one row per `index` value and one column per run month."""
+        if agg not in get_args(Aggregate):
+            raise ValueError(f"Unknown aggregate {agg!r} (use one of {get_args(Aggregate)})")
+        key = self._column(index)
+        where, params = self._where(job_id, symbols, months)
+        # Aggregated in DuckDB; only the (index, month) cells reach pandas
+        cells = self.query(
+            f"SELECT {key} AS row_key, run_month, {agg}({self._column(metric)}) AS value "
+            f"FROM passes {where} GROUP BY ALL",
+            params,
+        )
+        pivot = cells.pivot(index="row_key", columns="run_month", values="value")
+        pivot = pivot.sort_index().sort_index(axis=1)
+        pivot.index.name = index
+        pivot.columns.name = "run_month"
+        return pivot
+
+
+def open_analytics(
+    database_url: str | None = None, parquet_root: str | Path | None = None
+) -> Analytics:
+    """
+    Analytics over the app database when it is a SQLite file, otherwise (or
+    when DuckDB cannot attach it) over the Parquet pass store.
+    """
+    import settings
+    from sqlalchemy.engine import make_url
+
+    url = make_url(database_url or settings.DATABASE_URL)
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        try:
+            return Analytics.from_sqlite(url.database)
+        except Exception as err:  # e.g. the sqlite extension cannot be installed offline
+            logger.warning(f"⚠️ DuckDB could not attach {url.database}: {err}")
+
+    root = parquet_root if parquet_root is not None else settings.PARQUET_ROOT
+    if root is None:
+        raise AnalyticsUnavailable("No SQLite database to attach and no Parquet store")
+    return Analytics.from_parquet(root)
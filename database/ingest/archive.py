@@ -0,0 +1,215 @@
+# File: database/ingest/archive.py
+# Purpose: Read archived job folders (.zip, .tar, .tar.gz/.bz2/.xz) without extracting them
+# Notes: Members are streamed straight into XmlPassStream. Tar members are addressed by
+#        their data offset and reports are listed in that order, so each process keeps
+#        one decompressor per archive for reports and one for their forward reports, and
+#        each reads its members front to back: a compressed tar is decompressed about
+#        twice in all instead of again from the start for every backward seek.
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import json
+import lzma
+import tarfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import IO, TYPE_CHECKING, Any
+
+from database.ingest.forward import FORWARD_SUFFIX, forward_report_name
+
+if TYPE_CHECKING:
+    from database.ingest.plan import IngestPlan
+
+_TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ARCHIVE_SUFFIXES = (".zip",) + _TAR_SUFFIXES
+
+CONFIG_NAME = "job_config.json"
+
+# Open zip files / tar decompressors of this process, by (archive path, stream)
+_handles: dict[tuple[Path, str], Any] = {}
+
+
+def is_job_archive(path: Path) -> bool:
+    return path.name.lower().endswith(ARCHIVE_SUFFIXES) and path.is_file()
+
+
+def _strip_archive_suffix(name: str) -> str:
+    lower = name.lower()
+    for suffix in sorted(ARCHIVE_SUFFIXES, key=len, reverse=True):
+        if lower.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+@dataclass(frozen=True)
+class ArchiveMember:
+    """
+    One file inside a job archive, usable wherever ingest takes a report Path
+    (it has .name, .stem and .open()). Cheap to pickle for parser workers.
+    """
+
+    archive: Path
+    member: str  # path inside the archive, POSIX separators
+    size: int
+    offset: int | None = None  # tar only: where the member's data starts
+    forward: "ArchiveMember | None" = None  # its .fwd.xml, for back-test reports
+
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member).name
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.member).stem
+
+    def __str__(self) -> str:
+        return f"{self.archive.name}!{self.member}"
+
+    def open(self, mode: str = "rb") -> IO[bytes]:
+        if mode != "rb":
+            raise ValueError("Archive members are read-only binary streams")
+        # A forward report is read just before its back-test report, wherever the
+        # tar holds it: it gets its own stream so neither one has to seek back
+        stream = "forward" if self.name.lower().endswith(FORWARD_SUFFIX) else "reports"
+        handle = _open_archive(self.archive, stream)
+        if self.offset is None:
+            return handle.open(self.member)
+        return _MemberReader(handle, self.offset, self.size, self.name)
+
+    def read_bytes(self) -> bytes:
+        """The whole member, through a handle of its own (the shared streams stay put)."""
+        with _open_file(self.archive) as handle:
+            if self.offset is None:
+                return handle.read(self.member)
+            return _MemberReader(handle, self.offset, self.size, self.name).read()
+
+
+class _MemberReader:
+    """Read-only window of `size` bytes into a shared (decompressed) tar stream."""
+
+    def __init__(self, stream: IO[bytes], offset: int, size: int, name: str) -> None:
+        stream.seek(offset)
+        self._stream = stream
+        self._left = size
+        self.name = name
+
+    def read(self, size: int | None = -1) -> bytes:
+        if size is None or size < 0 or size > self._left:
+            size = self._left
+        data = self._stream.read(size)
+        self._left -= len(data)
+        return data
+
+    def close(self) -> None:
+        pass  # the stream stays open for the archive's next member
+
+    def __enter__(self) -> "_MemberReader":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _open_file(path: Path) -> Any:
+    """A zip file, or the decompressed byte stream of a tar."""
+    name = path.name.lower()
+    if name.endswith(".zip"):
+        return zipfile.ZipFile(path)
+    if name.endswith((".gz", ".tgz")):
+        return gzip.open(path, "rb")
+    if name.endswith((".bz2", ".tbz2")):
+        return bz2.open(path, "rb")
+    if name.endswith((".xz", ".txz")):
+        return lzma.open(path, "rb")
+    return path.open("rb")
+
+
+def _open_archive(path: Path, stream: str) -> Any:
+    handle = _handles.get((path, stream))
+    if handle is None:
+        handle = _handles[(path, stream)] = _open_file(path)
+    return handle
+
+
+def close_archives() -> None:
+    """Close every archive this process opened for reading members."""
+    while _handles:
+        _, handle = _handles.popitem()
+        handle.close()
+
+
+def list_members(path: Path) -> list[ArchiveMember]:
+    """Every regular file in the archive (a tar is decompressed once to list it)."""
+    if path.name.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            return [
+                ArchiveMember(path, info.filename, info.file_size)
+                for info in zf.infolist()
+                if not info.is_dir()
+            ]
+    with tarfile.open(path, "r:*") as tf:
+        return [
+            ArchiveMember(path, info.name, info.size, info.offset_data)
+            for info in tf
+            if info.isfile()
+        ]
+
+
+class JobArchive:
+    """
+    An archived generated/<job> folder.
+
+    The shallowest job_config.json marks the job folder inside the archive
+    (the archive may hold the folder itself or just its contents). XML
+    reports below it are listed in archive order (by data offset; zips,
+    which read members directly, by path), with each back-test report
+    paired to its forward report member.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        members = list_members(path)
+
+        configs = [m for m in members if m.name == CONFIG_NAME]
+        if not configs:
+            raise FileNotFoundError(f"No {CONFIG_NAME} in {path.name}")
+        self.config = min(configs, key=lambda m: len(PurePosixPath(m.member).parts))
+
+        root = PurePosixPath(self.config.member).parent
+        self.job_id = root.name or _strip_archive_suffix(path.name)
+
+        xmls = {
+            PurePosixPath(m.member).as_posix(): m
+            for m in members
+            if m.name.lower().endswith(".xml")
+            and (not root.parts or PurePosixPath(m.member).is_relative_to(root))
+        }
+        self.reports = sorted(
+            (
+                _with_forward(member, xmls)
+                for name, member in xmls.items()
+                if not name.lower().endswith(FORWARD_SUFFIX)
+            ),
+            key=lambda m: (m.offset or 0, m.member),
+        )
+
+    def read_config(self) -> dict:
+        return json.loads(self.config.read_bytes().decode("utf-8-sig"))
+
+    def ingest_plan(self) -> IngestPlan:
+        from database.ingest.plan import build_ingest_plan_from_config
+
+        return build_ingest_plan_from_config(
+            self.read_config(), self.path / self.config.member
+        )
+
+
+def _with_forward(member: ArchiveMember, xmls: dict[str, ArchiveMember]) -> ArchiveMember:
+    folder = PurePosixPath(member.member).parent
+    forward = xmls.get((folder / forward_report_name(member.name)).as_posix())
+    if forward is None:
+        return member
+    return ArchiveMember(member.archive, member.member, member.size, member.offset, forward)
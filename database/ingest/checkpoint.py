@@ -0,0 +1,83 @@
+# File: database/ingest/checkpoint.py
+# Purpose: Resume points for chunked ingest, so a retry skips what is already committed
+# Notes: One `ingest_checkpoints` row per (job, file) while the file is partially ingested.
+#        It moves forward inside every committed batch and is removed when the file is done.
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.ingest.manifest import file_digest
+from database.models import IngestCheckpoint
+
+
+class IngestCheckpointer:
+    """
+    The checkpoint of one file for one job.
+
+    `resume_after` is the last pass an earlier attempt committed for the
+    same file content, or None to start from the top. The content digest
+    is only computed when a stored checkpoint has to be checked or the
+    first one is written, so files that fit in one batch never pay for it.
+    """
+
+    def __init__(self, session: Session, job_id: str, path: Path) -> None:
+        self.session = session
+        self.job_id = job_id
+        self.path = path
+        self.key = path.resolve().as_posix()
+        self.resume_after: int | None = None
+        self._digest: str | None = None
+
+        self._entry = session.scalar(
+            select(IngestCheckpoint).where(
+                IngestCheckpoint.job_id == job_id, IngestCheckpoint.path == self.key
+            )
+        )
+        if self._entry is None:
+            return
+        if self._entry.digest == self.digest:
+            self.resume_after = self._entry.last_pass
+        else:
+            logger.info(f"♻️ {path.name} changed since its checkpoint; starting over")
+            session.delete(self._entry)
+            self._entry = None
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = file_digest(self.path)
+        return self._digest
+
+    def advance(self, rows: list[dict[str, Any]]) -> None:
+        """Record `rows` (runs and quarantined passes) as committed; use as RunWriter.on_batch."""
+        if not rows:
+            return
+
+        last_pass = max(row["pass_number"] for row in rows)
+        runs = sum(1 for row in rows if "result_hash" in row)
+        if self._entry is None:
+            self._entry = IngestCheckpoint(
+                job_id=self.job_id,
+                path=self.key,
+                digest=self.digest,
+                last_pass=last_pass,
+                runs_committed=runs,
+            )
+            self.session.add(self._entry)
+            return
+
+        self._entry.last_pass = max(self._entry.last_pass, last_pass)
+        self._entry.runs_committed += runs
+
+    def complete(self) -> None:
+        """The whole file is in; drop the checkpoint (committed by the caller)."""
+        if self._entry is not None:
+            self.session.flush()  # the entry may still be pending
+            self.session.delete(self._entry)
+            self._entry = None
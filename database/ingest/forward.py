@@ -0,0 +1,217 @@
+# File: database/ingest/forward.py
+# Purpose: Join MT5 forward-test reports (<name>.fwd.xml) to their back-test passes
+# Notes: Both exports are ordered by the tester's sort column, not by a shared key, so
+#        the forward file is streamed once into a compact index keyed by parameter set
+#        and the back-test file probes it while streaming to the writer. Each file is
+#        read once and no per-pass query is issued.
+
+from __future__ import annotations
+
+from datetime import date
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Mapping
+
+from loguru import logger
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session
+
+from database.ingest.columns import float_column
+from database.ingest.hashing import canonical_inputs
+from database.ingest.ingest_job import (
+    COERCE_BLOCK_SIZE,
+    PassSource,
+    XmlPassStream,
+    iter_run_rows,
+    parse_report_title,
+)
+from database.ingest.writer import IngestStats
+from database.models import Run
+
+if TYPE_CHECKING:
+    from database.ingest.archive import ArchiveMember
+    from database.ingest.plan import IngestPlan
+
+FORWARD_SUFFIX = ".fwd.xml"
+_BACK_SUFFIXES = (".opt.xml", ".xml")
+
+# Back-test metrics that get a forward_* twin on `runs`, in index tuple order
+FORWARD_METRICS = (
+    "result",
+    "profit",
+    "drawdown",
+    "custom_score",
+    "sharpe_ratio",
+    "trades",
+    "expected_payoff",
+    "recovery_factor",
+    "profit_factor",
+)
+_METRIC_COLUMNS = tuple(f"forward_{name}" for name in FORWARD_METRICS)
+FORWARD_COLUMNS = ("forward_start_date", "forward_end_date") + _METRIC_COLUMNS
+
+# The forward tab calls its result column this; "Result" is used if it is absent
+FORWARD_RESULT_HEADER = "Forward Result"
+
+_UPDATE_BATCH = 1000
+
+
+def is_forward_report(path: Path | ArchiveMember) -> bool:
+    return path.name.lower().endswith(FORWARD_SUFFIX)
+
+
+def forward_report_name(name: str) -> str:
+    """File name of the .fwd.xml that goes with back-test report X.xml or X.opt.xml."""
+    for suffix in _BACK_SUFFIXES:
+        if name.lower().endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    return name + FORWARD_SUFFIX
+
+
+def forward_report_path(xml_path: Path) -> Path:
+    """Where the .fwd.xml of a back-test report would be."""
+    return xml_path.with_name(forward_report_name(xml_path.name))
+
+
+def back_report_path(fwd_path: Path) -> Path | None:
+    """The back-test report a .fwd.xml belongs to, or None if it is not there."""
+    base = fwd_path.name[: -len(FORWARD_SUFFIX)]
+    for suffix in _BACK_SUFFIXES:
+        candidate = fwd_path.with_name(base + suffix)
+        if candidate.exists():
+            return candidate
+    return None
+
+
+class ForwardIndex:
+    """
+    The passes of one forward report, keyed by their canonical parameter set.
+
+    Only the forward metrics are kept (a tuple per pass), so the index stays
+    small next to the report itself. `matched` counts the back-test passes
+    that found their forward pass.
+    """
+
+    def __init__(self, name: str, start_date: date, end_date: date) -> None:
+        self.name = name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.matched = 0
+        self._passes: dict[str, tuple[Any, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._passes)
+
+    @classmethod
+    def from_source(cls, source: PassSource, plan: IngestPlan) -> "ForwardIndex":
+        _, start_date, end_date, _ = parse_report_title(source.read_title(), source.name)
+        index = cls(source.name, start_date, end_date)
+        passes = iter(source)
+
+        while block := list(islice(passes, COERCE_BLOCK_SIZE)):
+            layout = plan.layout_for(source.headers or ())
+            records = [record.cells for record in block]
+            coerced = layout.coerce_block(records)
+
+            if FORWARD_RESULT_HEADER in layout.positions:
+                result, mask = float_column(
+                    layout.raw_column(records, FORWARD_RESULT_HEADER)
+                )
+                coerced.metrics["result"] = result
+                coerced.errors.pop("result", None)
+                if mask.any():
+                    coerced.errors["result"] = mask
+
+            for metrics, inputs in coerced.rows():
+                index._passes[canonical_inputs(inputs)] = tuple(
+                    metrics[name] for name in FORWARD_METRICS
+                )
+        return index
+
+    @classmethod
+    def load(cls, fwd_path: Path | ArchiveMember, plan: IngestPlan) -> "ForwardIndex":
+        with XmlPassStream(fwd_path) as stream:
+            return cls.from_source(stream, plan)
+
+    def columns_for(self, inputs: Mapping[str, Any]) -> dict[str, Any]:
+        """forward_* columns for one back-test pass (all None without a match)."""
+        values = self._passes.get(canonical_inputs(inputs))
+        if values is None:
+            return dict.fromkeys(FORWARD_COLUMNS)
+
+        self.matched += 1
+        columns = dict(zip(_METRIC_COLUMNS, values))
+        columns["forward_start_date"] = self.start_date
+        columns["forward_end_date"] = self.end_date
+        return columns
+
+
+def load_forward_index(
+    xml_path: Path | ArchiveMember, plan: IngestPlan
+) -> ForwardIndex | None:
+    """Index the .fwd.xml next to a back-test report, or None if there is none."""
+    if is_forward_report(xml_path):
+        return None
+
+    fwd_path: Path | ArchiveMember | None
+    if isinstance(xml_path, Path):
+        fwd_path = forward_report_path(xml_path)
+        if not fwd_path.is_file():
+            return None
+    else:
+        fwd_path = xml_path.forward  # paired when the archive was listed
+        if fwd_path is None:
+            return None
+
+    index = ForwardIndex.load(fwd_path, plan)
+    logger.info(f"🔁 Joining {len(index)} forward passes from {fwd_path.name}")
+    return index
+
+
+def link_forward_report(
+    fwd_path: Path, plan: IngestPlan, session: Session, job_id: str
+) -> IngestStats:
+    """
+    Attach a forward report to back-test runs already in the database.
+
+    For a .fwd.xml that shows up after its back-test report was ingested: the
+    back-test report is streamed again to recompute its result hashes, and
+    the job's matching runs are updated in executemany batches. The caller
+    owns the transaction.
+    """
+    stats = IngestStats()
+    back_path = back_report_path(fwd_path)
+    if back_path is None:
+        logger.info(f"⏳ No back-test report for {fwd_path.name}; it joins on ingest")
+        return stats
+
+    index = ForwardIndex.load(fwd_path, plan)
+    stats.parsed = stats.forward_passes = len(index)
+
+    runs = Run.__table__
+    stmt = (
+        runs.update()
+        .where(runs.c.job_id == job_id)
+        .where(runs.c.result_hash == bindparam("b_result_hash"))
+        .values({name: bindparam(f"b_{name}") for name in FORWARD_COLUMNS})
+    )
+
+    with XmlPassStream(back_path) as stream:
+        rows = iter_run_rows(stream, plan, job_id, IngestStats(), forward=index)
+        updates = (
+            {
+                "b_result_hash": row["result_hash"],
+                **{f"b_{name}": row[name] for name in FORWARD_COLUMNS},
+            }
+            for row in rows
+            if row["forward_start_date"] is not None
+        )
+        while batch := list(islice(updates, _UPDATE_BATCH)):
+            session.execute(stmt, batch)
+
+    stats.forward_matched = index.matched
+    logger.info(
+        f"🔁 Linked {index.matched} of {len(index)} forward passes from {fwd_path.name}"
+    )
+    return stats
@@ -0,0 +1,327 @@
+# File: database/ingest/frames.py
+# Purpose: Ingest per-pass frame files our EAs write from OnTesterPass (MQL5/Files)
+# Notes: Files are read incrementally, so passes can be ingested while MT5 is still
+#        optimizing. Two layouts are understood:
+#
+#        CSV (<basename>.frames.csv, UTF-8 or MT5's default UTF-16LE):
+#            line 1  "# <report title>", e.g. "# IndyTSL EURUSD,H1 2023.03.01-2023.03.31"
+#            line 2  column names, the same as the XML export ("Pass", "Profit",
+#                    "Equity DD %", "Trades", "input_*", ...)
+#            then    one line per pass
+#
+#        Binary (<basename>.frames.bin, little-endian):
+#            b"OBFR", uint16 version (1)
+#            uint16 title length, UTF-8 title
+#            uint16 column count, then per column: uint8 kind (0=double, 1=long,
+#                   2=bool), uint16 name length, UTF-8 name
+#            then   one record per pass: int64 pass number + 8 bytes per column
+
+from __future__ import annotations
+
+import csv
+import struct
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+import settings
+from database.ingest.ingest_job import (
+    HeaderSignature,
+    PassRecord,
+    ensure_job,
+    header_signature,
+    ingest_pass_source,
+)
+from database.ingest.writer import IngestStats, RunWriter
+from database.parquet_store import merge_parts
+from database.session import get_engine, get_session
+
+if TYPE_CHECKING:
+    from database.ingest.plan import IngestPlan
+
+FRAME_MAGIC = b"OBFR"
+FRAME_VERSION = 1
+FRAME_SUFFIXES = (".frames.csv", ".frames.bin")
+
+_KIND_DOUBLE, _KIND_LONG, _KIND_BOOL = 0, 1, 2
+
+
+class FrameFormatError(ValueError):
+    """A frame file that does not follow the layout above."""
+
+
+def frame_file_candidates(files_dir: Path, basename: str) -> list[Path]:
+    """Where the EA writes the frames of one run (CSV or binary)."""
+    return [files_dir / "optibatch" / f"{basename}{suffix}" for suffix in FRAME_SUFFIXES]
+
+
+class FrameFileReader:
+    """
+    Incremental reader: each read_available() call returns the passes that
+    were completely written since the previous call. A partially written
+    trailing line or record is left for the next call.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.name = path.name
+        self.binary = path.name.endswith(".bin")
+        self.title: str | None = None
+        self.headers: tuple[str, ...] | None = None
+        self._signature: HeaderSignature | None = None
+        self._offset = 0
+        self._next_pass = 0
+
+        # CSV state
+        self._encoding: str | None = None
+        self._newline = b"\n"
+
+        # Binary state
+        self._kinds: list[int] = []
+        self._record: struct.Struct | None = None
+
+    def read_available(self) -> list[PassRecord]:
+        try:
+            with self.path.open("rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        if not data:
+            return []
+        return self._read_binary(data) if self.binary else self._read_csv(data)
+
+    # -- CSV ----------------------------------------------------------------
+
+    def _read_csv(self, data: bytes) -> list[PassRecord]:
+        if self._encoding is None:
+            if data.startswith(b"\xff\xfe"):
+                self._encoding, self._newline = "utf-16-le", b"\n\x00"
+                self._offset += 2
+                data = data[2:]
+            else:
+                self._encoding = "utf-8-sig"
+
+        end = data.rfind(self._newline)
+        if end < 0:
+            return []
+        end += len(self._newline)
+        self._offset += end
+        if self._encoding == "utf-16-le" and end % 2:
+            raise FrameFormatError(f"Misaligned UTF-16 data in {self.name}")
+
+        lines = data[:end].decode(self._encoding).splitlines()
+        records = []
+        for values in csv.reader(line for line in lines if line.strip()):
+            if self.title is None:
+                first = ",".join(values)
+                if not first.startswith("#"):
+                    raise FrameFormatError(f"{self.name} does not start with a '# title' line")
+                self.title = first.lstrip("#").strip()
+            elif self._signature is None:
+                self._set_headers([h.strip() for h in values])
+            else:
+                records.append(self._record_from(tuple(values)))
+        return records
+
+    def _set_headers(self, headers: list[str]) -> None:
+        self._signature = header_signature(tuple(headers))
+        self.headers = self._signature.names
+
+    def _record_from(self, cells: tuple[str, ...]) -> PassRecord:
+        assert self._signature is not None
+        index = self._signature.positions.get("Pass")
+        pass_text = cells[index].strip() if index is not None and index < len(cells) else ""
+        pass_number = int(float(pass_text)) if pass_text else self._next_pass
+        self._next_pass = pass_number + 1
+        return PassRecord(pass_number, cells, self._signature)
+
+    # -- binary -------------------------------------------------------------
+
+    def _read_binary(self, data: bytes) -> list[PassRecord]:
+        pos = 0
+        if self._record is None:
+            pos = self._read_binary_header(data)
+            if pos == 0:
+                return []  # header not complete yet
+
+        record, signature = self._record, self._signature
+        assert record is not None and signature is not None
+        count = (len(data) - pos) // record.size
+        records = []
+        for values in record.iter_unpack(data[pos : pos + count * record.size]):
+            cells = tuple(map(_format_cell, self._kinds, values[1:]))
+            records.append(PassRecord(values[0], cells, signature))
+        self._offset += pos + count * record.size
+        return records
+
+    def _read_binary_header(self, data: bytes) -> int:
+        """Parse the header; returns bytes consumed, or 0 if it is incomplete."""
+        if len(data) < len(FRAME_MAGIC):
+            return 0
+        try:
+            if data[:4] != FRAME_MAGIC:
+                raise FrameFormatError(f"{self.name} is not a frame file")
+            (version,) = struct.unpack_from("<H", data, 4)
+            if version != FRAME_VERSION:
+                raise FrameFormatError(f"Unsupported frame file version {version}")
+
+            pos = 6
+            (size,) = struct.unpack_from("<H", data, pos)
+            title = data[pos + 2 : pos + 2 + size]
+            pos += 2 + size
+            (columns,) = struct.unpack_from("<H", data, pos)
+            pos += 2
+
+            headers, kinds = [], []
+            for _ in range(columns):
+                kind, size = struct.unpack_from("<BH", data, pos)
+                name = data[pos + 3 : pos + 3 + size]
+                if len(name) < size:
+                    return 0
+                headers.append(name.decode("utf-8"))
+                kinds.append(kind)
+                pos += 3 + size
+        except struct.error:
+            return 0
+
+        self.title = title.decode("utf-8")
+        self._set_headers(headers)
+        self._kinds = kinds
+        self._record = struct.Struct(
+            "<q" + "".join("d" if kind == _KIND_DOUBLE else "q" for kind in kinds)
+        )
+        return pos
+
+
+def _format_cell(kind: int, value: float | int) -> str:
+    """Render a binary value the way the XML export would show it."""
+    if kind == _KIND_BOOL:
+        return "true" if value else "false"
+    return repr(value) if kind == _KIND_DOUBLE else str(value)
+
+
+@dataclass
+class FrameBatch:
+    """Passes already read from a frame file, as a PassSource for ingest."""
+
+    name: str
+    title: str | None
+    headers: tuple[str, ...] | None
+    records: list[PassRecord] = field(default_factory=list)
+
+    def read_title(self) -> str | None:
+        return self.title
+
+    def __iter__(self) -> Iterator[PassRecord]:
+        return iter(self.records)
+
+
+def _part_base(reader: FrameFileReader) -> str:
+    return reader.path.name.split(".frames.")[0]
+
+
+def _ingest_batch(
+    reader: FrameFileReader,
+    records: list[PassRecord],
+    session: Session,
+    job_id: str,
+    plan: IngestPlan,
+) -> IngestStats:
+    batch = FrameBatch(reader.name, reader.title, reader.headers, records)
+    part_name = f"{_part_base(reader)}.{records[0].pass_number:08d}"
+    return ingest_pass_source(
+        batch, plan, session, job_id, RunWriter(session), part_name=part_name
+    )
+
+
+def ingest_frame_file(
+    path: Path, plan: IngestPlan, session: Session, job_id: str
+) -> IngestStats:
+    """Ingest a finished frame file in one go (the caller owns the transaction)."""
+    reader = FrameFileReader(path)
+    records = reader.read_available()
+    if not records:
+        return IngestStats()
+    return _ingest_batch(reader, records, session, job_id, plan)
+
+
+class FrameFollower:
+    """
+    Tails the frame file of a running optimization and commits new passes
+    every `poll_interval` seconds, on its own thread and session. Each poll
+    writes a Parquet part; finish() merges them into one file per partition.
+
+        follower = FrameFollower(candidates, config_path, job_id).start()
+        ... run MT5 ...
+        stats = follower.finish()
+    """
+
+    def __init__(
+        self,
+        candidates: list[Path],
+        config_path: Path,
+        job_id: str,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self.candidates = candidates
+        self.config_path = config_path
+        self.job_id = job_id
+        self.poll_interval = poll_interval
+        self.stats = IngestStats()
+        self.error: Exception | None = None
+
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="frame-follower", daemon=True)
+
+    def start(self) -> "FrameFollower":
+        self._thread.start()
+        return self
+
+    def finish(self, timeout: float | None = 60.0) -> IngestStats:
+        """Signal that MT5 is done, drain what is left, merge the Parquet parts and return the totals."""
+        self._done.set()
+        self._thread.join(timeout)
+        return self.stats
+
+    def _find_file(self) -> Path | None:
+        return next((p for p in self.candidates if p.exists()), None)
+
+    def _run(self) -> None:
+        from database.ingest.plan import get_ingest_plan
+
+        try:
+            plan = get_ingest_plan(self.config_path)
+            reader: FrameFileReader | None = None
+            while True:
+                finished = self._done.is_set()  # read once more after MT5 is done
+                if reader is None and (path := self._find_file()) is not None:
+                    reader = FrameFileReader(path)
+                    logger.info(f"📡 Following frames in {path.name}")
+                if reader is not None:
+                    self._poll(reader, plan)
+                if finished:
+                    break
+                self._done.wait(self.poll_interval)
+            parquet_root = settings.PARQUET_ROOT
+            if reader is not None and parquet_root is not None:
+                merge_parts(parquet_root, self.job_id, _part_base(reader))
+        except Exception as e:
+            self.error = e
+            logger.exception(f"❌ Frame ingest failed for {self.job_id}: {e}")
+
+    def _poll(self, reader: FrameFileReader, plan: IngestPlan) -> None:
+        records = reader.read_available()
+        if not records:
+            return
+        with get_session(get_engine()) as session:
+            ensure_job(session, self.job_id, plan)
+            stats = _ingest_batch(reader, records, session, self.job_id, plan)
+        self.stats.merge(stats)
+        if stats.inserted:
+            logger.debug(f"📥 {stats.inserted} passes from {reader.name}")
+
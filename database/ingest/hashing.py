@@ -0,0 +1,138 @@
+# File: database/ingest/hashing.py
+# Purpose: Canonical result_hash for optimization passes, with the per-file part digested once
+# Notes: Output is byte-for-byte the legacy generate_result_hash() digest (version 1),
+#        so dedup against runs ingested before this module existed keeps working
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from datetime import date
+from math import isfinite
+from typing import Any, Iterable, Mapping
+
+# Version of the canonical encoding below. Version 1 digests are stored bare
+# (64 hex chars, as they always were); any later version is stored tagged as
+# "v<N>:<hex>" so both kinds can live side by side in runs.result_hash.
+RESULT_HASH_VERSION = 1
+
+_TAGGED = re.compile(r"^v(\d+):([0-9a-f]{64})$")
+_BARE = re.compile(r"^[0-9a-f]{64}$")
+
+# Same settings as the legacy json.dumps() call, built once instead of per pass
+_encode = json.JSONEncoder(separators=(",", ":"), sort_keys=True).encode
+
+
+def tag_result_hash(digest: str, version: int = RESULT_HASH_VERSION) -> str:
+    """Stored form of `digest` for `version` (version 1 stays untagged)."""
+    return digest if version == 1 else f"v{version}:{digest}"
+
+
+def parse_result_hash(value: str) -> tuple[int, str]:
+    """
+    Split a stored result_hash into (version, hex digest).
+
+    Raises ValueError for values that are not a recognised result hash.
+    """
+    if _BARE.match(value):
+        return 1, value
+    match = _TAGGED.match(value)
+    if match is None:
+        raise ValueError(f"Not a result hash: {value!r}")
+    return int(match.group(1)), match.group(2)
+
+
+def canonical_inputs(inputs: Mapping[str, Any]) -> str:
+    """The sorted-keys JSON of a parameter set, exactly as it enters the hash."""
+    return _encode(inputs)
+
+
+def param_set_hash(canonical: str) -> str:
+    """`param_sets.params_hash` of a parameter set, from its canonical_inputs() JSON."""
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _summary_json(profit: Any, drawdown: Any, trades: Any) -> str:
+    # json.dumps writes finite floats with float.__repr__ and ints with int.__repr__,
+    # so the common case can be formatted directly; anything else goes to the encoder
+    if (
+        type(profit) is float
+        and type(drawdown) is float
+        and type(trades) is int
+        and isfinite(profit)
+        and isfinite(drawdown)
+    ):
+        return f'{{"drawdown":{drawdown!r},"profit":{profit!r},"trades":{trades!r}}}'
+    return _encode({"profit": profit, "drawdown": drawdown, "trades": trades})
+
+
+class ResultHasher:
+    """
+    Hashes the passes of one report.
+
+    The canonical key is the sorted-keys JSON of
+    {end_date, inputs, modeling_mode, start_date, strategy_version, summary, symbol}.
+    Everything except `inputs` and `summary` is constant per file, so those
+    fragments are encoded once and the SHA-256 state up to `inputs` is
+    copied instead of re-fed for every pass.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        modeling_mode: str,
+        start_date: date,
+        end_date: date,
+        strategy_version: str | None,
+    ) -> None:
+        self._prefix = hashlib.sha256(
+            f'{{"end_date":{_encode(end_date.isoformat())},"inputs":'.encode()
+        )
+        self._middle = (
+            f',"modeling_mode":{_encode(modeling_mode)}'
+            f',"start_date":{_encode(start_date.isoformat())}'
+            f',"strategy_version":{_encode(strategy_version)}'
+            f',"summary":'
+        ).encode()
+        self._suffix = f',"symbol":{_encode(symbol)}}}'.encode()
+
+    def hash(self, inputs: Mapping[str, Any], summary: Mapping[str, Any]) -> str:
+        h = self._prefix.copy()
+        h.update(_encode(inputs).encode())
+        h.update(self._middle)
+        h.update(_encode(summary).encode())
+        h.update(self._suffix)
+        return tag_result_hash(h.hexdigest())
+
+    def hash_pass(
+        self, inputs: Mapping[str, Any], profit: Any, drawdown: Any, trades: Any
+    ) -> str:
+        """hash() for the standard {profit, drawdown, trades} summary, without a dict."""
+        return self.hash_canonical_pass(_encode(inputs), profit, drawdown, trades)
+
+    def hash_canonical_pass(
+        self, canonical: str, profit: Any, drawdown: Any, trades: Any
+    ) -> str:
+        """hash_pass() for inputs already encoded with canonical_inputs()."""
+        h = self._prefix.copy()
+        h.update(canonical.encode())
+        h.update(self._middle)
+        h.update(_summary_json(profit, drawdown, trades).encode())
+        h.update(self._suffix)
+        return tag_result_hash(h.hexdigest())
+
+    def hash_many(
+        self, passes: Iterable[tuple[Mapping[str, Any], Mapping[str, Any]]]
+    ) -> list[str]:
+        """Hash many (inputs, summary) pairs of this report in one call."""
+        prefix, middle, suffix = self._prefix, self._middle, self._suffix
+        digests = []
+        for inputs, summary in passes:
+            h = prefix.copy()
+            h.update(_encode(inputs).encode())
+            h.update(middle)
+            h.update(_encode(summary).encode())
+            h.update(suffix)
+            digests.append(tag_result_hash(h.hexdigest()))
+        return digests
@@ -4,19 +4,46 @@
 
 import re
 import json
-import hashlib
 from pathlib import Path
 from datetime import datetime, date
 from calendar import monthrange
+from functools import lru_cache
+from itertools import dropwhile, islice
 from xml.etree import ElementTree as ET
-from typing import Any, Optional, List, Dict, Union, Tuple
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Iterator,
+    NamedTuple,
+    Protocol,
+    Tuple,
+)
+from sqlalchemy import delete, exists, select
 from sqlalchemy.orm import Session
-from database.models import Job, Run
+from database.models import IngestCheckpoint, Job, QuarantinedPass, Run
 from database.session import get_engine, get_session
+from database.ingest.hashing import ResultHasher, canonical_inputs, param_set_hash
+from database.ingest.writer import (
+    IngestStats,
+    RunRow,
+    RunWriter,
+    find_existing_hashes,
+    resolve_param_sets,
+    run_fields,
+)
+from database.parquet_store import PassPartitionWriter
+import settings
 from loguru import logger
-import re
-from datetime import datetime
-from typing import Any
+
+if TYPE_CHECKING:
+    from database.ingest.archive import ArchiveMember
+    from database.ingest.checkpoint import IngestCheckpointer
+    from database.ingest.forward import ForwardIndex
+    from database.ingest.manifest import IngestManifest
+    from database.ingest.plan import ColumnLayout, IngestPlan
 
 def coerce_tester_value(key: str, val: str) -> Any:
     val = val.strip()
@@ -48,6 +75,11 @@ def coerce_tester_value(key: str, val: str) -> Any:
 def parse_input_types_from_json(path: Path) -> dict[str, type]:
     with open(path, encoding="utf-8-sig") as f:
         config = json.load(f)
+    return input_types_from_config(config)
+
+
+def input_types_from_config(config: dict) -> dict[str, type]:
+    """Input name -> type, guessed from the defaults in an already loaded job_config."""
     inputs = config.get("inputs", {})
 
     def infer_type(val: Any) -> type:
@@ -139,23 +171,19 @@ def generate_result_hash(
     strategy_version: str,
     summary: dict[str, float],
 ) -> str:
-    key = {
-        "symbol": symbol,
-        "modeling_mode": modeling_mode,
-        "start_date": start_date.isoformat(),
-        "end_date": end_date.isoformat(),
-        "inputs": dict(sorted(inputs.items())),
-        "strategy_version": strategy_version,
-        "summary": summary,  # optional, but useful for deduping results
-    }
-    encoded = json.dumps(key, separators=(",", ":"), sort_keys=True)
-    return hashlib.sha256(encoded.encode()).hexdigest()
+    """One-off result hash; ingest hashes whole files through ResultHasher."""
+    hasher = ResultHasher(symbol, modeling_mode, start_date, end_date, strategy_version)
+    return hasher.hash(inputs, summary)
 
 
 def extract_job_metadata(config_path: Path) -> dict:
     with config_path.open("r", encoding="utf-8") as f:
         job_config = json.load(f)
+    return job_metadata_from_config(job_config)
+
 
+def job_metadata_from_config(job_config: dict) -> dict:
+    """Job row fields from an already loaded job_config."""
     tester = job_config["tester"]
     expert_path = tester.get("Expert", "")
     strategy_version = extract_strategy_version(expert_path)
@@ -193,13 +221,10 @@ def extract_job_metadata(config_path: Path) -> dict:
     }
 
 
-def extract_symbol_and_dates_from_xml(xml_path: Path) -> Tuple[str, date, date, str]:
-    """Parse <Title> from DocumentProperties to extract symbol and date range."""
-    tree = ET.parse(xml_path)
-    ns = {"o": "urn:schemas-microsoft-com:office:office"}
-    title = tree.findtext(".//o:Title", namespaces=ns)
+def parse_report_title(title: str | None, name: str) -> Tuple[str, date, date, str]:
+    """Split an MT5 report title (e.g. 'IndyTSL EURUSD,H1 2023.03.01-2023.03.31')."""
     if not title:
-        raise ValueError(f"⚠️ No <Title> in {xml_path.name}")
+        raise ValueError(f"⚠️ No <Title> in {name}")
 
     try:
         parts = title.strip().split()
@@ -211,7 +236,13 @@ def extract_symbol_and_dates_from_xml(xml_path: Path) -> Tuple[str, date, date,
         run_month = f"{start.year}-{start.month:02}"
         return symbol, start, end, run_month
     except Exception as e:
-        raise ValueError(f"⚠️ Could not parse Title in {xml_path.name}: {e}")
+        raise ValueError(f"⚠️ Could not parse Title in {name}: {e}")
+
+
+def extract_symbol_and_dates_from_xml(xml_path: Path) -> Tuple[str, date, date, str]:
+    """Parse <Title> from DocumentProperties to extract symbol and date range."""
+    with XmlPassStream(xml_path) as stream:
+        return parse_report_title(stream.read_title(), xml_path.name)
 
 
 def is_discrete_month(start: date, end: date) -> bool:
@@ -224,87 +255,704 @@ def is_discrete_month(start: date, end: date) -> bool:
     )
 
 
-def extract_runs_from_xml(xml_path: Path) -> list[dict]:
-    """Extract all optimization runs from a given XML file."""
-    tree = ET.parse(xml_path)
-    ns = {"ss": "urn:schemas-microsoft-com:office:spreadsheet"}
-
-    header_row = tree.find(".//ss:Table/ss:Row", namespaces=ns)
-    if header_row is None:
-        logger.warning(f"No header row found in {xml_path.name}")
-        return []
-
-    headers = [
-        cell.findtext("ss:Data", default="", namespaces=ns)
-        for cell in header_row.findall("ss:Cell", namespaces=ns)
-    ]
-    data_rows = tree.findall(".//ss:Table/ss:Row", namespaces=ns)[1:]  # skip header
-    results = []
-
-    for i, row in enumerate(data_rows):
-        cells = [
-            cell.findtext("ss:Data", default="", namespaces=ns)
-            for cell in row.findall("ss:Cell", namespaces=ns)
-        ]
+SS_NS = "urn:schemas-microsoft-com:office:spreadsheet"
+O_NS = "urn:schemas-microsoft-com:office:office"
+
+_TABLE_TAG = f"{{{SS_NS}}}Table"
+_ROW_TAG = f"{{{SS_NS}}}Row"
+_CELL_TAG = f"{{{SS_NS}}}Cell"
+_DATA_TAG = f"{{{SS_NS}}}Data"
+_TITLE_TAG = f"{{{O_NS}}}Title"
+
+
+class HeaderSignature:
+    """
+    The column positions of one header row, shared by every pass read under it.
+
+    Passes keep their cells as a plain tuple; looking a column up by name
+    goes through this object (see header_signature()), so no per-pass dict
+    is ever built.
+    """
+
+    __slots__ = ("names", "positions")
+
+    def __init__(self, names: tuple[str, ...]) -> None:
+        self.names = names
+        # Last occurrence wins on duplicate headers, as dict(zip(...)) did
+        self.positions = {name: i for i, name in enumerate(names)}
+
+    def __repr__(self) -> str:
+        return f"HeaderSignature({self.names!r})"
+
+
+@lru_cache(maxsize=64)
+def header_signature(names: tuple[str, ...]) -> HeaderSignature:
+    """One HeaderSignature per distinct header tuple (reports of a job share it)."""
+    return HeaderSignature(names)
+
+
+class PassRecord(NamedTuple):
+    """
+    One optimization pass as read from the report.
+
+    `cells` are the raw strings in header order; a row may be shorter than
+    its header when trailing cells are missing.
+    """
+
+    pass_number: int
+    cells: tuple[str, ...]
+    header: HeaderSignature
+
+    def get(self, name: str, default: str | None = None) -> str | None:
+        index = self.header.positions.get(name)
+        if index is None or index >= len(self.cells):
+            return default
+        return self.cells[index]
+
+    def as_dict(self) -> dict[str, str]:
+        """Header -> cell text; for the rare pass that is kept verbatim."""
+        return dict(zip(self.header.names, self.cells))
+
+
+class PassSource(Protocol):
+    """
+    Anything ingest can read passes from (today: the XML report, XmlPassStream).
+
+    `read_title()` returns an MT5-style report title ("EA SYMBOL,TF
+    YYYY.MM.DD-YYYY.MM.DD"), `headers` are the XML column names once the
+    first pass has been read, and iteration yields PassRecords whose cells
+    are raw strings in the order of those headers.
+    """
+
+    name: str
+    headers: tuple[str, ...] | None
+
+    def read_title(self) -> str | None: ...
+
+    def __iter__(self) -> Iterator[PassRecord]: ...
+
+
+class XmlPassStream:
+    """
+    Streams optimization passes out of an MT5 SpreadsheetML report.
+
+    Built on ``iterparse``: each finished <Row> is turned into a PassRecord and
+    dropped from the tree, so memory stays flat regardless of file size. The
+    document <Title> is captured on the way through, which lets callers read
+    the symbol and date range without a second parse of the file.
+
+    Usage:
+        with XmlPassStream(xml_path) as stream:
+            title = stream.read_title()
+            for record in stream:
+                ...
+    """
+
+    def __init__(
+        self, source: "Path | ArchiveMember | IO[bytes]", name: str | None = None
+    ) -> None:
+        if isinstance(source, (str, bytes)) or hasattr(source, "read"):
+            self._file: IO[bytes] = source  # type: ignore[assignment]
+            self._owns_file = False
+            self.name = name or getattr(source, "name", "<stream>")
+        else:
+            # A Path, or anything else that opens like one (e.g. an archive member)
+            self._file = source.open("rb")
+            self._owns_file = True
+            self.name = name or source.name
+
+        self._events = ET.iterparse(self._file, events=("start", "end"))
+        self._table: ET.Element | None = None
+        self.title: str | None = None
+        self.headers: tuple[str, ...] | None = None
+        self._signature: HeaderSignature | None = None
+        self.row_count = 0
+
+    def __enter__(self) -> "XmlPassStream":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._owns_file:
+            self._file.close()
+
+    def read_title(self) -> str | None:
+        """Advance just far enough to see <Title>; no pass rows are consumed."""
+        if self.title is not None:
+            return self.title
+
+        for event, elem in self._events:
+            if event == "start":
+                if elem.tag == _TABLE_TAG:
+                    self._table = elem
+                continue
+            if elem.tag == _TITLE_TAG:
+                self.title = (elem.text or "").strip()
+                return self.title
+            if elem.tag == _ROW_TAG:
+                # Title always precedes the worksheet; if we hit rows it is missing.
+                self._consume_row(elem)
+                break
+        return self.title
+
+    def __iter__(self) -> Iterator[PassRecord]:
+        for event, elem in self._events:
+            if event == "start":
+                if elem.tag == _TABLE_TAG:
+                    self._table = elem
+                continue
+
+            if elem.tag == _ROW_TAG:
+                record = self._consume_row(elem)
+                if record is not None:
+                    yield record
+            elif elem.tag == _TITLE_TAG and self.title is None:
+                self.title = (elem.text or "").strip()
+
+    def _consume_row(self, row: ET.Element) -> PassRecord | None:
+        cells = tuple(
+            [cell.findtext(_DATA_TAG, default="") for cell in row.iterfind(_CELL_TAG)]
+        )
+
+        # Free the finished row so the tree never grows past a single <Row>
+        row.clear()
+        if self._table is not None:
+            self._table.remove(row)
+
+        if self._signature is None:
+            self._signature = header_signature(cells)
+            self.headers = cells
+            return None
+
+        pass_number = self.row_count
+        self.row_count += 1
         if not cells:
-            continue
-        record = dict(zip(headers, cells))
-        record["pass_number"] = str(i)
-        results.append(record)
+            return None
+        return PassRecord(pass_number, cells, self._signature)
+
+
+def iter_runs_from_xml(xml_path: Path) -> Iterator[PassRecord]:
+    """Lazily yield every optimization pass in an XML report."""
+    with XmlPassStream(xml_path) as stream:
+        yield from stream
+        if stream.headers is None:
+            logger.warning(f"No header row found in {xml_path.name}")
+
+
+def extract_runs_from_xml(xml_path: Path) -> list[PassRecord]:
+    """
+    Extract all optimization runs from a given XML file as PassRecords.
+
+    Kept for scripts that want the whole report in memory; ingest uses
+    iter_runs_from_xml() so large reports are never fully materialised.
+    Use record.get("Profit") or record.as_dict() for named access.
+    """
+    results = list(iter_runs_from_xml(xml_path))
 
     logger.info(f"✅ Parsed {len(results)} passes from {xml_path.name}")
     return results
 
 
-def ingest_job_folder(folder: Path, config_path: Path | None = None) -> int:
+def write_symbol_csv(symbols: set[str], job_id: str) -> None:
+    """Append unique valid symbols to a job-local CSV file."""
+    output_path = Path(f"generated/{job_id}/valid_symbols.csv")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    existing = set()
+
+    if output_path.exists():
+        existing.update(output_path.read_text().splitlines()[1:])  # skip header
+
+    all_symbols = sorted(existing.union(symbols))
+    with output_path.open("w", newline="") as f:
+        f.write("symbol\n")
+        for s in all_symbols:
+            f.write(f"{s}\n")
+
+
+# Passes coerced per NumPy block; bounds memory while amortizing the casts
+COERCE_BLOCK_SIZE = 2048
+
+
+def iter_run_rows(
+    stream: PassSource,
+    plan: "IngestPlan",
+    job_id: str,
+    stats: IngestStats,
+    forward: "ForwardIndex | None" = None,
+    start_after: int | None = None,
+    reject: Callable[[dict[str, Any]], None] | None = None,
+) -> Iterator[RunRow]:
+    """
+    Turn the passes of an open report into `runs` rows (plain dicts).
+
+    Passes are coerced in blocks of COERCE_BLOCK_SIZE, one NumPy cast per
+    column. Passes with zero trades are counted in `stats` and dropped.
+    A pass with an unparsable metric is counted as quarantined and handed
+    to `reject` as a `quarantined_passes` row; unparsable inputs keep their
+    raw text. With a `forward` index every row also carries the forward_*
+    columns of its parameter set (None when it has no forward pass).
+    Passes up to and including `start_after` are skipped before coercion.
+
+    Besides `runs` columns, each row carries `params_json` (the inputs) and
+    `params_hash`; RunWriter turns those into a `param_set_id`.
+    """
+    symbol, start_date, end_date, run_month = parse_report_title(
+        stream.read_title(), stream.name
+    )
+    is_full_month = is_discrete_month(start_date, end_date)
+    created_at = datetime.utcnow()
+    hasher = ResultHasher(
+        symbol, plan.model, start_date, end_date, plan.strategy_version
+    )
+    layout: ColumnLayout | None = None
+    passes: Iterator[PassRecord] = iter(stream)
+    if start_after is not None:
+        passes = dropwhile(lambda record: record.pass_number <= start_after, passes)
+
+    while block := list(islice(passes, COERCE_BLOCK_SIZE)):
+        if layout is None:
+            layout = plan.layout_for(stream.headers or ())
+
+        coerced = layout.coerce_block([record.cells for record in block])
+        stats.parsed += coerced.size
+        if coerced.invalid_cells:
+            stats.invalid_cells += coerced.invalid_cells
+            logger.warning(
+                f"⚠️ {coerced.invalid_cells} unparsable cells in {stream.name} "
+                f"(columns: {', '.join(sorted(coerced.errors))})"
+            )
+
+        failed = coerced.metric_errors() if coerced.errors else {}
+        for i, (record, (metrics, inputs)) in enumerate(zip(block, coerced.rows())):
+            if failed and i in failed:
+                stats.quarantined += 1
+                if reject is not None:
+                    reject(
+                        {
+                            "job_id": job_id,
+                            "source": stream.name,
+                            "pass_number": record.pass_number,
+                            "raw_values": record.as_dict(),
+                            "error": f"unparsable {', '.join(failed[i])}",
+                        }
+                    )
+                continue
+
+            trades = metrics["trades"]
+            if trades == 0:
+                stats.skipped_zero_trades += 1
+                continue
+
+            canonical = canonical_inputs(inputs)
+            row = {
+                "job_id": job_id,
+                "symbol": symbol,
+                "start_date": start_date,
+                "end_date": end_date,
+                "run_month": run_month,
+                "is_full_month": is_full_month,
+                "pass_number": record.pass_number,
+                **metrics,
+                "params_json": inputs,
+                "params_hash": param_set_hash(canonical),
+                "result_hash": hasher.hash_canonical_pass(
+                    canonical, metrics["profit"], metrics["drawdown"], trades
+                ),
+                "created_at": created_at,
+            }
+            if forward is not None:
+                row.update(forward.columns_for(inputs))
+            yield row
+
+
+def ensure_job(session: Session, job_id: str, plan: "IngestPlan") -> tuple[Job, bool]:
+    """Fetch the Job row for `job_id`, creating it from the plan if missing."""
+    job = session.get(Job, job_id)
+    if job is not None:
+        return job, False
+
+    job = Job(id=job_id, job_name=job_id, created_at=datetime.utcnow(), **plan.job_meta)
+    session.add(job)
+    return job, True
+
+
+def xml_has_traded_pass(xml_path: Path) -> bool:
+    """True as soon as one pass with trades > 0 is seen (no DB, stops early)."""
+    with XmlPassStream(xml_path) as stream:
+        for record in stream:
+            trades = (record.get("Trades") or "").strip()
+            if trades and float(trades) > 0:
+                return True
+    return False
+
+
+def ingest_job_file(
+    xml_path: Path, job_folder: Path, force: bool = False
+) -> IngestStats | None:
+    """
+    Ingest one XML of a job folder and record it in the job's manifest.
+
+    Runs and the manifest entry are committed in the same transaction, so a
+    crash either leaves the file un-ingested or fully recorded. Returns None
+    when the manifest shows the file was already ingested unchanged.
+    """
+    from database.ingest.forward import (
+        forward_report_path,
+        is_forward_report,
+        link_forward_report,
+    )
+    from database.ingest.manifest import IngestManifest
+    from database.ingest.plan import get_ingest_plan
+
+    job_id = job_folder.name
+    plan = get_ingest_plan(job_folder / "job_config.json")
+    fwd_path = forward_report_path(xml_path)
+
+    with get_session(get_engine()) as session:
+        ensure_job(session, job_id, plan)
+        manifest = IngestManifest(session, job_id, job_folder, paths=[xml_path, fwd_path])
+        if not force and manifest.is_unchanged(xml_path):
+            return None
+
+        if is_forward_report(xml_path):
+            stats = link_forward_report(xml_path, plan, session, job_id)
+            manifest.record(xml_path, stats)
+            return stats
+
+        stats = _ingest_xml_rows(xml_path, plan, session, job_id)
+        manifest.record(xml_path, stats)
+        _record_joined_forward(manifest, xml_path, stats)
+
+    logger.info(f"💾 Committed {stats.inserted} runs from {xml_path.name}")
+    return stats
+
+
+def ingest_job_folder(
+    folder: Path,
+    config_path: Path | None = None,
+    batch_size: int | None = None,
+    write_method: str | None = None,
+    workers: int | None = None,
+    force: bool = False,
+) -> int:
     """
     Ingest all XML result files in a job folder (generated/YYYYMMDD_HHMMSS_NAME).
 
-    Automatically creates the Job record and commits all runs.
+    Automatically creates the Job record and commits runs in batches of
+    `batch_size` rows (default: settings.INGEST_BATCH_SIZE). Duplicates are
+    skipped by result_hash. `write_method` selects the bulk path
+    ("auto", "core", "copy" or the "orm" fallback).
+
+    With `workers` > 1 (default: settings.INGEST_WORKERS) the XMLs are parsed
+    in a process pool while this process stays the single DB writer. Files
+    are written in sorted path order either way, so results are identical.
+
+    Files already recorded in the job's ingest manifest with the same size,
+    mtime (or content digest) are skipped; pass `force=True` to re-read them.
+
+    Forward reports (*.fwd.xml) are joined to their back-test report while
+    it is written; one that changed on its own is linked to the runs
+    already stored.
+
+    `folder` may also be a .zip or .tar(.gz/.bz2/.xz) archive of a job
+    folder: job_config.json and the XMLs are streamed out of it without
+    extracting anything. Archives have no manifest, so re-ingesting one
+    re-reads every XML and relies on result_hash dedup.
     """
+    from database.ingest.archive import JobArchive, close_archives, is_job_archive
+    from database.ingest.forward import (
+        back_report_path,
+        is_forward_report,
+        link_forward_report,
+    )
+    from database.ingest.manifest import IngestManifest
+    from database.ingest.plan import build_ingest_plan
+
     engine = get_engine()
-    config_path = config_path or (folder / "job_config.json")
-    job_id = folder.name
-    total_runs = 0
+    totals = IngestStats()
+    archive = JobArchive(folder) if is_job_archive(folder) else None
 
-    with get_session(engine) as session:
-        # Create Job record if missing
-        from database.models import Job
+    # Config is parsed once here and shared by every XML of the job
+    if archive is not None:
+        job_id = archive.job_id
+        plan = build_ingest_plan(config_path) if config_path else archive.ingest_plan()
+    else:
+        job_id = folder.name
+        plan = build_ingest_plan(config_path or (folder / "job_config.json"))
 
-        job_meta = extract_job_metadata(config_path)
-        job = Job(
-            id=job_id, job_name=job_id, created_at=datetime.utcnow(), **job_meta
-        )
+    with get_session(engine) as session:
+        job, created_job = ensure_job(session, job_id, plan)
+
+        manifest: IngestManifest | None = None
+        xml_files: list[Path | ArchiveMember]
+        fwd_files: list[Path] = []
+        if archive is not None:
+            # Forward members are already paired with their back-test member
+            xml_files = list(archive.reports)
+        else:
+            manifest = IngestManifest(session, job_id, folder)
+            all_files = sorted(folder.rglob("*.xml"))
+            changed = [f for f in all_files if force or not manifest.is_unchanged(f)]
+            unchanged = len(all_files) - len(changed)
+            if unchanged:
+                logger.info(f"⏭️ {unchanged} XMLs unchanged since last ingest of {job_id}")
+            xml_files = [f for f in changed if not is_forward_report(f)]
+            fwd_files = [f for f in changed if is_forward_report(f)]
+
+        workers = workers or settings.INGEST_WORKERS
+
+        def finish(xml_file: "Path | ArchiveMember", stats: IngestStats) -> None:
+            totals.merge(stats)
+            if manifest is not None and isinstance(xml_file, Path):
+                manifest.record(xml_file, stats)
+                _record_joined_forward(manifest, xml_file, stats)
+            session.commit()
+            if stats.inserted:
+                logger.info(f"📥 Parsed {stats.inserted} runs from {xml_file.name}")
 
-        runs_to_add: list[Run] = []
+        def new_writer() -> RunWriter:
+            return RunWriter(session, batch_size, write_method, commit_batches=True)
 
-        for xml_file in folder.rglob("*.xml"):
-            added = ingest_single_xml(
-                xml_file,
-                config_path,
-                session=session,
-                job_id=job_id,
-                preloaded_job=job,           # we'll add this param next
-                collect_only=True            # new param
+        try:
+            # Checkpoints need a file digest, so only files on disk are resumable
+            _ingest_reports(
+                session,
+                xml_files,
+                plan,
+                job_id,
+                workers,
+                new_writer,
+                finish,
+                resumable=archive is None,
             )
-            if added:
-                runs_to_add.extend(added)
-                logger.info(f"📥 Parsed {len(added)} runs from {xml_file.name}")
-
-        if runs_to_add:
-            session.add(job)
-            for run in runs_to_add:
-                session.add(run)
+        finally:
+            if archive is not None:
+                close_archives()
+
+        ingested = set(xml_files)
+        for fwd_file in fwd_files:
+            if back_report_path(fwd_file) in ingested:
+                continue  # joined while its back-test report was written
+            assert manifest is not None
+            manifest.record(fwd_file, link_forward_report(fwd_file, plan, session, job_id))
             session.commit()
-            logger.success(f"✅ Ingested {len(runs_to_add)} runs from job: {job_id}")
-        else:
+
+        if not totals.inserted:
+            if created_job:
+                _discard_empty_job(session, job, manifest)
+            if not xml_files:
+                logger.info(f"✅ Nothing new to ingest for job: {job_id}")
+                return 0
             logger.warning(f"⚠️ Skipping job '{job_id}' — all runs were duplicates or empty.")
             return 0
 
-        session.commit()
+    if totals.duplicates:
+        logger.info(f"🧹 Skipped {totals.duplicates} duplicate runs in job: {job_id}")
+    logger.success(f"✅ Ingested {totals.inserted} runs from job: {job_id}")
+    return totals.inserted
+
+
+def _discard_empty_job(
+    session: Session, job: Job, manifest: "IngestManifest | None"
+) -> None:
+    """
+    Remove a job this ingest created but wrote no runs for. Batches may
+    already have committed it along with checkpoints or quarantined passes;
+    a job with quarantined passes is kept so they can still be inspected.
+    """
+    session.flush()
+    if session.scalar(select(exists().where(QuarantinedPass.job_id == job.id))):
+        logger.warning(f"⚠️ Keeping job '{job.id}' for its quarantined passes.")
+        return
+    if manifest is not None:
+        manifest.discard()
+    session.execute(delete(IngestCheckpoint).where(IngestCheckpoint.job_id == job.id))
+    session.flush()
+    session.delete(job)
+
+
+def _ingest_reports(
+    session: Session,
+    xml_files: list["Path | ArchiveMember"],
+    plan: "IngestPlan",
+    job_id: str,
+    workers: int,
+    new_writer: Callable[[], RunWriter],
+    finish: Callable[["Path | ArchiveMember", IngestStats], None],
+    resumable: bool,
+) -> None:
+    """Write every report of a job, parsed in-process or by `workers` processes."""
+    if workers > 1 and len(xml_files) > 1:
+        from database.ingest.parallel import iter_parsed_files
+
+        logger.info(f"⚙️ Parsing {len(xml_files)} XMLs with {workers} workers")
+        for parsed in iter_parsed_files(xml_files, plan, job_id, workers):
+            writer = new_writer()
+            for row in parsed.quarantined:
+                writer.quarantine(row)
+            stats = _write_parsed_rows(
+                parsed.iter_rows(),
+                parsed.stats,
+                parsed.symbol,
+                job_id,
+                writer,
+                _open_pass_sink(parsed.xml_path.stem, plan),
+            )
+            finish(parsed.xml_path, stats)
+        return
+
+    for xml_file in xml_files:
+        finish(
+            xml_file,
+            _ingest_xml_rows(xml_file, plan, session, job_id, new_writer(), resumable),
+        )
+
+
+def _ingest_xml_rows(
+    xml_path: "Path | ArchiveMember",
+    plan: "IngestPlan",
+    session: Session,
+    job_id: str,
+    writer: RunWriter | None = None,
+    resumable: bool = False,
+) -> IngestStats:
+    """
+    Stream one XML into `runs` through a RunWriter and return its counters,
+    joining the forward report next to it if there is one.
+
+    With `resumable` (for writers that commit their batches) progress is
+    checkpointed, and a file that failed part way resumes after the last
+    committed pass.
+    """
+    from database.ingest.checkpoint import IngestCheckpointer
+    from database.ingest.forward import load_forward_index
+
+    forward = load_forward_index(xml_path, plan)
+    checkpoint = IngestCheckpointer(session, job_id, xml_path) if resumable else None
+    with open_report_stream(xml_path) as stream:
+        return ingest_pass_source(
+            stream, plan, session, job_id, writer, xml_path.stem, forward, checkpoint
+        )
 
-    logger.success(f"✅ Ingested {total_runs} runs from job: {job_id}")
-    return total_runs
+
+def open_report_stream(xml_path: "Path | ArchiveMember") -> ContextManager[XmlPassStream]:
+    """
+    Stream a report for ingest. Reports on disk get their pass index
+    (database.ingest.pass_index) written as a by-product of the read.
+    """
+    if settings.PASS_INDEX and isinstance(xml_path, Path):
+        from database.ingest.pass_index import open_indexed_stream
+
+        return open_indexed_stream(xml_path)
+    return XmlPassStream(xml_path)
+
+
+def _record_joined_forward(
+    manifest: "IngestManifest", xml_path: Path, stats: IngestStats
+) -> None:
+    """Mark the forward report joined while ingesting `xml_path` as done too."""
+    if not stats.forward_passes:
+        return
+    from database.ingest.forward import forward_report_path
+
+    joined = IngestStats(parsed=stats.forward_passes)
+    manifest.record(forward_report_path(xml_path), joined)
+
+
+def ingest_pass_source(
+    source: PassSource,
+    plan: "IngestPlan",
+    session: Session,
+    job_id: str,
+    writer: RunWriter | None = None,
+    part_name: str | None = None,
+    forward: "ForwardIndex | None" = None,
+    checkpoint: "IngestCheckpointer | None" = None,
+) -> IngestStats:
+    """
+    Stream the passes of any PassSource into `runs` and return its counters.
+
+    `part_name` names the source's Parquet sidecar file (default: the stem
+    of `source.name`); `forward` joins forward-test metrics onto the rows;
+    `checkpoint` resumes after its last committed pass and moves forward
+    with every batch. Passes with unparsable metrics go to
+    `quarantined_passes`. The caller owns the transaction.
+    """
+    writer = writer or RunWriter(session)
+    symbol = parse_report_title(source.read_title(), source.name)[0]
+
+    start_after = None
+    sink_name = part_name or Path(source.name).stem
+    if checkpoint is not None:
+        writer.on_batch = checkpoint.advance
+        start_after = checkpoint.resume_after
+    if start_after is not None:
+        # The aborted attempt's sidecar was discarded, and a partial one would mislead
+        logger.info(f"⏩ Resuming {source.name} after pass {start_after} (no Parquet sidecar)")
+        sink = None
+    else:
+        sink = _open_pass_sink(sink_name, plan)
+
+    stats = _write_parsed_rows(
+        iter_run_rows(
+            source, plan, job_id, writer.stats, forward, start_after, writer.quarantine
+        ),
+        writer.stats,
+        symbol,
+        job_id,
+        writer,
+        sink,
+    )
+    if checkpoint is not None:
+        checkpoint.complete()
+    if forward is not None:
+        stats.forward_passes = len(forward)
+        stats.forward_matched = forward.matched
+    if stats.quarantined:
+        logger.warning(f"🧪 Quarantined {stats.quarantined} passes from {source.name}")
+    return stats
+
+
+def _open_pass_sink(part_name: str, plan: "IngestPlan") -> PassPartitionWriter | None:
+    """Parquet sidecar writer for one source, or None when the store is disabled."""
+    parquet_root = settings.PARQUET_ROOT
+    if parquet_root is None:
+        return None
+    return PassPartitionWriter(parquet_root, part_name, plan.input_types)
+
+
+def _write_parsed_rows(
+    rows: Iterator[RunRow],
+    parse_stats: IngestStats,
+    symbol: str,
+    job_id: str,
+    writer: RunWriter,
+    sink: PassPartitionWriter | None = None,
+) -> IngestStats:
+    """Feed one file's rows to `writer` (and the Parquet sink), flush, and
+    record the symbol if it traded."""
+    if parse_stats is not writer.stats:
+        writer.stats.merge(parse_stats)
+
+    if sink is None:
+        writer.extend(rows)
+        writer.flush()
+    else:
+        try:
+            writer.extend(sink.tap(rows))
+            writer.flush()
+        except BaseException:
+            sink.abort()
+            raise
+        sink.close()
+
+    stats = writer.stats
+    if stats.parsed > stats.skipped_zero_trades:
+        # At least one pass traded, so the symbol is worth keeping
+        write_symbol_csv({symbol}, job_id)
+    return stats
 
 
 def ingest_single_xml(
@@ -314,6 +962,10 @@ def ingest_single_xml(
     job_id: str = "",
     preloaded_job: Job | None = None,
     collect_only: bool = False,
+    plan: "IngestPlan | None" = None,
+    batch_size: int | None = None,
+    write_method: str | None = None,
+    resumable: bool | None = None,
 ) -> list[Run] | int:
     """
     Ingest a single MT5 XML result file and optionally commit runs to the database.
@@ -322,7 +974,7 @@ def ingest_single_xml(
     - Extracts metadata and run details from a single XML file.
     - Converts inputs using config typing info.
     - Computes derived metrics (custom_score, recovery_factor, etc.).
-    - Deduplicates runs using a generated result_hash.
+    - Deduplicates runs using a generated result_hash, in batches.
     - If any valid runs are found (trades > 0), adds the symbol to valid_symbols.csv.
 
     Args:
@@ -332,152 +984,81 @@ def ingest_single_xml(
         job_id (str): Unique job ID.
         preloaded_job (Job | None): Optional Job instance to attach runs to if `collect_only` is True.
         collect_only (bool): If True, returns a list of Run objects without committing.
+        plan (IngestPlan | None): Precompiled job plan. Built (and cached) from
+                                  `config_path` when not supplied.
+        batch_size (int | None): Rows per bulk write (default: settings.INGEST_BATCH_SIZE).
+        write_method (str | None): "auto", "core", "copy" or "orm" (default: settings).
+        resumable (bool | None): Commit every batch with a checkpoint, so a failed
+                                 ingest of the same file resumes where it stopped.
+                                 Defaults to True when this call owns the session.
 
     Returns:
         list[Run] | int: If `collect_only` is True, returns list of parsed Run objects.
                          Otherwise, returns the count of runs successfully committed.
     """
+    if plan is None:
+        from database.ingest.plan import get_ingest_plan
 
-    def write_symbol_csv(symbols: set[str], job_id: str) -> None:
-        """Append unique valid symbols to a job-local CSV file."""
-        output_path = Path(f"generated/{job_id}/valid_symbols.csv")
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        existing = set()
-
-        if output_path.exists():
-            existing.update(output_path.read_text().splitlines()[1:])  # skip header
-
-        all_symbols = sorted(existing.union(symbols))
-        with output_path.open("w", newline="") as f:
-            f.write("symbol\n")
-            for s in all_symbols:
-                f.write(f"{s}\n")
+        plan = get_ingest_plan(config_path)
 
-    added_runs: list[Run] = []
     owns_session = session is None
     engine = get_engine() if owns_session else None
     session = session or get_session(engine).__enter__()
-    valid_symbols: set[str] = set()
 
     try:
-        job_meta = extract_job_metadata(config_path)
-        symbol, start_date, end_date, run_month = extract_symbol_and_dates_from_xml(
-            xml_path
+        if collect_only:
+            return _collect_runs(xml_path, plan, session, job_id, preloaded_job)
+
+        # Only commit between batches when this call owns the transaction
+        # (or the caller opted into resumable, chunked commits)
+        if resumable is None:
+            resumable = owns_session
+        writer = RunWriter(
+            session, batch_size, write_method, commit_batches=owns_session or resumable
         )
-        raw_runs = extract_runs_from_xml(xml_path)
-        skipped_zero_trades = 0
-        duplicate_count = 0
-        total = 0
+        stats = _ingest_xml_rows(xml_path, plan, session, job_id, writer, resumable)
 
-        for record in raw_runs:
-            trades = int(record.get("Trades", 0))
-            if trades == 0:
-                skipped_zero_trades += 1
-                continue
-
-            # Record this symbol as valid if any pass had > 0 trades
-            valid_symbols.add(symbol)
-
-            # Parse input types
-            if config_path.name.endswith(".json"):
-                input_type_map = parse_input_types_from_json(config_path)
-            else:
-                input_type_map = parse_input_types_from_ini(config_path)
-
-            inputs = {}
-            for k, v in record.items():
-                if not k.startswith("input_"):
-                    continue
-                val = v.strip()
-                expected_type = input_type_map.get(k, str)
-                try:
-                    if expected_type == bool:
-                        inputs[k] = val.lower() == "true"
-                    elif expected_type == float:
-                        inputs[k] = float(val)
-                    elif expected_type == int:
-                        inputs[k] = int(float(val))  # allow "2.0" style ints
-                    else:
-                        inputs[k] = val
-                except Exception:
-                    inputs[k] = val
-
-            # Extract performance metrics
-            profit = float(record.get("Profit", 0))
-            drawdown_str = record.get("Equity DD %", "0").replace("%", "").strip()
-            drawdown = float(drawdown_str) if drawdown_str else 0.0
-            sharpe_ratio = float(record.get("Sharpe Ratio", 0))
-            profit_factor = float(record.get("Profit Factor", 0))
-            recovery_factor = float(record.get("Recovery Factor", 0))
-            expected_payoff = float(record.get("Expected Payoff", 0))
-            result = float(record.get("Result", 0))
-            custom_score = profit - (drawdown * 2)
-
-            run = Run(
-                job_id=job_id,
-                symbol=symbol,
-                start_date=start_date,
-                end_date=end_date,
-                run_month=run_month,
-                is_full_month=is_discrete_month(start_date, end_date),
-                pass_number=int(record["pass_number"]),
-                result=result,
-                profit=profit,
-                drawdown=drawdown,
-                sharpe_ratio=sharpe_ratio,
-                trades=trades,
-                expected_payoff=expected_payoff,
-                recovery_factor=recovery_factor,
-                profit_factor=profit_factor,
-                custom_score=custom_score,
-                params_json=inputs,
-                result_hash=generate_result_hash(
-                    symbol=symbol,
-                    modeling_mode=job_meta["model"],
-                    start_date=start_date,
-                    end_date=end_date,
-                    inputs=inputs,
-                    strategy_version=job_meta["strategy_version"],
-                    summary={"profit": profit, "drawdown": drawdown, "trades": trades},
-                ),
-                created_at=datetime.utcnow(),
+        if stats.skipped_zero_trades:
+            logger.info(
+                f"📭 Skipped {stats.skipped_zero_trades} runs with 0 trades in {xml_path.name}"
             )
-
-            # Check for duplicates
-            if session.query(Run).filter_by(result_hash=run.result_hash).first():
-                duplicate_count += 1
-                if duplicate_count <= 5:
-                    logger.debug(f"🛑 Duplicate run skipped: {run.result_hash}")
-                elif duplicate_count == 6:
-                    logger.debug(
-                        "🛑 ...more duplicates detected, suppressing further duplicate logs."
-                    )
-                continue
-
-            if collect_only:
-                run.job = preloaded_job
-                added_runs.append(run)
-            else:
-                session.add(run)
-
-            total += 1
-
         if owns_session:
-            if skipped_zero_trades:
-                logger.info(
-                    f"📭 Skipped {skipped_zero_trades} runs with 0 trades in {xml_path.name}"
-                )
             session.commit()
-            logger.info(f"💾 Committed {total} runs from {xml_path.name}")
-
+            logger.info(f"💾 Committed {stats.inserted} runs from {xml_path.name}")
     finally:
         if owns_session:
             session.close()
 
-    if duplicate_count > 0:
-        logger.info(f"🧹 Skipped {duplicate_count} duplicate runs in {xml_path.name}")
+    if stats.duplicates > 0:
+        logger.info(f"🧹 Skipped {stats.duplicates} duplicate runs in {xml_path.name}")
 
-    if valid_symbols:
-        write_symbol_csv(valid_symbols, job_id)
+    return stats.inserted
 
-    return added_runs if collect_only else total
+
+def _collect_runs(
+    xml_path: Path,
+    plan: "IngestPlan",
+    session: Session,
+    job_id: str,
+    preloaded_job: Job | None,
+) -> list[Run]:
+    """
+    Build (unsaved) Run objects for passes not already in the database.
+    Their parameter sets are upserted into `param_sets` through `session`.
+    """
+    stats = IngestStats()
+    with XmlPassStream(xml_path) as stream:
+        rows = {r["result_hash"]: r for r in iter_run_rows(stream, plan, job_id, stats)}
+
+    existing = find_existing_hashes(session, rows)
+    fresh = [row for result_hash, row in rows.items() if result_hash not in existing]
+    resolve_param_sets(session, fresh, {})
+    runs = []
+    for row in fresh:
+        run = Run(**run_fields(row))
+        run.job = preloaded_job
+        runs.append(run)
+
+    if existing:
+        logger.info(f"🧹 Skipped {len(existing)} duplicate runs in {xml_path.name}")
+    return runs
@@ -0,0 +1,104 @@
+# File: database/ingest/parallel.py
+# Purpose: Parse job XMLs in worker processes while a single writer feeds the DB
+# Notes: Results are consumed in submission (sorted path) order, so the outcome
+#        does not depend on which worker finishes first
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+from database.ingest.forward import load_forward_index
+from database.ingest.ingest_job import iter_run_rows, open_report_stream, parse_report_title
+from database.ingest.plan import IngestPlan
+from database.ingest.writer import IngestStats, RunRow
+
+if TYPE_CHECKING:
+    from database.ingest.archive import ArchiveMember
+
+# Parsed files allowed in flight per worker; bounds memory while keeping workers busy
+_PREFETCH_PER_WORKER = 2
+
+_worker_plan: IngestPlan | None = None
+
+
+@dataclass
+class ParsedFile:
+    """All run rows of one XML, packed as tuples for cheap transfer between processes."""
+
+    xml_path: Path | ArchiveMember  # a report on disk or inside a job archive
+    symbol: str
+    fields: tuple[str, ...] = ()
+    rows: list[tuple[Any, ...]] = field(default_factory=list)
+    quarantined: list[dict[str, Any]] = field(default_factory=list)
+    stats: IngestStats = field(default_factory=IngestStats)
+
+    def iter_rows(self) -> Iterator[RunRow]:
+        fields = self.fields
+        for values in self.rows:
+            yield dict(zip(fields, values))
+
+
+def parse_xml_file(
+    xml_path: Path | ArchiveMember, plan: IngestPlan, job_id: str
+) -> ParsedFile:
+    """Parse and coerce one XML into a ParsedFile (no database access)."""
+    forward = load_forward_index(xml_path, plan)
+    with open_report_stream(xml_path) as stream:
+        symbol = parse_report_title(stream.read_title(), xml_path.name)[0]
+        parsed = ParsedFile(xml_path=xml_path, symbol=symbol)
+        rows = iter_run_rows(
+            stream, plan, job_id, parsed.stats, forward, reject=parsed.quarantined.append
+        )
+        for row in rows:
+            if not parsed.fields:
+                parsed.fields = tuple(row)
+            parsed.rows.append(tuple(row.values()))
+    if forward is not None:
+        parsed.stats.forward_passes = len(forward)
+        parsed.stats.forward_matched = forward.matched
+    return parsed
+
+
+def _init_worker(plan: IngestPlan) -> None:
+    from database.ingest.archive import close_archives
+
+    global _worker_plan
+    _worker_plan = plan
+    close_archives()  # archive handles inherited on fork share the parent's file offset
+
+
+def _parse_in_worker(xml_path: Path | ArchiveMember, job_id: str) -> ParsedFile:
+    assert _worker_plan is not None, "worker started without an ingest plan"
+    return parse_xml_file(xml_path, _worker_plan, job_id)
+
+
+def iter_parsed_files(
+    xml_files: Iterable[Path | ArchiveMember],
+    plan: IngestPlan,
+    job_id: str,
+    workers: int,
+) -> Iterator[ParsedFile]:
+    """
+    Parse `xml_files` across `workers` processes and yield them in input order.
+
+    The plan is shipped to each worker once (pool initializer), not per file.
+    At most `workers * 2` parsed files are held in memory at a time.
+    """
+    max_in_flight = max(1, workers) * _PREFETCH_PER_WORKER
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(plan,)
+    ) as pool:
+        in_flight: deque[Future[ParsedFile]] = deque()
+
+        for xml_path in xml_files:
+            in_flight.append(pool.submit(_parse_in_worker, xml_path, job_id))
+            if len(in_flight) >= max_in_flight:
+                yield in_flight.popleft().result()
+
+        while in_flight:
+            yield in_flight.popleft().result()
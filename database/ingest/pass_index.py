@@ -0,0 +1,314 @@
+# File: database/ingest/pass_index.py
+# Purpose: Sidecar index of where every pass row sits in an XML report, for random access
+# Notes: Layout of <report>.xml.passidx (little-endian):
+#            b"OBPX", uint16 version (1)
+#            uint64 XML size, int64 XML mtime_ns (the index only applies to that file)
+#            uint64 row count (header row + passes)
+#            uint64[count] byte offset of each <Row>, then uint32[count] its length
+#        Row 0 is the header row; pass N is row N + 1, matching XmlPassStream numbering.
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+from xml.etree import ElementTree as ET
+
+import numpy as np
+from loguru import logger
+
+from database.ingest.ingest_job import (
+    O_NS,
+    SS_NS,
+    HeaderSignature,
+    PassRecord,
+    XmlPassStream,
+    header_signature,
+)
+
+INDEX_SUFFIX = ".passidx"
+INDEX_MAGIC = b"OBPX"
+INDEX_VERSION = 1
+
+_HEADER = struct.Struct("<4sHQqQ")
+_SCAN_CHUNK = 1024 * 1024
+
+_CELL_TAG = f"{{{SS_NS}}}Cell"
+_DATA_TAG = f"{{{SS_NS}}}Data"
+
+# Rows are cut out of their document, so the prefixes they may use are redeclared
+_ROWS_OPEN = (
+    f'<Table xmlns="{SS_NS}" xmlns:ss="{SS_NS}" xmlns:o="{O_NS}" '
+    'xmlns:x="urn:schemas-microsoft-com:office:excel" '
+    'xmlns:html="http://www.w3.org/TR/REC-html40">'
+).encode()
+_ROWS_CLOSE = b"</Table>"
+
+_TAG_END = b" \t\r\n/>"
+
+
+class StalePassIndex(ValueError):
+    """The index was built for a different version of the XML (or is not an index)."""
+
+
+def pass_index_path(xml_path: Path) -> Path:
+    return xml_path.with_name(xml_path.name + INDEX_SUFFIX)
+
+
+class RowOffsetTap:
+    """
+    Read-through wrapper that records the byte range of every worksheet <Row>
+    as a parser pulls the file through it.
+
+    Only a few bytes are carried between reads (a tag split across two
+    chunks), so the tap adds no copy of the document. Rows are looked for
+    between <Table> and </Table>; `complete` tells whether the table end
+    was reached.
+    """
+
+    def __init__(self, raw: IO[bytes]) -> None:
+        self._raw = raw
+        self.name = getattr(raw, "name", "<stream>")
+        self.offsets: list[int] = []
+        self.lengths: list[int] = []
+        self.complete = False
+
+        self._tail = b""  # unscanned bytes carried over from the previous read
+        self._base = 0  # file offset of self._tail[0]
+        self._in_table = False
+        self._row_start: int | None = None
+
+    def read(self, size: int | None = -1) -> bytes:
+        data = self._raw.read(size)
+        if data and not self.complete:
+            self._scan(data)
+        return data
+
+    def _scan(self, data: bytes) -> None:
+        buf = self._tail + data
+        base, i, keep = self._base, 0, len(buf)
+        table_end: int | None = None  # searched once per read, not once per row
+
+        while True:
+            if not self._in_table:
+                j = buf.find(b"<Table", i)
+                if j < 0 or j + 6 >= len(buf):
+                    keep = max(i, len(buf) - 6) if j < 0 else j
+                    break
+                i = j + 6
+                self._in_table = buf[i] in _TAG_END
+                continue
+
+            if self._row_start is not None:
+                j = buf.find(b"</Row>", i)
+                if j < 0:
+                    keep = max(i, len(buf) - 5)
+                    break
+                i = j + 6
+                self._add_row(self._row_start, base + i)
+                self._row_start = None
+                continue
+
+            j = buf.find(b"<Row", i)
+            if table_end is None:
+                table_end = buf.find(b"</Table>", i)
+            if table_end >= 0 and (j < 0 or table_end < j):
+                self.complete = True
+                keep = len(buf)
+                break
+            if j < 0 or j + 4 >= len(buf):
+                keep = max(i, len(buf) - 7) if j < 0 else j
+                break
+            if buf[j + 4] not in _TAG_END:
+                i = j + 4  # some other element, e.g. <RowBreaks>
+                continue
+            close = buf.find(b">", j + 4)
+            if close < 0:
+                keep = j  # the start tag continues in the next read
+                break
+            i = close + 1
+            if buf[close - 1] == ord("/"):
+                self._add_row(base + j, base + i)  # <Row/>
+            else:
+                self._row_start = base + j
+
+        self._tail = buf[keep:]
+        self._base = base + keep
+
+    def _add_row(self, start: int, end: int) -> None:
+        self.offsets.append(start)
+        self.lengths.append(end - start)
+
+    def write_index(self, index_path: Path, xml_stat: os.stat_result) -> None:
+        offsets = np.asarray(self.offsets, dtype="<u8")
+        lengths = np.asarray(self.lengths, dtype="<u4")
+        tmp = index_path.with_name(index_path.name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(
+                _HEADER.pack(
+                    INDEX_MAGIC,
+                    INDEX_VERSION,
+                    xml_stat.st_size,
+                    xml_stat.st_mtime_ns,
+                    len(offsets),
+                )
+            )
+            f.write(offsets.tobytes())
+            f.write(lengths.tobytes())
+        os.replace(tmp, index_path)
+
+
+@contextmanager
+def open_indexed_stream(xml_path: Path) -> Iterator[XmlPassStream]:
+    """
+    XmlPassStream over `xml_path` that writes its pass index once the whole
+    report has been read. Nothing is written if the caller fails part way,
+    or if the rows found by the byte scan do not line up with the parser's.
+    """
+    with xml_path.open("rb") as f:
+        xml_stat = os.fstat(f.fileno())
+        tap = RowOffsetTap(f)
+        with XmlPassStream(tap, name=xml_path.name) as stream:
+            yield stream
+
+        rows = stream.row_count + (stream.headers is not None)
+        if not tap.complete or len(tap.offsets) != rows:
+            logger.debug(f"No pass index for {xml_path.name}: rows do not line up")
+            return
+        try:
+            tap.write_index(pass_index_path(xml_path), xml_stat)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write pass index for {xml_path.name}: {e}")
+
+
+def build_pass_index(xml_path: Path) -> Path:
+    """Index a report without parsing it (a byte scan), e.g. one ingested before indexes."""
+    with xml_path.open("rb") as f:
+        xml_stat = os.fstat(f.fileno())
+        tap = RowOffsetTap(f)
+        while tap.read(_SCAN_CHUNK):
+            pass
+    if not tap.complete:
+        raise StalePassIndex(f"No complete worksheet table in {xml_path.name}")
+    index_path = pass_index_path(xml_path)
+    tap.write_index(index_path, xml_stat)
+    return index_path
+
+
+class PassIndex:
+    """
+    Random access to the pass rows of one XML report.
+
+    Both the index and the report are memory-mapped; reading a pass decodes
+    just its <Row>. Opening fails with StalePassIndex when the report's size
+    or mtime no longer match the index.
+
+    Usage:
+        with PassIndex(xml_path) as index:
+            record = index.read_pass(1234)
+            page = index.read_passes(1000, 1100)
+    """
+
+    def __init__(self, xml_path: Path, index_path: Path | None = None) -> None:
+        self.xml_path = xml_path
+        index_path = index_path or pass_index_path(xml_path)
+
+        with index_path.open("rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, size, mtime_ns, count = _HEADER.unpack_from(self._index)
+        except struct.error:
+            magic = b""
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self._index.close()
+            raise StalePassIndex(f"{index_path.name} is not a pass index")
+
+        st = xml_path.stat()
+        if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+            self._index.close()
+            raise StalePassIndex(f"{xml_path.name} changed since it was indexed")
+
+        self._offsets = np.frombuffer(self._index, "<u8", count, _HEADER.size)
+        self._lengths = np.frombuffer(self._index, "<u4", count, _HEADER.size + 8 * count)
+        self._xml: mmap.mmap | None = None
+        self._header: HeaderSignature | None = None
+
+    def __enter__(self) -> "PassIndex":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # Drop the NumPy views first; an mmap with exported buffers cannot close
+        del self._offsets, self._lengths
+        self._index.close()
+        if self._xml is not None:
+            self._xml.close()
+            self._xml = None
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    @property
+    def header(self) -> HeaderSignature:
+        if self._header is None:
+            (cells,) = self._decode(0, 1)
+            self._header = header_signature(cells)
+        return self._header
+
+    def row_bytes(self, pass_number: int) -> bytes:
+        """The raw <Row>...</Row> of one pass."""
+        row = self._row(pass_number)
+        start = int(self._offsets[row])
+        return self._map()[start : start + int(self._lengths[row])]
+
+    def read_pass(self, pass_number: int) -> PassRecord:
+        row = self._row(pass_number)
+        (cells,) = self._decode(row, row + 1)
+        return PassRecord(pass_number, cells, self.header)
+
+    def read_passes(self, start: int, stop: int) -> list[PassRecord]:
+        """Passes start..stop-1 (clipped to the report), decoded in one parse."""
+        start, stop = max(start, 0), min(stop, len(self))
+        if start >= stop:
+            return []
+        header = self.header
+        rows = self._decode(start + 1, stop + 1)
+        return [PassRecord(start + i, cells, header) for i, cells in enumerate(rows)]
+
+    def _row(self, pass_number: int) -> int:
+        if not 0 <= pass_number < len(self):
+            raise IndexError(f"{self.xml_path.name} has no pass {pass_number}")
+        return pass_number + 1
+
+    def _map(self) -> mmap.mmap:
+        if self._xml is None:
+            with self.xml_path.open("rb") as f:
+                self._xml = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._xml
+
+    def _decode(self, first: int, last: int) -> list[tuple[str, ...]]:
+        """Cells of rows first..last-1, which are contiguous in the report."""
+        start = int(self._offsets[first])
+        end = int(self._offsets[last - 1]) + int(self._lengths[last - 1])
+        table = ET.fromstring(_ROWS_OPEN + self._map()[start:end] + _ROWS_CLOSE)
+        return [
+            tuple(cell.findtext(_DATA_TAG, default="") for cell in row.iterfind(_CELL_TAG))
+            for row in table
+        ]
+
+
+def read_pass_row(xml_path: Path, pass_number: int) -> PassRecord:
+    """One pass of a report, (re)building its index first if it is missing or stale."""
+    try:
+        index = PassIndex(xml_path)
+    except (FileNotFoundError, StalePassIndex):
+        logger.info(f"🗂️ Indexing passes of {xml_path.name}")
+        build_pass_index(xml_path)
+        index = PassIndex(xml_path)
+    with index:
+        return index.read_pass(pass_number)
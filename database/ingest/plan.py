@@ -0,0 +1,353 @@
+# File: database/ingest/plan.py
+# Purpose: Per-job ingest plan — config parsing and column coercers compiled once per job
+# Notes: Building this is the only place job_config.json is read during ingest
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import repeat
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
+
+import numpy as np
+
+from database.ingest.columns import (
+    Column,
+    bool_column,
+    float_column,
+    int_column,
+    percent_column,
+    str_column,
+)
+from database.ingest.ingest_job import (
+    extract_job_metadata,
+    header_signature,
+    input_types_from_config,
+    job_metadata_from_config,
+    parse_input_types_from_ini,
+    parse_input_types_from_json,
+)
+
+Coercer = Callable[[str], Any]
+ColumnCoercer = Callable[[list[str]], Column]
+
+
+def _to_bool(val: str) -> Any:
+    return val.strip().lower() == "true"
+
+
+def _to_float(val: str) -> Any:
+    val = val.strip()
+    try:
+        return float(val)
+    except ValueError:
+        return val
+
+
+def _to_int(val: str) -> Any:
+    val = val.strip()
+    try:
+        return int(float(val))  # allow "2.0" style ints
+    except ValueError:
+        return val
+
+
+def _to_str(val: str) -> Any:
+    return val.strip()
+
+
+INPUT_COERCERS: dict[type, Coercer] = {
+    bool: _to_bool,
+    float: _to_float,
+    int: _to_int,
+    str: _to_str,
+}
+
+
+def _percent(val: str) -> float:
+    val = val.replace("%", "").strip()
+    return float(val) if val else 0.0
+
+
+# Run field -> (XML header, parser). Missing columns default to 0, as before.
+METRIC_COLUMNS: dict[str, tuple[str, Callable[[str], Any]]] = {
+    "result": ("Result", float),
+    "profit": ("Profit", float),
+    "drawdown": ("Equity DD %", _percent),
+    "sharpe_ratio": ("Sharpe Ratio", float),
+    "profit_factor": ("Profit Factor", float),
+    "recovery_factor": ("Recovery Factor", float),
+    "expected_payoff": ("Expected Payoff", float),
+    "trades": ("Trades", int),
+}
+
+
+# Vectorized twins of the scalar parsers above, for whole-block coercion
+COLUMN_COERCERS: dict[Callable[[str], Any], ColumnCoercer] = {
+    _to_bool: bool_column,
+    _to_float: float_column,
+    _to_int: int_column,
+    _to_str: str_column,
+    float: float_column,
+    _percent: percent_column,
+    int: partial(int_column, exact=True),
+}
+
+
+def compute_custom_score(profit: Any, drawdown: Any) -> Any:
+    """Works on scalars and on NumPy arrays alike."""
+    return profit - (drawdown * 2)
+
+
+_MISSING = object()
+
+
+@dataclass
+class CoercedBlock:
+    """
+    A block of passes coerced column by column.
+
+    `metrics` and `inputs` hold one array per column; `errors` holds the mask
+    of unparsable cells for every column that had any. Unparsable metrics
+    come out of rows() as None, unparsable inputs keep their raw (stripped)
+    text like the scalar coercers do, and inputs missing from a row are left
+    out of that row's params.
+    """
+
+    size: int
+    metrics: dict[str, np.ndarray]
+    inputs: dict[str, np.ndarray]
+    errors: dict[str, np.ndarray]
+    raw_inputs: dict[str, list[str | None]]
+
+    @property
+    def invalid_cells(self) -> int:
+        """Unparsable cells (derived columns are not counted again)."""
+        return int(
+            sum(mask.sum() for name, mask in self.errors.items() if name != "custom_score")
+        )
+
+    def metric_errors(self) -> dict[int, list[str]]:
+        """Row index -> metrics that could not be parsed in that row."""
+        failed: dict[int, list[str]] = {}
+        for name, mask in self.errors.items():
+            if name in self.metrics and name != "custom_score":
+                for i in np.flatnonzero(mask).tolist():
+                    failed.setdefault(i, []).append(name)
+        return failed
+
+    def rows(self) -> Iterator[tuple[dict[str, Any], dict[str, Any]]]:
+        """Yield (metrics, inputs) dicts of plain Python values, row by row."""
+        metric_cols = []
+        for name, values in self.metrics.items():
+            col = values.tolist()
+            if name in self.errors:
+                for i in np.flatnonzero(self.errors[name]).tolist():
+                    col[i] = None
+            metric_cols.append((name, col))
+
+        input_cols = []
+        has_missing = False
+        for key, values in self.inputs.items():
+            col = values.tolist()
+            raw = self.raw_inputs[key]
+            if key in self.errors:
+                for i in np.flatnonzero(self.errors[key]).tolist():
+                    col[i] = raw[i].strip()
+            if None in raw:
+                has_missing = True
+                for i, cell in enumerate(raw):
+                    if cell is None:
+                        col[i] = _MISSING
+            input_cols.append((key, col))
+
+        metric_names = [name for name, _ in metric_cols]
+        input_names = [key for key, _ in input_cols]
+        metric_rows = zip(*(col for _, col in metric_cols))
+        input_rows = zip(*(col for _, col in input_cols)) if input_cols else repeat(())
+
+        for metric_values, input_values in zip(metric_rows, input_rows):
+            inputs = dict(zip(input_names, input_values))
+            if has_missing:
+                inputs = {k: v for k, v in inputs.items() if v is not _MISSING}
+            yield dict(zip(metric_names, metric_values)), inputs
+
+
+Cells = Sequence[str]
+
+
+def _gather(records: list[Cells], index: int, default: str | None) -> list:
+    """One column of `records`; the itemgetter fast path covers complete rows."""
+    try:
+        return list(map(itemgetter(index), records))
+    except IndexError:
+        return [r[index] if index < len(r) else default for r in records]
+
+
+@dataclass
+class ColumnLayout:
+    """
+    Coercers for one XML header signature, resolved to (column index, function)
+    pairs so records are read positionally. A record may be shorter than the
+    header row; its missing trailing cells count as absent.
+    """
+
+    inputs: list[tuple[str, int, Coercer]]
+    metrics: list[tuple[str, int | None, Callable[[str], Any]]]
+    positions: dict[str, int] = field(default_factory=dict)
+
+    def coerce_inputs(self, cells: Cells) -> dict[str, Any]:
+        return {
+            key: coerce(cells[index])
+            for key, index, coerce in self.inputs
+            if index < len(cells)
+        }
+
+    def coerce_metrics(self, cells: Cells) -> dict[str, Any]:
+        metrics: dict[str, Any] = {}
+        for field_name, index, parse in self.metrics:
+            raw = cells[index] if index is not None and index < len(cells) else None
+            metrics[field_name] = parse(raw) if raw is not None else parse("0")
+        metrics["custom_score"] = compute_custom_score(
+            metrics["profit"], metrics["drawdown"]
+        )
+        return metrics
+
+    def raw_column(self, records: list[Cells], header: str, default: str = "") -> list[str]:
+        """The raw text of any column by header name (`default` where it is absent)."""
+        index = self.positions.get(header)
+        if index is None:
+            return [default] * len(records)
+        return _gather(records, index, default)
+
+    def coerce_block(self, records: list[Cells]) -> CoercedBlock:
+        """Coerce many records (cell tuples) at once, one NumPy cast per column."""
+        metrics: dict[str, np.ndarray] = {}
+        inputs: dict[str, np.ndarray] = {}
+        errors: dict[str, np.ndarray] = {}
+        raw_inputs: dict[str, list[str | None]] = {}
+
+        for field_name, index, parse in self.metrics:
+            if index is None:
+                raw = ["0"] * len(records)
+            else:
+                raw = _gather(records, index, "0")
+            metrics[field_name], mask = COLUMN_COERCERS[parse](raw)
+            if mask.any():
+                errors[field_name] = mask
+
+        metrics["custom_score"] = compute_custom_score(
+            metrics["profit"], metrics["drawdown"]
+        )
+        derived_mask = errors.get("profit", False) | errors.get("drawdown", False)
+        if np.any(derived_mask):
+            errors["custom_score"] = np.asarray(derived_mask)
+
+        for key, index, coerce in self.inputs:
+            raw_inputs[key] = raw = _gather(records, index, None)
+            inputs[key], mask = COLUMN_COERCERS[coerce](
+                [cell if cell is not None else "" for cell in raw]
+            )
+            if None in raw:  # a missing cell is not a parse error
+                mask &= np.array([cell is not None for cell in raw])
+            if mask.any():
+                errors[key] = mask
+
+        return CoercedBlock(len(records), metrics, inputs, errors, raw_inputs)
+
+
+@dataclass
+class IngestPlan:
+    """
+    Everything ingest needs to know about a job, resolved once.
+
+    Holds the job metadata, the input type map and a cache of compiled
+    column layouts keyed by XML header tuple, so every file and row of the
+    job reuses the same coercers and column positions instead of
+    re-reading the config or looking headers up per pass.
+    """
+
+    config_path: Path
+    job_meta: dict
+    input_types: dict[str, type]
+    _layouts: dict[tuple[str, ...], ColumnLayout] = field(default_factory=dict)
+
+    @property
+    def model(self) -> str:
+        return self.job_meta["model"]
+
+    @property
+    def strategy_version(self) -> str | None:
+        return self.job_meta["strategy_version"]
+
+    def layout_for(self, headers: list[str] | tuple[str, ...]) -> ColumnLayout:
+        key = tuple(headers)
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = self._compile(key)
+            self._layouts[key] = layout
+        return layout
+
+    def _compile(self, headers: tuple[str, ...]) -> ColumnLayout:
+        positions = header_signature(headers).positions
+        inputs = [
+            (h, i, INPUT_COERCERS.get(self.input_types.get(h, str), _to_str))
+            for h, i in positions.items()
+            if h.startswith("input_")
+        ]
+        metrics = [
+            (name, positions.get(header), parse)
+            for name, (header, parse) in METRIC_COLUMNS.items()
+        ]
+        return ColumnLayout(inputs=inputs, metrics=metrics, positions=positions)
+
+
+def build_ingest_plan(config_path: Path) -> IngestPlan:
+    """
+    Build the plan for a job from its config.
+
+    `config_path` may be the job's job_config.json or its current_config.ini;
+    job metadata always comes from job_config.json next to it.
+    """
+    if config_path.name.endswith(".json"):
+        input_types = parse_input_types_from_json(config_path)
+        meta_path = config_path
+    else:
+        input_types = parse_input_types_from_ini(config_path)
+        meta_path = config_path.with_name("job_config.json")
+
+    return IngestPlan(
+        config_path=config_path,
+        job_meta=extract_job_metadata(meta_path),
+        input_types=input_types,
+    )
+
+
+def build_ingest_plan_from_config(job_config: dict, config_path: Path) -> IngestPlan:
+    """Build the plan from an already loaded job_config.json (e.g. read from an archive)."""
+    return IngestPlan(
+        config_path=config_path,
+        job_meta=job_metadata_from_config(job_config),
+        input_types=input_types_from_config(job_config),
+    )
+
+
+_PLAN_CACHE_SIZE = 8
+_plan_cache: dict[Path, tuple[int, IngestPlan]] = {}
+
+
+def get_ingest_plan(config_path: Path) -> IngestPlan:
+    """Return a cached plan for `config_path`, rebuilt only if the file changes."""
+    path = config_path.resolve()
+    mtime_ns = path.stat().st_mtime_ns
+    cached = _plan_cache.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    plan = build_ingest_plan(config_path)
+    _plan_cache[path] = (mtime_ns, plan)
+    if len(_plan_cache) > _PLAN_CACHE_SIZE:
+        del _plan_cache[next(iter(_plan_cache))]  # drop the oldest job
+    return plan
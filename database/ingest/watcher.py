@@ -0,0 +1,181 @@
+# File: database/ingest/watcher.py
+# Purpose: Standalone ingest service — watches generated/ for finished XML reports
+# Notes: Run with `python -m database.ingest.watcher [generated]`. The ingest
+#        manifest makes it restart-safe: files are recorded in the same
+#        transaction as their runs, and anything unrecorded is picked up again.
+
+from __future__ import annotations
+
+import argparse
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from loguru import logger
+
+from database.ingest.ingest_job import ingest_job_file
+
+DEFAULT_ROOT = Path("generated")
+
+
+@dataclass
+class _Candidate:
+    size: int
+    mtime_ns: int
+    stable_since: float
+
+
+class IngestWatcher:
+    """
+    Polls a `generated/` tree and ingests each finished `*.xml` exactly once.
+
+    - A file is "finished" once its size and mtime have not changed for
+      `settle_seconds` (MT5 export + move_xml_to_job_folder are done with it).
+    - Settled files go onto a bounded queue drained by a single ingest
+      thread. When the queue is full the scanner simply stops enqueueing;
+      the backlog stays on disk and is picked up by later scans.
+    - Failed files are retried after `retry_seconds`.
+    """
+
+    def __init__(
+        self,
+        root: Path = DEFAULT_ROOT,
+        settle_seconds: float = 2.0,
+        poll_interval: float = 1.0,
+        max_pending: int = 32,
+        retry_seconds: float = 30.0,
+    ) -> None:
+        self.root = root
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.retry_seconds = retry_seconds
+
+        self._queue: queue.Queue[Path] = queue.Queue(maxsize=max_pending)
+        self._candidates: dict[Path, _Candidate] = {}
+        self._queued: set[Path] = set()
+        self._done: dict[Path, tuple[int, int]] = {}
+        self._retry_at: dict[Path, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # -- scanning ---------------------------------------------------------
+
+    def scan_once(self, now: float | None = None) -> int:
+        """Look for settled XMLs and enqueue them. Returns how many were queued."""
+        now = time.monotonic() if now is None else now
+        queued = 0
+
+        for xml_path in sorted(self.root.glob("*/**/*.xml")):
+            try:
+                st = xml_path.stat()
+            except FileNotFoundError:
+                continue  # moved away mid-scan
+
+            identity = (st.st_size, st.st_mtime_ns)
+            with self._lock:
+                if xml_path in self._queued or self._done.get(xml_path) == identity:
+                    continue
+            if self._retry_at.get(xml_path, 0.0) > now:
+                continue
+
+            cand = self._candidates.get(xml_path)
+            if cand is None or (cand.size, cand.mtime_ns) != identity:
+                self._candidates[xml_path] = _Candidate(*identity, stable_since=now)
+                continue
+            if st.st_size == 0 or now - cand.stable_since < self.settle_seconds:
+                continue
+
+            try:
+                self._queue.put_nowait(xml_path)
+            except queue.Full:
+                logger.debug("⏸️ Ingest queue full; deferring remaining files")
+                break
+
+            with self._lock:
+                self._queued.add(xml_path)
+            del self._candidates[xml_path]
+            queued += 1
+
+        return queued
+
+    # -- ingesting --------------------------------------------------------
+
+    def _job_folder(self, xml_path: Path) -> Path:
+        return self.root / xml_path.relative_to(self.root).parts[0]
+
+    def process_one(self, xml_path: Path) -> bool:
+        """Ingest a queued file. Returns False if it failed and will be retried."""
+        try:
+            st = xml_path.stat()
+            stats = ingest_job_file(xml_path, self._job_folder(xml_path))
+        except Exception as e:
+            logger.exception(f"❌ Ingest failed for {xml_path.name}: {e}")
+            self._retry_at[xml_path] = time.monotonic() + self.retry_seconds
+            return False
+        finally:
+            with self._lock:
+                self._queued.discard(xml_path)
+
+        with self._lock:
+            self._done[xml_path] = (st.st_size, st.st_mtime_ns)
+        self._retry_at.pop(xml_path, None)
+        if stats is None:
+            logger.debug(f"⏭️ Already ingested: {xml_path.name}")
+        return True
+
+    def _drain(self) -> None:
+        while not self._stop.is_set():
+            try:
+                xml_path = self._queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+            try:
+                self.process_one(xml_path)
+            finally:
+                self._queue.task_done()
+
+    # -- lifecycle --------------------------------------------------------
+
+    def run(self) -> None:
+        """Scan and ingest until stop() is called (blocking)."""
+        logger.info(f"👀 Watching {self.root.resolve()} for new XML reports")
+        worker = threading.Thread(target=self._drain, name="ingest-writer", daemon=True)
+        worker.start()
+        try:
+            while not self._stop.is_set():
+                self.scan_once()
+                self._stop.wait(self.poll_interval)
+        finally:
+            self._stop.set()
+            worker.join()
+            logger.info("🛑 Ingest watcher stopped")
+
+    def start(self) -> threading.Thread:
+        """Run the watcher on a background thread (e.g. from the GUI)."""
+        thread = threading.Thread(target=self.run, name="ingest-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest MT5 XML reports as they appear.")
+    parser.add_argument("root", nargs="?", type=Path, default=DEFAULT_ROOT)
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds a file must be unchanged")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between scans")
+    parser.add_argument("--max-pending", type=int, default=32, help="queued files before back-pressure")
+    args = parser.parse_args()
+
+    watcher = IngestWatcher(args.root, args.settle, args.interval, args.max_pending)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
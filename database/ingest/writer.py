@@ -0,0 +1,369 @@
+# File: database/ingest/writer.py
+# Purpose: Bulk, set-based writes of parsed runs with per-batch dedup on result_hash
+# Notes: Rows are plain dicts keyed by `runs` column names (plus `params_json` and
+#        `params_hash`, resolved to `param_set_id` per batch); ORM objects are only
+#        built on the "orm" fallback path
+
+from __future__ import annotations
+
+import enum
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Iterable
+
+from loguru import logger
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from database.ingest.hashing import canonical_inputs, param_set_hash
+from database.models import ParamSet, QuarantinedPass, Run
+from database.rollups import apply_rollups
+import settings
+
+RunRow = dict[str, Any]
+
+WRITE_METHODS = ("auto", "core", "copy", "orm")
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+_IN_CHUNK = 500
+
+_STAGE_TABLE = "_runs_stage"
+
+
+@dataclass
+class IngestStats:
+    """Counters collected while ingesting one file or job."""
+
+    parsed: int = 0
+    skipped_zero_trades: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid_cells: int = 0
+    forward_passes: int = 0
+    forward_matched: int = 0
+    quarantined: int = 0
+
+    def merge(self, other: "IngestStats") -> None:
+        self.parsed += other.parsed
+        self.skipped_zero_trades += other.skipped_zero_trades
+        self.inserted += other.inserted
+        self.duplicates += other.duplicates
+        self.invalid_cells += other.invalid_cells
+        self.forward_passes += other.forward_passes
+        self.forward_matched += other.forward_matched
+        self.quarantined += other.quarantined
+
+
+def find_existing_hashes(session: Session, hashes: Iterable[str]) -> set[str]:
+    """Return the subset of `hashes` already stored in `runs`, one IN query per chunk."""
+    pending = list(hashes)
+    found: set[str] = set()
+    for i in range(0, len(pending), _IN_CHUNK):
+        chunk = pending[i : i + _IN_CHUNK]
+        found.update(
+            session.scalars(select(Run.result_hash).where(Run.result_hash.in_(chunk)))
+        )
+    return found
+
+
+def _dialect_insert(session: Session) -> Any:
+    """INSERT with ON CONFLICT support for this backend, or None."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def _find_param_sets(session: Session, hashes: Iterable[str]) -> dict[str, int]:
+    pending = list(hashes)
+    found: dict[str, int] = {}
+    for i in range(0, len(pending), _IN_CHUNK):
+        chunk = pending[i : i + _IN_CHUNK]
+        found.update(
+            session.execute(
+                select(ParamSet.params_hash, ParamSet.id).where(
+                    ParamSet.params_hash.in_(chunk)
+                )
+            ).all()
+        )
+    return found
+
+
+def resolve_param_sets(
+    session: Session, rows: Iterable[RunRow], known: dict[str, int]
+) -> None:
+    """
+    Set `param_set_id` on every row, upserting the parameter sets not in
+    `known` (params_hash -> id, updated in place) with one SELECT per chunk
+    and one bulk INSERT ... ON CONFLICT DO NOTHING.
+    """
+    rows = list(rows)
+    wanted: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        key = row.get("params_hash")
+        if key is None:
+            params = row.get("params_json") or {}
+            key = row["params_hash"] = param_set_hash(canonical_inputs(params))
+        if key not in known and key not in wanted:
+            wanted[key] = row.get("params_json") or {}
+
+    if wanted:
+        known.update(_find_param_sets(session, wanted))
+        fresh = [
+            {"params_hash": key, "params": params}
+            for key, params in wanted.items()
+            if key not in known
+        ]
+        if fresh:
+            table = ParamSet.__table__
+            dialect_insert = _dialect_insert(session)
+            if dialect_insert is None:
+                session.execute(insert(table), fresh)
+            else:
+                stmt = (
+                    dialect_insert(table)
+                    .on_conflict_do_nothing(index_elements=["params_hash"])
+                    .returning(table.c.params_hash, table.c.id)
+                )
+                known.update(session.execute(stmt, fresh).all())
+            missing = [r["params_hash"] for r in fresh if r["params_hash"] not in known]
+            if missing:
+                # Inserted by another writer meanwhile, or by a backend without RETURNING
+                known.update(_find_param_sets(session, missing))
+
+    for row in rows:
+        row["param_set_id"] = known[row["params_hash"]]
+
+
+def insert_runs_ignore_duplicates(session: Session, rows: list[RunRow]) -> list[RunRow]:
+    """
+    Insert `rows` into `runs` with one executemany, skipping known result_hash values.
+
+    Uses ON CONFLICT (result_hash) DO NOTHING on PostgreSQL and SQLite, and
+    a single IN lookup on other backends. Returns the rows that were inserted.
+    """
+    if not rows:
+        return []
+
+    table = Run.__table__
+    dialect_insert = _dialect_insert(session)
+
+    if dialect_insert is not None:
+        stmt = (
+            dialect_insert(table)
+            .on_conflict_do_nothing(index_elements=["result_hash"])
+            .returning(table.c.result_hash)
+        )
+        inserted = set(session.scalars(stmt, rows))
+        return [r for r in rows if r["result_hash"] in inserted]
+
+    existing = find_existing_hashes(session, (r["result_hash"] for r in rows))
+    fresh = [r for r in rows if r["result_hash"] not in existing]
+    if fresh:
+        session.execute(insert(table), fresh)
+    return fresh
+
+
+def _copy_columns() -> list[str]:
+    return [c.name for c in Run.__table__.columns if c.name != "id"]
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value: Any) -> str:
+    """Encode one value for COPY ... FROM STDIN (text format, NULL as \\N)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif isinstance(value, enum.Enum):
+        value = value.name
+    elif isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _with_defaults(row: RunRow, now: datetime) -> RunRow:
+    """Fill the column defaults COPY would otherwise skip (it bypasses SQLAlchemy)."""
+    full = dict(row)
+    for column in Run.__table__.columns:
+        if column.name == "id" or full.get(column.name) is not None:
+            continue
+        if column.default is not None and column.default.is_scalar:
+            full[column.name] = column.default.arg
+        elif column.server_default is not None:
+            full[column.name] = now
+        else:
+            full.setdefault(column.name, None)
+    return full
+
+
+def copy_runs_ignore_duplicates(session: Session, rows: list[RunRow]) -> list[RunRow]:
+    """
+    PostgreSQL only: COPY `rows` into a temp staging table, then move them into
+    `runs` with one INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+
+    Returns the rows that were inserted.
+    """
+    if not rows:
+        return []
+
+    columns = _copy_columns()
+    col_list = ", ".join(columns)
+    now = datetime.utcnow()
+
+    buf = io.StringIO()
+    for row in rows:
+        full = _with_defaults(row, now)
+        buf.write("\t".join(_copy_value(full[c]) for c in columns))
+        buf.write("\n")
+    buf.seek(0)
+
+    dbapi_conn = session.connection().connection.driver_connection
+    with dbapi_conn.cursor() as cur:
+        cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {_STAGE_TABLE} AS "
+            f"SELECT {col_list} FROM runs WITH NO DATA"
+        )
+        cur.copy_expert(f"COPY {_STAGE_TABLE} ({col_list}) FROM STDIN", buf)
+        cur.execute(
+            f"INSERT INTO runs ({col_list}) SELECT {col_list} FROM {_STAGE_TABLE} "
+            "ON CONFLICT (result_hash) DO NOTHING RETURNING result_hash"
+        )
+        inserted = {result_hash for (result_hash,) in cur.fetchall()}
+        cur.execute(f"TRUNCATE {_STAGE_TABLE}")
+    return [r for r in rows if r["result_hash"] in inserted]
+
+
+_RUN_COLUMNS = frozenset(c.name for c in Run.__table__.columns)
+
+
+def run_fields(row: RunRow) -> RunRow:
+    """Only the keys of `row` that are `runs` columns (e.g. for Run(**...))."""
+    return {key: value for key, value in row.items() if key in _RUN_COLUMNS}
+
+
+def add_runs_via_orm(session: Session, rows: list[RunRow]) -> list[RunRow]:
+    """Fallback: build Run objects for rows not yet in the DB and add them to the session."""
+    existing = find_existing_hashes(session, (r["result_hash"] for r in rows))
+    fresh = [r for r in rows if r["result_hash"] not in existing]
+    session.add_all([Run(**run_fields(r)) for r in fresh])
+    session.flush()
+    return fresh
+
+
+def resolve_write_method(session: Session, method: str = "auto") -> str:
+    """Pick the concrete write path for `method` on this session's backend."""
+    if method not in WRITE_METHODS:
+        raise ValueError(f"Unknown ingest write method: {method!r} (use one of {WRITE_METHODS})")
+
+    dialect = session.get_bind().dialect
+    can_copy = dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+    if method == "auto":
+        return "copy" if can_copy else "core"
+    if method == "copy" and not can_copy:
+        logger.warning("⚠️ COPY needs PostgreSQL + psycopg2; falling back to Core inserts.")
+        return "core"
+    return method
+
+
+_WRITERS = {
+    "core": insert_runs_ignore_duplicates,
+    "copy": copy_runs_ignore_duplicates,
+    "orm": add_runs_via_orm,
+}
+
+
+class RunWriter:
+    """
+    Buffers run rows and writes them to `runs` in batches.
+
+    Duplicates inside a pending batch are dropped in memory; duplicates
+    against the database are skipped by the insert itself, so each batch
+    costs one statement (or one COPY) instead of a query per pass. With
+    `commit_batches` the session is committed after every batch, which
+    keeps transactions and memory bounded on very large jobs.
+
+    The parameter sets of a batch are upserted into `param_sets` just
+    before it is written; ids are remembered for the writer's lifetime.
+    The rows actually inserted are folded into the rollup tables in the
+    same transaction (database/rollups.py).
+    Quarantined passes are buffered alongside and written with the next
+    batch. `on_batch` is called with the rows of every flush (runs and
+    quarantined passes) inside its transaction, e.g. to move an ingest
+    checkpoint forward.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        batch_size: int | None = None,
+        method: str | None = None,
+        commit_batches: bool = False,
+    ) -> None:
+        self.session = session
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.method = resolve_write_method(session, method or settings.INGEST_WRITE_METHOD)
+        self.commit_batches = commit_batches
+        self.stats = IngestStats()
+        self.on_batch: Callable[[list[RunRow]], None] | None = None
+        self._pending: dict[str, RunRow] = {}
+        self._quarantined: list[dict[str, Any]] = []
+        self._param_sets: dict[str, int] = {}  # params_hash -> param_sets.id
+        self._write = _WRITERS[self.method]
+
+    def add(self, row: RunRow) -> None:
+        result_hash = row["result_hash"]
+        if result_hash in self._pending:
+            self.stats.duplicates += 1
+            return
+        self._pending[result_hash] = row
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def extend(self, rows: Iterable[RunRow]) -> None:
+        for row in rows:
+            self.add(row)
+
+    def quarantine(self, row: dict[str, Any]) -> None:
+        """Queue a `quarantined_passes` row (already counted by the parser)."""
+        self._quarantined.append(row)
+        if len(self._quarantined) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending and not self._quarantined:
+            return
+
+        batch = list(self._pending.values())
+        self._pending.clear()
+
+        # Pending ORM objects (e.g. the parent Job) must hit the DB before Core inserts
+        self.session.flush()
+        quarantined, self._quarantined = self._quarantined, []
+        if quarantined:
+            self.session.execute(insert(QuarantinedPass.__table__), quarantined)
+
+        inserted: list[RunRow] = []
+        if batch:
+            resolve_param_sets(self.session, batch, self._param_sets)
+            inserted = self._write(self.session, batch)
+            apply_rollups(self.session, inserted)
+        self.stats.inserted += len(inserted)
+        self.stats.duplicates += len(batch) - len(inserted)
+
+        if len(batch) != len(inserted):
+            logger.debug(f"🛑 {len(batch) - len(inserted)} duplicate runs skipped in batch")
+        if self.on_batch is not None:
+            self.on_batch(batch + quarantined)
+
+        if self.commit_batches:
+            self.session.commit()
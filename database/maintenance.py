@@ -0,0 +1,451 @@
+# File: database/maintenance.py
+# Purpose: Set-based, chunked job delete / archive / move to a cold-storage database
+# Notes: Deleting a Job through the ORM loads every Run first (Job.runs cascades). These
+#        functions never build Run objects: they walk a job's runs in id order,
+#        `chunk_size` rows at a time, issue a few statements per chunk and commit after
+#        each one. Memory stays flat and no write transaction lasts longer than one
+#        chunk. The parameter-set rollups of the deleted runs are recomputed once, after
+#        the last chunk; an interrupted call is finished by running it again, followed
+#        by `python -m database.rollups` to recompute those rollups.
+#            python -m database.maintenance delete|archive|unarchive JOB_ID
+#            python -m database.maintenance move JOB_ID --to sqlite:///cold.db
+
+from __future__ import annotations
+
+import argparse
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from loguru import logger
+from sqlalchemy import Table, and_, delete, exists, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from database.models import (
+    IngestCheckpoint,
+    IngestedFile,
+    Job,
+    ParamSet,
+    QuarantinedPass,
+    Run,
+    RunRollup,
+    Strategy,
+    User,
+)
+from database.rollups import apply_rollups, rebuild_rollups, refresh_param_set_rollups
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+_IN_CHUNK = 500
+
+# Per-job bookkeeping tables, emptied before the job row itself
+_JOB_TABLES: tuple[type[Any], ...] = (QuarantinedPass, IngestCheckpoint, IngestedFile)
+
+Progress = Callable[[str, int, int], None]  # (step, runs done, runs total)
+
+
+def log_progress(step: str, done: int, total: int) -> None:
+    percent = f" ({done / total:.0%})" if total else ""
+    logger.info(f"🧹 {step}: {done}/{total} runs{percent}")
+
+
+def _require_job(session: Session, job_id: str) -> None:
+    jobs = Job.__table__
+    if session.scalar(select(jobs.c.id).where(jobs.c.id == job_id)) is None:
+        raise ValueError(f"⚠️ No job {job_id!r}")
+
+
+def count_job_runs(session: Session, job_id: str) -> int:
+    runs = Run.__table__
+    return session.scalar(select(func.count()).where(runs.c.job_id == job_id)) or 0
+
+
+def job_run_chunks(
+    session: Session, job_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[tuple[Any, int]]:
+    """
+    Yield (condition, rows) for consecutive chunks of the job's runs.
+
+    Each condition is an id range of the job (a primary-key range scan); the
+    next chunk is looked up past the last id of the previous one, after the
+    caller is done with (and may have deleted) it.
+    """
+    runs = Run.__table__
+    in_job = runs.c.job_id == job_id
+    last: int | None = None
+    while True:
+        query = select(runs.c.id).where(in_job)
+        if last is not None:
+            query = query.where(runs.c.id > last)
+        ids = session.scalars(query.order_by(runs.c.id).limit(chunk_size)).all()
+        if not ids:
+            return
+        last = ids[-1]
+        yield and_(in_job, runs.c.id.between(ids[0], last)), len(ids)
+
+
+def _delete_orphaned_param_sets(session: Session, param_set_ids: list[int]) -> int:
+    runs, param_sets = Run.__table__, ParamSet.__table__
+    deleted = 0
+    for i in range(0, len(param_set_ids), _IN_CHUNK):
+        chunk = param_set_ids[i : i + _IN_CHUNK]
+        deleted += session.execute(
+            delete(param_sets).where(
+                param_sets.c.id.in_(chunk),
+                ~exists().where(runs.c.param_set_id == param_sets.c.id),
+            )
+        ).rowcount
+    return deleted
+
+
+def delete_runs(session: Session, condition: Any) -> tuple[int, set[int]]:
+    """
+    Delete the runs matching `condition`.
+
+    Rollups are the caller's business: returns (runs deleted, the parameter
+    sets they used), the latter for release_param_sets() once the caller has
+    deleted all the runs it is going to.
+    """
+    runs = Run.__table__
+    param_set_ids = set(
+        session.scalars(
+            select(runs.c.param_set_id)
+            .where(condition, runs.c.param_set_id.is_not(None))
+            .distinct()
+        )
+    )
+    deleted = session.execute(delete(runs).where(condition)).rowcount
+    return deleted, param_set_ids
+
+
+def release_param_sets(session: Session, param_set_ids: set[int]) -> int:
+    """
+    Recompute the rollups of parameter sets that lost runs, in one pass, and
+    delete the ones no run uses any more. Returns the parameter sets deleted.
+    """
+    ids = sorted(param_set_ids)
+    refresh_param_set_rollups(session, ids)
+    deleted = _delete_orphaned_param_sets(session, ids)
+    session.commit()
+    return deleted
+
+
+def _delete_job_rows(session: Session, table: Table, job_id: str, chunk_size: int) -> int:
+    # Lowest ids first: everything up to the chunk's last id goes in one statement
+    deleted = 0
+    while True:
+        ids = session.scalars(
+            select(table.c.id)
+            .where(table.c.job_id == job_id)
+            .order_by(table.c.id)
+            .limit(chunk_size)
+        ).all()
+        if not ids:
+            return deleted
+        deleted += session.execute(
+            delete(table).where(table.c.job_id == job_id, table.c.id <= ids[-1])
+        ).rowcount
+        session.commit()
+
+
+def delete_job(
+    session: Session,
+    job_id: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Progress | None = log_progress,
+    parquet_root: Path | None = None,
+) -> dict[str, int]:
+    """
+    Delete a job with its runs, rollups, manifest, checkpoints and quarantined
+    passes, plus the parameter sets only it used. With `parquet_root` its
+    partitions are removed from that Parquet store too.
+
+    Returns the rows deleted per table.
+    """
+    _require_job(session, job_id)
+    total = count_job_runs(session, job_id)
+    deleted = {"runs": 0, "param_sets": 0}
+
+    # The job's (symbol, month) rollups go at once; the rest follows chunk by chunk
+    run_rollups = RunRollup.__table__
+    deleted[run_rollups.name] = session.execute(
+        delete(run_rollups).where(run_rollups.c.job_id == job_id)
+    ).rowcount
+    session.commit()
+
+    done = 0
+    touched: set[int] = set()
+    for condition, rows in job_run_chunks(session, job_id, chunk_size):
+        runs, param_set_ids = delete_runs(session, condition)
+        session.commit()
+        deleted["runs"] += runs
+        touched |= param_set_ids
+        done += rows
+        if progress is not None:
+            progress(f"delete {job_id}", done, total)
+    deleted["param_sets"] = release_param_sets(session, touched)
+
+    for model in _JOB_TABLES:
+        table = model.__table__
+        deleted[table.name] = _delete_job_rows(session, table, job_id, chunk_size)
+    jobs = Job.__table__
+    deleted[jobs.name] = session.execute(delete(jobs).where(jobs.c.id == job_id)).rowcount
+    session.commit()
+
+    if parquet_root is not None:
+        from database.parquet_store import job_dir
+
+        shutil.rmtree(job_dir(parquet_root, job_id), ignore_errors=True)
+
+    logger.info(f"🗑️ Deleted job {job_id}: {deleted}")
+    return deleted
+
+
+def archive_job(
+    session: Session,
+    job_id: str,
+    archived: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Progress | None = log_progress,
+) -> int:
+    """Set `is_archived` on a job and all of its runs. Returns the runs updated."""
+    _require_job(session, job_id)
+    runs, jobs = Run.__table__, Job.__table__
+    step = f"{'archive' if archived else 'unarchive'} {job_id}"
+    total = count_job_runs(session, job_id)
+
+    done = updated = 0
+    for condition, rows in job_run_chunks(session, job_id, chunk_size):
+        updated += session.execute(
+            update(runs).where(condition).values(is_archived=archived)
+        ).rowcount
+        session.commit()
+        done += rows
+        if progress is not None:
+            progress(step, done, total)
+
+    # The job is flagged last, once every run carries the flag
+    session.execute(update(jobs).where(jobs.c.id == job_id).values(is_archived=archived))
+    session.commit()
+    return updated
+
+
+def _copy_row(session: Session, cold: Session, table: Table, key: Any) -> None:
+    """Copy one row (by primary key) unless `cold` has it already."""
+    pk = table.primary_key.columns.values()[0]
+    if cold.scalar(select(pk).where(pk == key)) is None:
+        row = session.execute(select(table).where(pk == key)).mappings().one()
+        cold.execute(insert(table), dict(row))
+
+
+def _copy_job_rows(
+    session: Session, cold: Session, table: Table, job_id: str, chunk_size: int
+) -> int:
+    """Replace the job's rows of `table` in `cold` with ours (ids are cold's own)."""
+    cold.execute(delete(table).where(table.c.job_id == job_id))
+    columns = [c for c in table.columns if c.name != "id"]
+    copied = 0
+    last = 0
+    while True:
+        rows = session.execute(
+            select(table.c.id, *columns)
+            .where(table.c.job_id == job_id, table.c.id > last)
+            .order_by(table.c.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        last = rows[-1].id
+        values = [{c.name: row._mapping[c.name] for c in columns} for row in rows]
+        cold.execute(insert(table), values)
+        copied += len(rows)
+    cold.commit()
+    return copied
+
+
+def _hashes_in_job(session: Session, job_id: str, hashes: list[str]) -> set[str]:
+    """The `hashes` that runs of `job_id` carry in `session`'s database."""
+    runs = Run.__table__
+    found: set[str] = set()
+    for i in range(0, len(hashes), _IN_CHUNK):
+        found.update(
+            session.scalars(
+                select(runs.c.result_hash).where(
+                    runs.c.job_id == job_id,
+                    runs.c.result_hash.in_(hashes[i : i + _IN_CHUNK]),
+                )
+            )
+        )
+    return found
+
+
+def move_job(
+    session: Session,
+    cold: Session,
+    job_id: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Progress | None = log_progress,
+    parquet_root: Path | None = None,
+) -> dict[str, int]:
+    """
+    Move a job from `session`'s database to the cold-storage database of `cold`.
+
+    Runs are written with a RunWriter (parameter sets and rollups are
+    maintained there as on ingest). A run is deleted here only once `cold`
+    holds it for this job: after each chunk is committed there, its
+    result_hashes are looked up in cold and only the confirmed runs go.
+    Runs without a result_hash cannot be deduplicated and are copied as
+    they are. A run whose result_hash belongs to another job in cold stays
+    here, and so does the job (with its rollups rebuilt); otherwise the
+    manifest and quarantined passes follow and the job is deleted here as by
+    delete_job(). Moving again after an interruption skips the runs already
+    copied (by result_hash).
+    """
+    from database.ingest.writer import RunWriter, resolve_param_sets, run_fields
+
+    _require_job(session, job_id)
+    jobs = Job.__table__
+    job = session.execute(select(jobs).where(jobs.c.id == job_id)).mappings().one()
+    # The job's owner and strategy first, for the foreign keys
+    for column, model in (("user_id", User), ("strategy_id", Strategy)):
+        if job[column] is not None:
+            _copy_row(session, cold, model.__table__, job[column])
+    _copy_row(session, cold, jobs, job_id)
+    cold.commit()
+
+    runs, param_sets = Run.__table__, ParamSet.__table__
+    columns = [c for c in runs.columns if c.name not in ("id", "param_set_id")]
+    known_sets: dict[str, int] = {}
+    source = runs.outerjoin(param_sets, runs.c.param_set_id == param_sets.c.id)
+    writer = RunWriter(cold, batch_size=chunk_size)
+    total = count_job_runs(session, job_id)
+
+    run_rollups = RunRollup.__table__
+    session.execute(delete(run_rollups).where(run_rollups.c.job_id == job_id))
+    session.commit()
+
+    done = copied = kept = 0
+    touched: set[int] = set()
+    for condition, rows in job_run_chunks(session, job_id, chunk_size):
+        batch = [
+            dict(row)
+            for row in session.execute(
+                select(
+                    runs.c.id,
+                    *columns,
+                    param_sets.c.params.label("params_json"),
+                    param_sets.c.params_hash,
+                )
+                .select_from(source)
+                .where(condition)
+            ).mappings()
+        ]
+        hot_ids = {row.pop("id"): row for row in batch}
+        unhashed = [row for row in batch if row["result_hash"] is None]
+        writer.extend(row for row in batch if row["result_hash"] is not None)
+        writer.flush()
+        if unhashed:
+            resolve_param_sets(cold, unhashed, known_sets)
+            cold.execute(insert(runs), [run_fields(row) for row in unhashed])
+            apply_rollups(cold, unhashed)
+            copied += len(unhashed)
+        cold.commit()
+
+        in_cold = _hashes_in_job(
+            cold, job_id, [r["result_hash"] for r in batch if r["result_hash"] is not None]
+        )
+        moved_ids = [
+            run_id
+            for run_id, row in hot_ids.items()
+            if row["result_hash"] is None or row["result_hash"] in in_cold
+        ]
+        kept += len(hot_ids) - len(moved_ids)
+        for i in range(0, len(moved_ids), _IN_CHUNK):
+            touched |= delete_runs(session, runs.c.id.in_(moved_ids[i : i + _IN_CHUNK]))[1]
+        session.commit()
+        done += rows
+        if progress is not None:
+            progress(f"move {job_id}", done, total)
+    release_param_sets(session, touched)
+
+    moved = {
+        "runs": writer.stats.inserted + copied,
+        "duplicates": writer.stats.duplicates - kept,
+        "kept": kept,
+    }
+    for model in (QuarantinedPass, IngestedFile):
+        table = model.__table__
+        moved[table.name] = _copy_job_rows(session, cold, table, job_id, chunk_size)
+
+    if kept:
+        rebuild_rollups(session, job_id)
+        session.commit()
+        logger.warning(
+            f"⚠️ {kept} runs of {job_id} have a result_hash another job holds in cold "
+            "storage; they and the job stay here"
+        )
+    else:
+        delete_job(session, job_id, chunk_size, progress=None, parquet_root=parquet_root)
+    logger.info(f"🧊 Moved job {job_id} to cold storage: {moved}")
+    return moved
+
+
+# -- CLI --------------------------------------------------------------------
+
+
+def main(argv: list[str] | None = None) -> Any:
+    parser = argparse.ArgumentParser(
+        description="Delete, archive or move a job without loading its runs."
+    )
+    parser.add_argument("action", choices=["delete", "archive", "unarchive", "move"])
+    parser.add_argument("job_id")
+    parser.add_argument("--to", help="cold-storage database URL (move)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--keep-parquet",
+        action="store_true",
+        help="leave the job's partitions in the Parquet store (delete, move)",
+    )
+    args = parser.parse_args(argv)
+    if args.action == "move" and not args.to:
+        parser.error("move needs --to DATABASE_URL")
+
+    from settings import PARQUET_ROOT
+
+    from database.session import get_session
+
+    parquet_root = None if args.keep_parquet else PARQUET_ROOT
+    with get_session() as session:
+        if args.action == "delete":
+            return delete_job(
+                session, args.job_id, args.chunk_size, parquet_root=parquet_root
+            )
+        if args.action in ("archive", "unarchive"):
+            return archive_job(
+                session, args.job_id, args.action == "archive", args.chunk_size
+            )
+
+        from sqlalchemy import create_engine
+
+        from database.session import bootstrap_sqlite_schema
+        from database.sqlite_profile import (
+            apply_sqlite_profile,
+            sqlite_profile_from_settings,
+        )
+
+        cold_engine = create_engine(args.to, future=True)
+        apply_sqlite_profile(cold_engine, sqlite_profile_from_settings())
+        # Migrates a SQLite file to head; a PostgreSQL one needs `alembic upgrade head`
+        bootstrap_sqlite_schema(cold_engine)
+        try:
+            with get_session(cold_engine) as cold:
+                return move_job(
+                    session, cold, args.job_id, args.chunk_size, parquet_root=parquet_root
+                )
+        finally:
+            cold_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# File: database/migrations.py
+# Purpose: Bring a SQLite database file to the Alembic head revision on engine init
+# Notes: A new file gets create_all() and is stamped at head. A versioned file is
+#        upgraded. A file from before the app stamped SQLite (tables made by
+#        create_all only) is matched to the last revision whose changes it has,
+#        stamped there and upgraded, so old `runs` tables get their new columns,
+#        indexes and backfills. PostgreSQL is still migrated by hand:
+#            alembic upgrade head
+
+from __future__ import annotations
+
+from typing import Callable
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from loguru import logger
+from sqlalchemy import Connection, Engine, inspect, text
+from sqlalchemy.engine.reflection import Inspector
+
+from database.models import Base
+from settings import APP_ROOT
+
+ALEMBIC_DIR = APP_ROOT / "alembic"
+
+BASE_REVISION = "c5d54d211e89"
+
+# In revision order: each revision after BASE_REVISION, the tables it creates and
+# a check for whether an unversioned database already has its changes
+LEGACY_REVISIONS: list[tuple[str, tuple[str, ...], Callable[[Inspector], bool]]] = [
+    ("32858b5e19a7", ("ingested_files",), lambda i: i.has_table("ingested_files")),
+    (
+        "f06fc7f43626",
+        (),
+        lambda i: "forward_start_date" in {c["name"] for c in i.get_columns("runs")},
+    ),
+    (
+        "7286803258b6",
+        ("ingest_checkpoints", "quarantined_passes"),
+        lambda i: i.has_table("ingest_checkpoints"),
+    ),
+    (
+        "de457ce9e2af",
+        (),
+        lambda i: "ix_runs_job_symbol_month" in {x["name"] for x in i.get_indexes("runs")},
+    ),
+    (
+        "25b8406f2c3a",
+        ("param_sets",),
+        lambda i: "param_set_id" in {c["name"] for c in i.get_columns("runs")},
+    ),
+    (
+        "1549d121f9bd",
+        ("param_set_rollups", "run_rollups"),
+        lambda i: i.has_table("run_rollups"),
+    ),
+    (
+        "9b3e6f0d2a41",
+        (),
+        lambda i: "ix_runs_job_id" in {x["name"] for x in i.get_indexes("runs")},
+    ),
+]
+
+
+def alembic_config(connection: Connection | None = None) -> Config:
+    """Alembic config for the repo's migrations, run on `connection` if given."""
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def legacy_revision(inspector: Inspector) -> str:
+    """The last revision an unversioned database has the changes of."""
+    revision = BASE_REVISION
+    for candidate, _, applied in LEGACY_REVISIONS:
+        if not applied(inspector):
+            break
+        revision = candidate
+    return revision
+
+
+def _drop_premature_tables(connection: Connection, revision: str) -> None:
+    """
+    Drop the tables of revisions after `revision` that create_all() already
+    made on the old layout; the migrations create (and backfill) them again.
+    """
+    tables: list[str] = []
+    later = revision == BASE_REVISION
+    for candidate, created, _ in LEGACY_REVISIONS:
+        if later:
+            tables.extend(created)
+        later = later or candidate == revision
+    for table in reversed(tables):
+        if inspect(connection).has_table(table):
+            connection.execute(text(f'DROP TABLE "{table}"'))
+            logger.info(f"🧹 Dropped {table}; a later migration recreates it")
+
+
+def upgrade_sqlite_schema(engine: Engine) -> None:
+    """Create, stamp or migrate the schema of a SQLite database file to head."""
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+    with engine.begin() as connection:
+        tables = set(inspect(connection).get_table_names()) - {"alembic_version"}
+        config = alembic_config(connection)
+
+        if not tables:
+            Base.metadata.create_all(bind=connection)
+            command.stamp(config, "head")
+            logger.info("✅ SQLite schema created.")
+            return
+
+        current = MigrationContext.configure(connection).get_current_revision()
+        if current == head:
+            return
+        if current is None:
+            current = legacy_revision(inspect(connection))
+            _drop_premature_tables(connection, current)
+            command.stamp(config, current)
+            logger.info(f"🏷️ Unversioned SQLite schema matches revision {current}")
+
+        command.upgrade(config, "head")
+        logger.info(f"✅ SQLite schema upgraded from {current} to {head}.")
@@ -7,11 +7,15 @@ from typing import List, Optional, Dict, Union
 
 import enum
 from sqlalchemy import (
+    BigInteger,
     ForeignKey,
     JSON,
     Text,
     Enum,
+    Index,
+    UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.orm import (
     DeclarativeBase,
@@ -114,7 +118,15 @@ class Job(Base):
 # Result of a single optimization pass
 class Run(Base):
     __tablename__ = "runs"
-
+    # Composite indexes for the dashboard filters, /stats aggregates, per-job rankings
+    # and the id-ordered chunks of database.maintenance
+    __table_args__ = (
+        Index("ix_runs_job_id", "job_id", "id"),
+        Index("ix_runs_job_symbol_month", "job_id", "symbol", "run_month"),
+        Index("ix_runs_symbol_month_profit", "symbol", "run_month", "profit"),
+        Index("ix_runs_job_custom_score", "job_id", text("custom_score DESC")),
+        Index("ix_runs_archived_status", "is_archived", "status"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     job_id: Mapped[str] = mapped_column(ForeignKey("jobs.id"))
@@ -135,11 +147,29 @@ class Run(Base):
     recovery_factor: Mapped[Optional[float]]
     profit_factor: Mapped[Optional[float]]
 
+    # Forward (out-of-sample) metrics of the same parameter set, from the .fwd.xml
+    forward_start_date: Mapped[Optional[date]]
+    forward_end_date: Mapped[Optional[date]]
+    forward_result: Mapped[Optional[float]]
+    forward_profit: Mapped[Optional[float]]
+    forward_drawdown: Mapped[Optional[float]]
+    forward_custom_score: Mapped[Optional[float]]
+    forward_sharpe_ratio: Mapped[Optional[float]]
+    forward_trades: Mapped[Optional[int]]
+    forward_expected_payoff: Mapped[Optional[float]]
+    forward_recovery_factor: Mapped[Optional[float]]
+    forward_profit_factor: Mapped[Optional[float]]
+
     # Metadata
     symbol: Mapped[str]
     run_month: Mapped[str]
     is_full_month: Mapped[bool]
-    params_json: Mapped[Optional[dict]] = mapped_column(JSON)
+    param_set_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("param_sets.id"), index=True
+    )
+    param_set: Mapped[Optional["ParamSet"]] = relationship(
+        back_populates="runs", lazy="joined"
+    )
     result_hash: Mapped[Optional[str]] = mapped_column(unique=True)
 
     # Audit
@@ -154,3 +184,123 @@ class Run(Base):
     run_label: Mapped[Optional[str]] = mapped_column(nullable=True)
     status: Mapped[RunStatus] = mapped_column(Enum(RunStatus), default=RunStatus.new)
     is_archived: Mapped[bool] = mapped_column(default=False)
+
+    @property
+    def params_json(self) -> Optional[dict]:
+        """The pass inputs, stored once per distinct set in `param_sets`."""
+        return self.param_set.params if self.param_set is not None else None
+
+
+# One distinct set of EA inputs; the runs of every symbol and month that used it share the row
+class ParamSet(Base):
+    __tablename__ = "param_sets"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    params_hash: Mapped[str] = mapped_column(unique=True)  # SHA-256 of the canonical JSON
+    params: Mapped[dict] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    runs: Mapped[List["Run"]] = relationship(back_populates="param_set")
+
+
+# One row per XML ingested for a job — lets re-ingest skip unchanged files
+class IngestedFile(Base):
+    __tablename__ = "ingested_files"
+    __table_args__ = (UniqueConstraint("job_id", "path", name="uq_ingested_file"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(ForeignKey("jobs.id"), index=True)
+    path: Mapped[str]  # relative to the job folder, POSIX separators
+
+    # File identity: size + mtime for the O(1) check, digest to confirm changes
+    size: Mapped[int] = mapped_column(BigInteger)
+    mtime_ns: Mapped[int] = mapped_column(BigInteger)
+    digest: Mapped[str]
+
+    status: Mapped[str]  # "ingested" or "empty"
+    passes: Mapped[int] = mapped_column(default=0)
+    runs_inserted: Mapped[int] = mapped_column(default=0)
+    duplicates: Mapped[int] = mapped_column(default=0)
+    ingested_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
+
+
+# How far a partially ingested XML got — a retry resumes after `last_pass`
+class IngestCheckpoint(Base):
+    __tablename__ = "ingest_checkpoints"
+    __table_args__ = (UniqueConstraint("job_id", "path", name="uq_ingest_checkpoint"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(ForeignKey("jobs.id"), index=True)
+    path: Mapped[str]  # absolute, POSIX separators
+    digest: Mapped[str]  # the checkpoint only applies to this exact file content
+
+    last_pass: Mapped[int]  # every pass up to and including this one is committed
+    runs_committed: Mapped[int] = mapped_column(default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
+
+
+# Passes whose metrics could not be parsed; kept verbatim instead of failing the file
+class QuarantinedPass(Base):
+    __tablename__ = "quarantined_passes"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(ForeignKey("jobs.id"), index=True)
+    source: Mapped[str]  # report (or frame file) name
+    pass_number: Mapped[int]
+    raw_values: Mapped[dict] = mapped_column(JSON)  # header -> cell text
+    error: Mapped[str]
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+
+# Running aggregates of one group of runs (see database/rollups.py). For every
+# metric: how many runs had a value, their sum, min, max and sum of squares,
+# so means and standard deviations follow without touching `runs`.
+class RollupStats:
+    runs: Mapped[int] = mapped_column(default=0)
+
+    profit_n: Mapped[int] = mapped_column(default=0)
+    profit_sum: Mapped[float] = mapped_column(default=0.0)
+    profit_min: Mapped[Optional[float]]
+    profit_max: Mapped[Optional[float]]
+    profit_sumsq: Mapped[float] = mapped_column(default=0.0)
+
+    drawdown_n: Mapped[int] = mapped_column(default=0)
+    drawdown_sum: Mapped[float] = mapped_column(default=0.0)
+    drawdown_min: Mapped[Optional[float]]
+    drawdown_max: Mapped[Optional[float]]
+    drawdown_sumsq: Mapped[float] = mapped_column(default=0.0)
+
+    trades_n: Mapped[int] = mapped_column(default=0)
+    trades_sum: Mapped[float] = mapped_column(default=0.0)
+    trades_min: Mapped[Optional[float]]
+    trades_max: Mapped[Optional[float]]
+    trades_sumsq: Mapped[float] = mapped_column(default=0.0)
+
+    custom_score_n: Mapped[int] = mapped_column(default=0)
+    custom_score_sum: Mapped[float] = mapped_column(default=0.0)
+    custom_score_min: Mapped[Optional[float]]
+    custom_score_max: Mapped[Optional[float]]
+    custom_score_sumsq: Mapped[float] = mapped_column(default=0.0)
+
+
+# Rollup per (job, symbol, run_month) — what the summary endpoint and dashboard read
+class RunRollup(RollupStats, Base):
+    __tablename__ = "run_rollups"
+
+    job_id: Mapped[str] = mapped_column(ForeignKey("jobs.id"), primary_key=True)
+    symbol: Mapped[str] = mapped_column(primary_key=True)
+    run_month: Mapped[str] = mapped_column(primary_key=True)
+
+
+# Rollup per (parameter set, symbol) — how one set of inputs did across months
+class ParamSetRollup(RollupStats, Base):
+    __tablename__ = "param_set_rollups"
+
+    param_set_id: Mapped[int] = mapped_column(
+        ForeignKey("param_sets.id"), primary_key=True
+    )
+    symbol: Mapped[str] = mapped_column(primary_key=True)
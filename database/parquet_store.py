@@ -0,0 +1,303 @@
+# File: database/parquet_store.py
+# Purpose: Columnar sidecar of ingested optimization passes (Parquet, hive-partitioned)
+# Notes: Layout is <root>/job_id=<job>/symbol=<symbol>/run_month=<YYYY-MM>/<xml stem>.parquet
+#        with every params_json key expanded into its own typed column. Sources ingested
+#        a batch at a time write <stem>.<first pass>.parquet parts until merge_parts()
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Sequence
+from urllib.parse import quote
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from loguru import logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PARTITION_COLUMNS = ("job_id", "symbol", "run_month")
+
+PARTITIONING = ds.partitioning(
+    pa.schema([(name, pa.string()) for name in PARTITION_COLUMNS]), flavor="hive"
+)
+
+# Per-pass columns stored in every file (partition columns live in the path)
+BASE_SCHEMA = pa.schema(
+    [
+        ("pass_number", pa.int64()),
+        ("start_date", pa.date32()),
+        ("end_date", pa.date32()),
+        ("is_full_month", pa.bool_()),
+        ("result", pa.float64()),
+        ("profit", pa.float64()),
+        ("drawdown", pa.float64()),
+        ("custom_score", pa.float64()),
+        ("sharpe_ratio", pa.float64()),
+        ("trades", pa.int64()),
+        ("expected_payoff", pa.float64()),
+        ("recovery_factor", pa.float64()),
+        ("profit_factor", pa.float64()),
+        ("result_hash", pa.string()),
+    ]
+)
+
+# Added after the base columns when the report was joined to a forward test
+FORWARD_SCHEMA = pa.schema(
+    [
+        ("forward_start_date", pa.date32()),
+        ("forward_end_date", pa.date32()),
+        ("forward_result", pa.float64()),
+        ("forward_profit", pa.float64()),
+        ("forward_drawdown", pa.float64()),
+        ("forward_custom_score", pa.float64()),
+        ("forward_sharpe_ratio", pa.float64()),
+        ("forward_trades", pa.int64()),
+        ("forward_expected_payoff", pa.float64()),
+        ("forward_recovery_factor", pa.float64()),
+        ("forward_profit_factor", pa.float64()),
+    ]
+)
+
+_ARROW_TYPES: dict[type, pa.DataType] = {
+    bool: pa.bool_(),
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+}
+
+DEFAULT_ROW_GROUP_SIZE = 50_000
+
+
+def _fits(value: Any, py_type: type) -> bool:
+    if py_type is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if py_type is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, py_type)
+
+
+def job_dir(root: Path, job_id: str) -> Path:
+    """Directory holding every partition of one job."""
+    return root / f"job_id={quote(job_id, safe='')}"
+
+
+def partition_dir(root: Path, job_id: str, symbol: str, run_month: str) -> Path:
+    """Directory for one (job, symbol, month) partition; values are URI-encoded."""
+    return (
+        job_dir(root, job_id)
+        / f"symbol={quote(symbol, safe='')}"
+        / f"run_month={quote(run_month, safe='')}"
+    )
+
+
+class PassPartitionWriter:
+    """
+    Writes the passes of one XML report to its partition file, one row group
+    at a time, while the rows stream past on their way to the database.
+
+    Param columns are typed from the job's input type map; a value that does
+    not fit its declared type (a coercion fallback) is stored as null.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        part_name: str,
+        input_types: dict[str, type],
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    ) -> None:
+        self.root = root
+        self.part_name = part_name
+        self.input_types = input_types
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+
+        self._writer: pq.ParquetWriter | None = None
+        self._schema: pa.Schema | None = None
+        self._columns: list[str] = []
+        self._params: list[tuple[str, type]] = []
+        self._buffer: list[dict[str, Any]] = []
+        self._path: Path | None = None
+        self._tmp_path: Path | None = None
+
+    def tap(self, rows: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """Pass `rows` through unchanged, recording each one."""
+        for row in rows:
+            self.add(row)
+            yield row
+
+    def add(self, row: dict[str, Any]) -> None:
+        if self._writer is None:
+            self._open(row)
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group_size:
+            self._write_buffer()
+
+    def _open(self, first_row: dict[str, Any]) -> None:
+        params = first_row.get("params_json") or {}
+        self._params = [(k, self.input_types.get(k, str)) for k in sorted(params)]
+        fixed = list(BASE_SCHEMA)
+        if "forward_result" in first_row:
+            fixed += list(FORWARD_SCHEMA)
+        self._columns = [f.name for f in fixed]
+        self._schema = pa.schema(
+            fixed + [pa.field(k, _ARROW_TYPES.get(t, pa.string())) for k, t in self._params]
+        )
+
+        folder = partition_dir(
+            self.root, first_row["job_id"], first_row["symbol"], first_row["run_month"]
+        )
+        folder.mkdir(parents=True, exist_ok=True)
+        self._path = folder / f"{self.part_name}.parquet"
+        self._tmp_path = folder / f".{self.part_name}.parquet.tmp"
+        self._writer = pq.ParquetWriter(self._tmp_path, self._schema, compression="zstd")
+
+    def _write_buffer(self) -> None:
+        if not self._buffer or self._writer is None or self._schema is None:
+            return
+
+        rows = self._buffer
+        columns: dict[str, list[Any]] = {
+            name: [r.get(name) for r in rows] for name in self._columns
+        }
+        for key, py_type in self._params:
+            values = []
+            for r in rows:
+                value = (r.get("params_json") or {}).get(key)
+                values.append(value if value is not None and _fits(value, py_type) else None)
+            columns[key] = values
+
+        self._writer.write_table(pa.table(columns, schema=self._schema))
+        self.rows_written += len(rows)
+        self._buffer = []
+
+    def close(self) -> Path | None:
+        """Finish the file (atomically replacing any previous one). Returns its path."""
+        if self._writer is None:
+            return None
+        self._write_buffer()
+        self._writer.close()
+        assert self._tmp_path is not None and self._path is not None
+        os.replace(self._tmp_path, self._path)
+        self._writer = None
+        logger.debug(f"🧱 Wrote {self.rows_written} passes to {self._path}")
+        return self._path
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._tmp_path is not None and self._tmp_path.exists():
+            self._tmp_path.unlink()
+
+
+def merge_parts(
+    root: Path, job_id: str, part_name: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+) -> list[Path]:
+    """
+    Merge the `<part_name>.<first pass>.parquet` files of one job (written a
+    batch at a time, e.g. by the frame follower) into one `<part_name>.parquet`
+    per partition, so later scans open one file instead of thousands.
+    Returns the merged files.
+    """
+    prefix = f"{part_name}."
+    by_folder: dict[Path, list[tuple[int, Path]]] = {}
+    for path in job_dir(root, job_id).glob("*/*/*.parquet"):
+        first_pass = path.name[len(prefix) : -len(".parquet")]
+        if path.name.startswith(prefix) and first_pass.isdigit():
+            by_folder.setdefault(path.parent, []).append((int(first_pass), path))
+
+    merged = []
+    for folder, parts in by_folder.items():
+        paths = [path for _, path in sorted(parts)]
+        target = folder / f"{part_name}.parquet"
+        tmp_path = folder / f".{part_name}.parquet.tmp"
+        schema = pq.read_schema(paths[0])
+        pending: list[pa.Table] = []
+        with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+            for path in paths:
+                pending.append(pq.read_table(path, schema=schema))
+                if sum(t.num_rows for t in pending) >= row_group_size:
+                    writer.write_table(pa.concat_tables(pending), row_group_size)
+                    pending = []
+            if pending:
+                writer.write_table(pa.concat_tables(pending), row_group_size)
+        os.replace(tmp_path, target)
+        for path in paths:
+            path.unlink()
+        logger.debug(f"🧱 Merged {len(paths)} parts into {target}")
+        merged.append(target)
+    return merged
+
+
+def open_dataset(root: Path) -> ds.Dataset:
+    """
+    Open the pass store as one dataset.
+
+    Jobs have different input columns, so the file schemas are unified
+    (missing columns read as null) instead of trusting the first file.
+    """
+    base = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+    schemas = [frag.physical_schema for frag in base.get_fragments()]
+    if not schemas:
+        return base
+    unified = pa.unify_schemas(schemas + [PARTITIONING.schema])
+    return ds.dataset(root, schema=unified, format="parquet", partitioning=PARTITIONING)
+
+
+def _build_filter(
+    filters: ds.Expression | Sequence[tuple[str, str, Any]] | None,
+    job_id: str | None,
+    symbols: Sequence[str] | None,
+    months: Sequence[str] | None,
+) -> ds.Expression | None:
+    expr: ds.Expression | None = None
+    if filters is not None:
+        expr = (
+            filters
+            if isinstance(filters, ds.Expression)
+            else pq.filters_to_expression(list(filters))
+        )
+
+    clauses = []
+    if job_id is not None:
+        clauses.append(ds.field("job_id") == job_id)
+    if symbols:
+        clauses.append(ds.field("symbol").isin(list(symbols)))
+    if months:
+        clauses.append(ds.field("run_month").isin(list(months)))
+
+    for clause in clauses:
+        expr = clause if expr is None else expr & clause
+    return expr
+
+
+def read_passes(
+    root: Path,
+    columns: Sequence[str] | None = None,
+    filters: ds.Expression | Sequence[tuple[str, str, Any]] | None = None,
+    job_id: str | None = None,
+    symbols: Sequence[str] | None = None,
+    months: Sequence[str] | None = None,
+) -> pa.Table:
+    """
+    Read passes from the store as an Arrow table.
+
+    Only `columns` are decoded, and `filters` — either a pyarrow expression or
+    DNF tuples like [("profit", ">", 0)] — plus the job/symbol/month shortcuts
+    are pushed down, so whole partitions and row groups are skipped.
+    """
+    dataset = open_dataset(root)
+    return dataset.to_table(
+        columns=list(columns) if columns is not None else None,
+        filter=_build_filter(filters, job_id, symbols, months),
+    )
+
+
+def read_passes_df(root: Path, **kwargs: Any) -> "pd.DataFrame":
+    """Same as read_passes(), returned as a pandas DataFrame."""
+    return read_passes(root, **kwargs).to_pandas()
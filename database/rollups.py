@@ -0,0 +1,285 @@
+# File: database/rollups.py
+# Purpose: Per-group aggregates of `runs` (run_rollups, param_set_rollups), kept current on ingest
+# Notes: RunWriter folds every batch it inserts into both tables in the same transaction
+#        (one upsert per table), so summaries read O(groups) rows instead of O(runs).
+#        rebuild_rollups() recomputes them from `runs` with GROUP BY, for backfills;
+#        check_rollups() (--check) only reports the groups that differ:
+#            python -m database.rollups [--job JOB_ID] [--check]
+
+from __future__ import annotations
+
+import argparse
+import math
+from typing import Any, Iterable, Mapping
+
+from loguru import logger
+from sqlalchemy import Table, case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database.models import ParamSetRollup, RollupStats, Run, RunRollup
+
+ROLLUP_METRICS = ("profit", "drawdown", "trades", "custom_score")
+
+# Rollup model -> the `runs` columns it groups by
+ROLLUP_KEYS: dict[type[RollupStats], tuple[str, ...]] = {
+    RunRollup: ("job_id", "symbol", "run_month"),
+    ParamSetRollup: ("param_set_id", "symbol"),
+}
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+_IN_CHUNK = 500
+
+
+def _empty_group(key: tuple[Any, ...], keys: tuple[str, ...]) -> dict[str, Any]:
+    group: dict[str, Any] = dict(zip(keys, key))
+    group["runs"] = 0
+    for metric in ROLLUP_METRICS:
+        group[f"{metric}_n"] = 0
+        group[f"{metric}_sum"] = 0.0
+        group[f"{metric}_min"] = None
+        group[f"{metric}_max"] = None
+        group[f"{metric}_sumsq"] = 0.0
+    return group
+
+
+def rollup_deltas(
+    rows: Iterable[Mapping[str, Any]], keys: tuple[str, ...]
+) -> list[dict[str, Any]]:
+    """Aggregate run rows per `keys` into rollup rows (runs without a full key are left out)."""
+    groups: dict[tuple[Any, ...], dict[str, Any]] = {}
+    for row in rows:
+        key = tuple(row.get(k) for k in keys)
+        if None in key:
+            continue
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = _empty_group(key, keys)
+
+        group["runs"] += 1
+        for metric in ROLLUP_METRICS:
+            value = row.get(metric)
+            if value is None or value != value:  # missing or NaN
+                continue
+            value = float(value)
+            group[f"{metric}_n"] += 1
+            group[f"{metric}_sum"] += value
+            group[f"{metric}_sumsq"] += value * value
+            low, high = group[f"{metric}_min"], group[f"{metric}_max"]
+            group[f"{metric}_min"] = value if low is None else min(low, value)
+            group[f"{metric}_max"] = value if high is None else max(high, value)
+    return list(groups.values())
+
+
+def _pick(stored: Any, new: Any, new_wins: Any) -> Any:
+    # NULL means that side has no value for the metric yet
+    return case(
+        (stored.is_(None), new),
+        (new.is_(None), stored),
+        (new_wins, new),
+        else_=stored,
+    )
+
+
+def _merged(table: Table, new: Any) -> dict[str, Any]:
+    """SET clause adding the `new` (excluded) rollup row onto the stored one."""
+    values: dict[str, Any] = {"runs": table.c.runs + new["runs"]}
+    for metric in ROLLUP_METRICS:
+        for part in ("n", "sum", "sumsq"):
+            name = f"{metric}_{part}"
+            values[name] = table.c[name] + new[name]
+        low, high = f"{metric}_min", f"{metric}_max"
+        values[low] = _pick(table.c[low], new[low], new[low] < table.c[low])
+        values[high] = _pick(table.c[high], new[high], new[high] > table.c[high])
+    return values
+
+
+def _add_via_orm(
+    session: Session, model: type[RollupStats], groups: list[dict[str, Any]]
+) -> None:
+    # Backends without ON CONFLICT: one lookup per group (rollups are few)
+    keys = ROLLUP_KEYS[model]
+    for group in groups:
+        stored = session.get(model, tuple(group[k] for k in keys))
+        if stored is None:
+            session.add(model(**group))
+            continue
+        stored.runs += group["runs"]
+        for metric in ROLLUP_METRICS:
+            for part in ("n", "sum", "sumsq"):
+                name = f"{metric}_{part}"
+                setattr(stored, name, getattr(stored, name) + group[name])
+            for part, pick in (("min", min), ("max", max)):
+                name = f"{metric}_{part}"
+                values = [v for v in (getattr(stored, name), group[name]) if v is not None]
+                setattr(stored, name, pick(values) if values else None)
+    session.flush()
+
+
+def apply_rollups(session: Session, rows: list[Mapping[str, Any]]) -> None:
+    """Fold newly inserted run rows into every rollup table (in the caller's transaction)."""
+    if not rows:
+        return
+    dialect_insert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    for model, keys in ROLLUP_KEYS.items():
+        groups = rollup_deltas(rows, keys)
+        if not groups:
+            continue
+        if dialect_insert is None:
+            _add_via_orm(session, model, groups)
+            continue
+        table = model.__table__
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys), set_=_merged(table, stmt.excluded)
+        )
+        session.execute(stmt, groups)
+
+
+def _aggregates() -> list[Any]:
+    runs = Run.__table__
+    columns: list[Any] = [func.count().label("runs")]
+    for metric in ROLLUP_METRICS:
+        col = runs.c[metric]
+        columns += [
+            func.count(col).label(f"{metric}_n"),
+            func.coalesce(func.sum(col), 0.0).label(f"{metric}_sum"),
+            func.min(col).label(f"{metric}_min"),
+            func.max(col).label(f"{metric}_max"),
+            func.coalesce(func.sum(col * col), 0.0).label(f"{metric}_sumsq"),
+        ]
+    return columns
+
+
+def _insert_groups(session: Session, model: type[RollupStats], scope: Any = None) -> int:
+    """INSERT ... SELECT the rollup rows of the runs in `scope` (all runs if None)."""
+    runs = Run.__table__
+    group_by = [runs.c[k] for k in ROLLUP_KEYS[model]]
+    query = select(*group_by, *_aggregates()).where(*(c.is_not(None) for c in group_by))
+    if scope is not None:
+        query = query.where(scope)
+    query = query.group_by(*group_by)
+    names = [c.name for c in query.selected_columns]
+    return session.execute(insert(model.__table__).from_select(names, query)).rowcount
+
+
+def _job_scope(model: type[RollupStats], job_id: str | None) -> tuple[Any, Any]:
+    """(condition on `runs`, condition on the rollup table) of the groups `job_id` touches."""
+    if job_id is None:
+        return None, None
+    runs, table = Run.__table__, model.__table__
+    if model is RunRollup:
+        return runs.c.job_id == job_id, table.c.job_id == job_id
+    job_sets = select(runs.c.param_set_id).where(runs.c.job_id == job_id)
+    return runs.c.param_set_id.in_(job_sets), table.c.param_set_id.in_(job_sets)
+
+
+def rebuild_rollups(session: Session, job_id: str | None = None) -> dict[str, int]:
+    """
+    Recompute the rollups from `runs` (all of them, or those `job_id` touches).
+
+    A job's parameter-set rollups include the other jobs' runs with the same
+    sets, as they do on ingest. Returns the rollup rows written per table.
+    """
+    written = {}
+    for model in ROLLUP_KEYS:
+        table = model.__table__
+        scope, stored = _job_scope(model, job_id)
+        clear = delete(table)
+        if stored is not None:
+            clear = clear.where(stored)
+
+        session.execute(clear)
+        written[table.name] = _insert_groups(session, model, scope)
+    return written
+
+
+def _same(expected: Mapping[str, Any], stored: Mapping[str, Any]) -> bool:
+    for name, value in expected.items():
+        other = stored[name]
+        if isinstance(value, float) or isinstance(other, float):
+            if value is None or other is None:
+                if value is not other:
+                    return False
+            elif not math.isclose(value, other, rel_tol=1e-9, abs_tol=1e-9):
+                return False
+        elif value != other:
+            return False
+    return True
+
+
+def check_rollups(session: Session, job_id: str | None = None) -> dict[str, list[tuple]]:
+    """
+    Compare the stored rollups with a GROUP BY over `runs` (all of them, or
+    those `job_id` touches). Returns the keys of the groups that are missing,
+    extra or stale, per table; O(runs), so it is a maintenance check only.
+    """
+    runs = Run.__table__
+    stale = {}
+    for model, keys in ROLLUP_KEYS.items():
+        table = model.__table__
+        scope, stored_scope = _job_scope(model, job_id)
+        group_by = [runs.c[k] for k in keys]
+        query = select(*group_by, *_aggregates()).where(*(c.is_not(None) for c in group_by))
+        stored_query = select(table)
+        if scope is not None:
+            query = query.where(scope)
+            stored_query = stored_query.where(stored_scope)
+
+        expected = {
+            tuple(row[k] for k in keys): row
+            for row in session.execute(query.group_by(*group_by)).mappings()
+        }
+        stored = {
+            tuple(row[k] for k in keys): row
+            for row in session.execute(stored_query).mappings()
+        }
+        stale[table.name] = sorted(
+            key
+            for key in expected.keys() | stored.keys()
+            if key not in expected
+            or key not in stored
+            or not _same(expected[key], stored[key])
+        )
+    return stale
+
+
+def refresh_param_set_rollups(session: Session, param_set_ids: Iterable[int]) -> None:
+    """Recompute the rollups of these parameter sets, e.g. after some of their runs went."""
+    ids = list(param_set_ids)
+    table = ParamSetRollup.__table__
+    for i in range(0, len(ids), _IN_CHUNK):
+        chunk = ids[i : i + _IN_CHUNK]
+        session.execute(delete(table).where(table.c.param_set_id.in_(chunk)))
+        _insert_groups(session, ParamSetRollup, Run.__table__.c.param_set_id.in_(chunk))
+
+
+def main(argv: list[str] | None = None) -> dict[str, int]:
+    parser = argparse.ArgumentParser(description="Rebuild the rollup tables from runs.")
+    parser.add_argument("--job", help="only the rollups of this job id")
+    parser.add_argument(
+        "--check", action="store_true", help="only report groups that differ from runs"
+    )
+    args = parser.parse_args(argv)
+
+    from database.session import get_session
+
+    with get_session() as session:
+        if args.check:
+            stale = check_rollups(session, args.job)
+            for name, keys in stale.items():
+                if keys:
+                    logger.warning(f"⚠️ {name}: {len(keys)} stale groups, e.g. {keys[:5]}")
+                else:
+                    logger.info(f"✅ {name}: up to date")
+            return {name: len(keys) for name, keys in stale.items()}
+        written = rebuild_rollups(session, args.job)
+    for name, count in written.items():
+        logger.info(f"🧮 {name}: {count} groups")
+    return written
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,94 @@
 # File: database/session.py
+# Notes: Nothing here touches the database at import. The engine is created on first
+#        use by get_engine(), or up front by init_engine() (e.g. with another URL),
+#        and the functions registered with on_engine_init() run on it right after it
+#        is created; by default that is the SQLite schema bootstrap, which runs the
+#        Alembic migrations (database/migrations.py).
 
-from sqlalchemy import create_engine, inspect
-from sqlalchemy.orm import sessionmaker
-from contextlib import contextmanager
-from settings import DATABASE_URL
+from __future__ import annotations
 
-from sqlalchemy.exc import SQLAlchemyError
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Generator
+
 from loguru import logger
 
-from database.models import Base
-from datetime import datetime
-from typing import Generator
-from sqlalchemy.orm import Session
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+    from sqlalchemy.orm import Session, sessionmaker
+
+EngineHook = Callable[["Engine"], None]
+
+_engine: Engine | None = None
+_SessionLocal: sessionmaker | None = None
+_init_hooks: list[EngineHook] = []
+_lock = threading.RLock()
+
+
+def init_engine(url: str | None = None, **engine_kwargs: Any) -> Engine:
+    """
+    Create the app engine for `url` (default: settings.DATABASE_URL) and run
+    the init hooks on it. Replaces (and disposes) an engine created earlier.
+    """
+    global _engine
+    from sqlalchemy import create_engine
+
+    from database.sqlite_profile import (
+        apply_sqlite_profile,
+        sqlite_profile_from_settings,
+    )
+
+    if url is None:
+        from settings import DATABASE_URL as url
+
+    with _lock:
+        if _engine is not None:
+            _engine.dispose()
+        engine = create_engine(url, echo=False, future=True, **engine_kwargs)
+        apply_sqlite_profile(engine, sqlite_profile_from_settings())
+        for hook in _init_hooks:
+            hook(engine)
 
-# Create the engine and session factory
-_engine = create_engine(DATABASE_URL, echo=False, future=True)
-_SessionLocal = sessionmaker(
-    bind=_engine, autoflush=False, autocommit=False, future=True
-)
+        _engine = engine
+        return engine
 
 
-def get_engine():
+def get_engine() -> Engine:
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                return init_engine()
     return _engine
 
 
+def on_engine_init(hook: EngineHook) -> EngineHook:
+    """Run `hook(engine)` whenever the app engine is created (now, if it already is)."""
+    with _lock:
+        _init_hooks.append(hook)
+        if _engine is not None:
+            hook(_engine)
+    return hook
+
+
+def _session_factory() -> sessionmaker:
+    global _SessionLocal
+    if _SessionLocal is None:
+        from sqlalchemy.orm import sessionmaker
+
+        # Unbound: every session gets its engine in get_session()
+        _SessionLocal = sessionmaker(autoflush=False, autocommit=False, future=True)
+    return _SessionLocal
+
+
 @contextmanager
-def get_session(engine=None, **kwargs) -> Generator[Session, None, None]:
-    engine = engine or _engine
-    session = _SessionLocal(bind=engine, **kwargs)
+def get_session(
+    engine: Engine | None = None, **kwargs
+) -> Generator[Session, None, None]:
+    from sqlalchemy.exc import SQLAlchemyError
+
+    engine = engine or get_engine()
+    session = _session_factory()(bind=engine, **kwargs)
     try:
         yield session
         session.commit()
@@ -44,26 +104,17 @@ def get_session(engine=None, **kwargs) -> Generator[Session, None, None]:
         session.close()
 
 
-def _should_create_sqlite_schema() -> bool:
-    if not DATABASE_URL.startswith("sqlite:///"):
-        return False
-
-    db_path = Path(DATABASE_URL.removeprefix("sqlite:///"))
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-
-    # Case 1: File doesn't exist
-    if not db_path.exists():
-        return True
-
-    # Case 2: File exists but tables are missing
-    inspector = inspect(_engine)
-    tables = inspector.get_table_names()
-    required_tables = {"jobs", "runs"}
-    return not required_tables.issubset(set(tables))
-
+@on_engine_init
+def bootstrap_sqlite_schema(engine: Engine) -> None:
+    """
+    Bring a SQLite database file to the current schema through the Alembic
+    migrations (PostgreSQL is migrated with `alembic upgrade head`).
+    """
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or database in (None, "", ":memory:"):
+        return
 
-if _should_create_sqlite_schema():
-    from database.models import Job, Run  # Import models to register them
+    from database.migrations import upgrade_sqlite_schema
 
-    Base.metadata.create_all(bind=_engine)
-    logger.info("✅ SQLite schema created.")
+    Path(database).parent.mkdir(parents=True, exist_ok=True)
+    upgrade_sqlite_schema(engine)
@@ -0,0 +1,230 @@
+# File: dev/bench/mt5_xml.py
+# Purpose: Synthetic MT5 optimization reports (SpreadsheetML) for ingest benchmarks
+# Notes: Reports are written row by row, so 1M-pass files need no more memory than 1k ones
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import IO, Sequence
+
+METRIC_HEADERS = [
+    "Pass",
+    "Result",
+    "Profit",
+    "Expected Payoff",
+    "Profit Factor",
+    "Recovery Factor",
+    "Sharpe Ratio",
+    "Custom",
+    "Equity DD %",
+    "Trades",
+]
+
+_HEAD = """<?xml version="1.0"?>
+<?mso-application progid="Excel.Sheet"?>
+<Workbook xmlns="urn:schemas-microsoft-com:office:spreadsheet" \
+xmlns:o="urn:schemas-microsoft-com:office:office" \
+xmlns:x="urn:schemas-microsoft-com:office:excel" \
+xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet" \
+xmlns:html="http://www.w3.org/TR/REC-html40">
+<DocumentProperties xmlns="urn:schemas-microsoft-com:office:office">
+<Title>{title}</Title>
+<Author>MetaQuotes Ltd.</Author>
+<Created>{created}</Created>
+</DocumentProperties>
+<Styles>
+<Style ss:ID="s01"><Font ss:Bold="1"/></Style>
+</Styles>
+<Worksheet ss:Name="Tester Optimizator Results">
+<Table>
+"""
+
+_TAIL = "</Table>\n</Worksheet>\n</Workbook>\n"
+
+
+@dataclass(frozen=True)
+class InputSpec:
+    """One optimized EA input: `kind` is "int", "float" or "bool"."""
+
+    name: str
+    kind: str
+    start: float = 0
+    step: float = 1
+    count: int = 10
+
+    def config_entry(self) -> dict:
+        if self.kind == "bool":
+            return {"value": "false", "optimize": True}
+        default = int(self.start) if self.kind == "int" else float(self.start)
+        end = self.start + self.step * (self.count - 1)
+        return {
+            "default": default,
+            "start": default,
+            "step": self.step,
+            "end": int(end) if self.kind == "int" else end,
+            "optimize": True,
+        }
+
+    def value(self, rng: random.Random) -> str:
+        if self.kind == "bool":
+            return "true" if rng.random() < 0.5 else "false"
+        n = rng.randrange(self.count)
+        if self.kind == "int":
+            return str(int(self.start + self.step * n))
+        return repr(round(self.start + self.step * n, 6))
+
+
+DEFAULT_INPUTS: tuple[InputSpec, ...] = (
+    InputSpec("input_StopLoss", "int", 10, 5, 20),
+    InputSpec("input_TakeProfit", "float", 1.0, 0.5, 17),
+    InputSpec("input_ATRPeriod", "int", 5, 1, 30),
+    InputSpec("input_ATRMultiplier", "float", 0.5, 0.25, 16),
+    InputSpec("input_RiskPercent", "float", 0.25, 0.25, 8),
+    InputSpec("input_MaxSpread", "int", 10, 10, 5),
+    InputSpec("input_UseTrail", "bool"),
+    InputSpec("input_UseBreakEven", "bool"),
+)
+
+
+def report_title(expert: str, symbol: str, start: date, end: date) -> str:
+    """MT5 title format, e.g. 'IndyTSL EURUSD,H1 2023.03.01-2023.03.31'."""
+    return f"{expert} {symbol},H1 {start:%Y.%m.%d}-{end:%Y.%m.%d}"
+
+
+def _cell(kind: str, value: str) -> str:
+    return f'<Cell><Data ss:Type="{kind}">{value}</Data></Cell>'
+
+
+def write_report(
+    out: Path | IO[str],
+    passes: int,
+    symbol: str = "EURUSD",
+    start: date = date(2023, 3, 1),
+    end: date = date(2023, 3, 31),
+    inputs: Sequence[InputSpec] = DEFAULT_INPUTS,
+    expert: str = "IndyTSL",
+    zero_trade_ratio: float = 0.05,
+    seed: int = 0,
+) -> None:
+    """
+    Write one optimization report with `passes` data rows.
+
+    Values are drawn from a seeded RNG, so the same arguments always give the
+    same file (and the same result hashes). About `zero_trade_ratio` of the
+    passes have 0 trades, like the dead corners of a real optimization.
+    """
+    if not isinstance(out, Path):
+        _write_report(out, passes, symbol, start, end, inputs, expert, zero_trade_ratio, seed)
+        return
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("w", encoding="utf-8", newline="\n") as f:
+        _write_report(f, passes, symbol, start, end, inputs, expert, zero_trade_ratio, seed)
+
+
+def _write_report(
+    f: IO[str],
+    passes: int,
+    symbol: str,
+    start: date,
+    end: date,
+    inputs: Sequence[InputSpec],
+    expert: str,
+    zero_trade_ratio: float,
+    seed: int,
+) -> None:
+    rng = random.Random(f"{seed}:{symbol}:{start}")
+    f.write(
+        _HEAD.format(
+            title=report_title(expert, symbol, start, end),
+            created=f"{end:%Y-%m-%d}T00:00:00Z",
+        )
+    )
+
+    header = "".join(
+        f'<Cell ss:StyleID="s01"><Data ss:Type="String">{h}</Data></Cell>'
+        for h in METRIC_HEADERS + [spec.name for spec in inputs]
+    )
+    f.write(f"<Row>{header}</Row>\n")
+
+    for pass_number in range(passes):
+        trades = 0 if rng.random() < zero_trade_ratio else rng.randint(1, 400)
+        profit = round(rng.gauss(150.0, 900.0), 2) if trades else 0.0
+        dd_pct = round(rng.uniform(0.5, 45.0), 2) if trades else 0.0
+        pf = round(rng.uniform(0.3, 3.5), 2) if trades else 0.0
+        rf = round(profit / max(dd_pct * 10.0, 1.0), 2)
+        cells = [
+            _cell("Number", str(pass_number)),
+            _cell("Number", repr(round(10000.0 + profit, 2))),
+            _cell("Number", repr(profit)),
+            _cell("Number", repr(round(profit / trades, 2) if trades else 0.0)),
+            _cell("Number", repr(pf)),
+            _cell("Number", repr(rf)),
+            _cell("Number", repr(round(rng.uniform(-2.0, 6.0), 2))),
+            _cell("Number", "0"),
+            _cell("String", f"{dd_pct:.2f}%"),
+            _cell("Number", str(trades)),
+        ]
+        cells.extend(
+            _cell("String" if spec.kind == "bool" else "Number", spec.value(rng))
+            for spec in inputs
+        )
+        f.write(f"<Row>{''.join(cells)}</Row>\n")
+
+    f.write(_TAIL)
+
+
+def write_job_config(
+    path: Path, inputs: Sequence[InputSpec] = DEFAULT_INPUTS, expert: str = "IndyTSL"
+) -> Path:
+    """job_config.json matching the reports (same shape the GUI saves)."""
+    config = {
+        "tester": {
+            "Expert": f"Shared Projects\\{expert}\\{expert}_v2.ex5",
+            "Model": 1,
+            "Period": "H1",
+            "Optimization": 2,
+            "OptimizationCriterion": 6,
+            "Deposit": 10000,
+            "Currency": "USD",
+            "Leverage": 100,
+        },
+        "inputs": {spec.name: spec.config_entry() for spec in inputs},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(config, indent=2), encoding="utf-8")
+    return path
+
+
+def _month_range(index: int) -> tuple[date, date]:
+    year, month = 2023 + index // 12, index % 12 + 1
+    next_first = date(year + month // 12, month % 12 + 1, 1)
+    return date(year, month, 1), date.fromordinal(next_first.toordinal() - 1)
+
+
+def write_job_folder(
+    folder: Path,
+    passes: int,
+    symbols: Sequence[str] = ("EURUSD", "GBPUSD"),
+    months: int = 2,
+    inputs: Sequence[InputSpec] = DEFAULT_INPUTS,
+    seed: int = 0,
+) -> list[Path]:
+    """
+    A job folder like generated/<job>/: job_config.json plus one report per
+    (symbol, month) under <symbol>/, with `passes` rows spread across them.
+    """
+    write_job_config(folder / "job_config.json", inputs)
+    files = len(symbols) * months
+    paths = []
+    for i in range(files):
+        symbol = symbols[i % len(symbols)]
+        start, end = _month_range(i // len(symbols))
+        share = passes // files + (1 if i < passes % files else 0)
+        path = folder / symbol / f"{symbol}_{start:%Y_%m}.xml"
+        write_report(path, share, symbol, start, end, inputs, seed=seed)
+        paths.append(path)
+    return paths
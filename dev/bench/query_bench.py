@@ -0,0 +1,233 @@
+# File: dev/bench/query_bench.py
+# Purpose: Dashboard/stats query latency on a large `runs` table, without and with its indexes
+# Notes: python -m dev.bench.query_bench --rows 5000000 --out query_bench.json
+#        The database is generated once (reused with --db-file) and every query is timed
+#        on the bare table first, then again after the indexes declared on Run are built.
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from sqlalchemy import Engine, create_engine, insert, text
+
+from database.models import Base, Job, Run
+
+JOBS = 20
+SYMBOLS = ("EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "USDCAD", "USDCHF", "NZDUSD", "EURJPY")
+MONTHS = tuple(f"{year}-{month:02d}" for year in (2022, 2023, 2024) for month in range(1, 13))
+_CHUNK = 50_000
+
+# name -> (SQL, parameters); the shapes the dashboard and /stats/summary issue
+QUERIES: dict[str, tuple[str, dict[str, Any]]] = {
+    "job_symbol_month": (
+        "SELECT id, profit, custom_score FROM runs "
+        "WHERE job_id = :job AND symbol = :symbol AND run_month = :month",
+        {"job": "job_07", "symbol": "GBPUSD", "month": "2023-06"},
+    ),
+    "symbol_month_profit": (
+        "SELECT run_month, SUM(profit), AVG(profit) FROM runs "
+        "WHERE symbol = :symbol GROUP BY run_month",
+        {"symbol": "USDJPY"},
+    ),
+    "profit_by_symbol": (
+        "SELECT symbol, SUM(profit) FROM runs GROUP BY symbol",
+        {},
+    ),
+    "job_top_custom_score": (
+        "SELECT id, custom_score FROM runs WHERE job_id = :job "
+        "ORDER BY custom_score DESC LIMIT 50",
+        {"job": "job_03"},
+    ),
+    "flagged_unarchived": (
+        "SELECT COUNT(*) FROM runs WHERE is_archived = :archived AND status = :status",
+        {"archived": False, "status": "flagged"},
+    ),
+}
+
+
+# -- data -------------------------------------------------------------------
+
+
+def build_database(engine: Engine, rows: int, seed: int = 0) -> None:
+    """Create the schema without the `runs` indexes and fill it with `rows` synthetic runs."""
+    Base.metadata.create_all(engine)
+    drop_run_indexes(engine)
+
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Job),
+            [
+                {
+                    "id": f"job_{j:02d}",
+                    "job_name": f"job_{j:02d}",
+                    "expert_name": "IndyTSL",
+                    "expert_path": "IndyTSL.ex5",
+                    "period": "H1",
+                    "deposit": 10000.0,
+                    "currency": "USD",
+                    "leverage": "100",
+                    "tester_inputs": {},
+                }
+                for j in range(JOBS)
+            ],
+        )
+
+    for start in range(0, rows, _CHUNK):
+        n = min(_CHUNK, rows - start)
+        jobs = rng.integers(0, JOBS, n)
+        symbols = rng.integers(0, len(SYMBOLS), n)
+        months = rng.integers(0, len(MONTHS), n)
+        profit = rng.normal(0, 500, n).round(2)
+        drawdown = rng.uniform(0, 40, n).round(2)
+        status = rng.choice(["new", "reviewed", "flagged"], n, p=[0.9, 0.09, 0.01])
+        archived = rng.random(n) < 0.05
+
+        batch = []
+        for i in range(n):
+            month = MONTHS[months[i]]
+            year, mon = int(month[:4]), int(month[5:])
+            batch.append(
+                {
+                    "job_id": f"job_{jobs[i]:02d}",
+                    "symbol": SYMBOLS[symbols[i]],
+                    "run_month": month,
+                    "start_date": date(year, mon, 1),
+                    "end_date": date(year, mon, 28),
+                    "is_full_month": False,
+                    "pass_number": start + i,
+                    "profit": float(profit[i]),
+                    "drawdown": float(drawdown[i]),
+                    "custom_score": float(profit[i] - 2 * drawdown[i]),
+                    "trades": 12,
+                    "result_hash": f"{start + i:064x}",
+                    "status": str(status[i]),
+                    "is_archived": bool(archived[i]),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+        with engine.begin() as conn:
+            conn.execute(insert(Run), batch)
+        print(f"  {start + n:>10} / {rows} runs", end="\r", file=sys.stderr)
+    print(file=sys.stderr)
+
+
+def drop_run_indexes(engine: Engine) -> None:
+    for index in Run.__table__.indexes:
+        index.drop(engine, checkfirst=True)
+
+
+def create_run_indexes(engine: Engine) -> float:
+    """Build the indexes declared on Run; returns the seconds it took."""
+    t0 = time.perf_counter()
+    for index in Run.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    return time.perf_counter() - t0
+
+
+# -- measurement ------------------------------------------------------------
+
+
+def time_queries(engine: Engine, repeat: int) -> dict[str, dict[str, Any]]:
+    """Median and best wall time per query (ms), plus the SQLite plan when available."""
+    results = {}
+    with engine.connect() as conn:
+        for name, (sql, params) in QUERIES.items():
+            timings = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                timings.append((time.perf_counter() - t0) * 1000)
+            result: dict[str, Any] = {
+                "median_ms": round(statistics.median(timings), 3),
+                "best_ms": round(min(timings), 3),
+            }
+            if engine.dialect.name == "sqlite":
+                plan = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+                result["plan"] = [row[-1] for row in plan]
+            results[name] = result
+    return results
+
+
+def run(engine: Engine, rows: int, repeat: int, seed: int = 0, build: bool = True) -> dict[str, Any]:
+    if build:
+        t0 = time.perf_counter()
+        build_database(engine, rows, seed)
+        print(f"🧱 Built {rows} runs in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    else:
+        drop_run_indexes(engine)
+
+    before = time_queries(engine, repeat)
+    index_seconds = create_run_indexes(engine)
+    after = time_queries(engine, repeat)
+
+    queries = {}
+    for name in QUERIES:
+        base, indexed = before[name]["median_ms"], after[name]["median_ms"]
+        queries[name] = {
+            "without_indexes": before[name],
+            "with_indexes": after[name],
+            "speedup": round(base / indexed, 1) if indexed else None,
+        }
+        print(f"{name:>22}: {base:10.2f} ms -> {indexed:8.2f} ms", file=sys.stderr)
+    return {
+        "dialect": engine.dialect.name,
+        "rows": rows,
+        "repeat": repeat,
+        "index_build_seconds": round(index_seconds, 2),
+        "queries": queries,
+    }
+
+
+# -- CLI --------------------------------------------------------------------
+
+
+def main(argv: list[str] | None = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark runs queries with and without indexes.")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db-file", type=Path, help="SQLite file to (re)use (default: temp file)")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate an existing --db-file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="write the JSON report here as well")
+    args = parser.parse_args(argv)
+
+    tmp = None if args.db_file else tempfile.TemporaryDirectory(prefix="optibatch_qbench_")
+    db_file = (args.db_file or Path(tmp.name) / "runs.db").resolve()
+    if args.rebuild:
+        db_file.unlink(missing_ok=True)
+    build = not db_file.exists()
+
+    engine = create_engine(f"sqlite:///{db_file}")
+    try:
+        report = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            **run(engine, args.rows, args.repeat, args.seed, build),
+        }
+    finally:
+        engine.dispose()
+        if tmp is not None:
+            tmp.cleanup()
+
+    text_out = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text_out + "\n", encoding="utf-8")
+    print(text_out)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# File: dev/bench/sqlite_bench.py
+# Purpose: Ingest and read latency on SQLite with its default PRAGMAs vs. the tuned profile
+# Notes: python -m dev.bench.sqlite_bench --passes 20000 --batch-size 500 --out sqlite_bench.json
+#        Each profile gets a fresh database file. The report is ingested committing every
+#        batch (as the GUI does) while a reader thread issues a dashboard query, so the
+#        reader latencies show how much the ingest blocks the dashboard.
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from database.sqlite_profile import SqliteProfile, apply_sqlite_profile, read_sqlite_pragmas
+from dev.bench.mt5_xml import write_job_config, write_report
+
+PROFILES: dict[str, SqliteProfile | None] = {"default": None, "tuned": SqliteProfile()}
+
+JOB_ID = "sqlite_bench"
+
+# The dashboard's per-job summary; issued by the reader during and after ingest
+READ_QUERY = (
+    "SELECT symbol, run_month, COUNT(*), SUM(profit), MAX(custom_score) FROM runs "
+    "WHERE job_id = :job GROUP BY symbol, run_month"
+)
+
+
+def _ms(seconds: list[float]) -> dict[str, float | None]:
+    if not seconds:
+        return {"median_ms": None, "p95_ms": None, "max_ms": None}
+    ordered = sorted(seconds)
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+class Reader(threading.Thread):
+    """Runs READ_QUERY on its own connection until stopped, timing every call."""
+
+    def __init__(self, engine: Engine, interval: float) -> None:
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.interval = interval
+        self.latencies: list[float] = []
+        self.errors = 0
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        with self.engine.connect() as conn:
+            while not self._done.is_set():
+                t0 = time.perf_counter()
+                try:
+                    conn.execute(text(READ_QUERY), {"job": JOB_ID}).fetchall()
+                    self.latencies.append(time.perf_counter() - t0)
+                except OperationalError:  # "database is locked" past the busy timeout
+                    self.errors += 1
+                conn.rollback()  # end the read transaction so the writer can checkpoint
+                self._done.wait(self.interval)
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+def run_profile(
+    name: str, workdir: Path, xml_path: Path, batch_size: int, repeat: int, interval: float
+) -> dict[str, Any]:
+    """Ingest `xml_path` into a fresh database with one profile and time reads."""
+    from database.ingest.ingest_job import ensure_job, ingest_single_xml
+    from database.ingest.plan import build_ingest_plan
+    from database.models import Base
+
+    db_file = workdir / f"{name}.db"
+    for suffix in ("", "-wal", "-shm"):
+        db_file.with_name(db_file.name + suffix).unlink(missing_ok=True)
+
+    engine = create_engine(f"sqlite:///{db_file}")
+    apply_sqlite_profile(engine, PROFILES[name])
+    try:
+        Base.metadata.create_all(engine)
+        config_path = xml_path.parent.parent / "job_config.json"
+        plan = build_ingest_plan(config_path)
+        with Session(engine) as session:
+            ensure_job(session, JOB_ID, plan)
+            session.commit()
+
+        reader = Reader(engine, interval)
+        reader.start()
+        try:
+            with Session(engine) as session, contextlib.chdir(workdir):
+                t0 = time.perf_counter()
+                inserted = ingest_single_xml(
+                    xml_path,
+                    config_path,
+                    session,
+                    JOB_ID,
+                    plan=plan,
+                    batch_size=batch_size,
+                    resumable=True,  # commit every batch
+                )
+                ingest_seconds = time.perf_counter() - t0
+        finally:
+            reader.stop()
+
+        idle = []
+        with engine.connect() as conn:
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                conn.execute(text(READ_QUERY), {"job": JOB_ID}).fetchall()
+                idle.append(time.perf_counter() - t0)
+
+        return {
+            "profile": name,
+            "pragmas": read_sqlite_pragmas(engine),
+            "inserted": inserted,
+            "batch_size": batch_size,
+            "ingest_seconds": round(ingest_seconds, 4),
+            "passes_per_sec": round(inserted / ingest_seconds, 1) if ingest_seconds else None,
+            "read_during_ingest": {
+                "queries": len(reader.latencies),
+                "locked_errors": reader.errors,
+                **_ms(reader.latencies),
+            },
+            "read_idle": _ms(idle),
+        }
+    finally:
+        engine.dispose()
+
+
+# -- CLI --------------------------------------------------------------------
+
+
+def main(argv: list[str] | None = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(
+        description="Benchmark SQLite ingest/read latency with and without the PRAGMA profile."
+    )
+    parser.add_argument("--passes", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20, help="idle reads after ingest")
+    parser.add_argument("--interval", type=float, default=0.005, help="seconds between reader queries")
+    parser.add_argument("--profile", choices=PROFILES, nargs="+", default=list(PROFILES))
+    parser.add_argument("--workdir", type=Path, help="keep generated data here (default: temp dir)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="write the JSON report here as well")
+    args = parser.parse_args(argv)
+
+    tmp = None if args.workdir else tempfile.TemporaryDirectory(prefix="optibatch_sqlite_bench_")
+    workdir = (args.workdir or Path(tmp.name)).resolve()
+
+    xml_path = workdir / "data" / f"sqlite_{args.passes}" / "EURUSD" / "EURUSD_2023_03.xml"
+    if not xml_path.exists():
+        write_job_config(xml_path.parent.parent / "job_config.json")
+        write_report(xml_path, args.passes, seed=args.seed)
+
+    results = []
+    try:
+        for name in args.profile:
+            result = run_profile(
+                name, workdir, xml_path, args.batch_size, args.repeat, args.interval
+            )
+            during = result["read_during_ingest"]
+            print(
+                f"{name:>8}: {result['passes_per_sec']} passes/s, "
+                f"reads during ingest median {during['median_ms']} ms / max {during['max_ms']} ms",
+                file=sys.stderr,
+            )
+            results.append(result)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "passes": args.passes,
+        "results": results,
+    }
+    text_out = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text_out + "\n", encoding="utf-8")
+    print(text_out)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@
 Description:
     Updates the types of tester parameters and inputs in an existing OptiBatch SQLite database.
     Reads typing metadata from each job folder's job_config.json or current_config.ini (fallback).
+    Run parameters are retyped into new (re-hashed) parameter sets for that job's runs only;
+    sets shared with other jobs are never modified.
 
 Usage:
     python retype_params_json.py --db .optibatch/optibatch.db --job-root generated
@@ -22,13 +24,21 @@ Author:
 import argparse
 import json
 import os
-import sqlite3
-from typing import Any, Dict, Optional, Union, Callable
+from typing import Any, Dict, Optional, Set, Union
 import configparser
 import re
 from datetime import datetime
 from shutil import copy2
 
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from database.ingest.hashing import canonical_inputs, param_set_hash
+from database.ingest.writer import resolve_param_sets
+from database.maintenance import release_param_sets
+from database.models import Job, ParamSet, Run
+from database.session import init_engine
+
 DBTester = Dict[str, Union[str, int, float, bool]]
 DBInputs = Dict[str, Union[str, int, float, bool]]
 
@@ -93,6 +103,77 @@ def load_job_types(job_folder: str) -> Optional[Dict[str, Union[DBTester, DBInpu
     return None
 
 
+def retype_params(
+    params: Dict[str, Any], types: DBInputs
+) -> Dict[str, Union[str, int, float, bool]]:
+    """Cast each param to the type of its default in `types` (unknown keys are kept)."""
+    retyped: Dict[str, Any] = {}
+    for key, value in params.items():
+        default = types.get(key)
+        if default is None or value is None or type(value) is type(default):
+            retyped[key] = value
+            continue
+        text = str(value)
+        if isinstance(default, bool):
+            typed = infer_type(text)
+            retyped[key] = bool(typed) if not isinstance(typed, str) else value
+        elif isinstance(default, (int, float)):
+            try:
+                number = float(text)
+            except ValueError:
+                retyped[key] = value
+                continue
+            use_int = isinstance(default, int) and number.is_integer()
+            retyped[key] = int(number) if use_int else number
+        else:
+            retyped[key] = text
+    return retyped
+
+
+def retype_job_param_sets(
+    session: Session, job_id: str, types: DBInputs, dry_run: bool = False
+) -> Set[int]:
+    """
+    Point the job's runs at retyped copies of their parameter sets.
+
+    Parameter sets are shared between jobs, so they are never updated in
+    place: each retyped set is hashed and upserted as its own param_sets row
+    (resolve_param_sets, as on ingest) and only this job's runs are moved
+    to it. Returns the ids of the sets that lost or gained runs.
+    """
+    rows = session.execute(
+        select(ParamSet.id, ParamSet.params_hash, ParamSet.params)
+        .where(
+            ParamSet.id.in_(
+                select(Run.param_set_id).where(Run.job_id == job_id).distinct()
+            )
+        )
+        .order_by(ParamSet.id)
+    ).all()
+
+    changed = []
+    for param_set_id, params_hash, params in rows:
+        retyped = retype_params(params or {}, types)
+        new_hash = param_set_hash(canonical_inputs(retyped))
+        if new_hash != params_hash:
+            changed.append(
+                {"old_id": param_set_id, "params_json": retyped, "params_hash": new_hash}
+            )
+    if dry_run or not changed:
+        return {row["old_id"] for row in changed}
+
+    resolve_param_sets(session, changed, {})
+    touched: Set[int] = set()
+    for row in changed:
+        session.execute(
+            update(Run)
+            .where(Run.job_id == job_id, Run.param_set_id == row["old_id"])
+            .values(param_set_id=row["param_set_id"])
+        )
+        touched |= {row["old_id"], row["param_set_id"]}
+    return touched
+
+
 def update_db_types(db_path: str, job_root: str, dry_run: bool = False) -> None:
     """Apply retyping to job and run records already present in the database."""
 
@@ -102,12 +183,14 @@ def update_db_types(db_path: str, job_root: str, dry_run: bool = False) -> None:
         copy2(db_path, backup_path)
         print(f"💾 Backup saved to: {backup_path}")
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    # init_engine() migrates an older database file to the current schema first
+    engine = init_engine(f"sqlite:///{db_path}")
+    session = Session(engine)
 
     jobs = sorted(os.listdir(job_root))
     updated: Dict[str, Any] = {}
     missing = []
+    touched: Set[int] = set()
 
     for job_id in jobs:
         folder = os.path.join(job_root, job_id)
@@ -120,37 +203,29 @@ def update_db_types(db_path: str, job_root: str, dry_run: bool = False) -> None:
             continue
 
         # Update job table (tester_inputs)
-        cursor.execute("SELECT id FROM jobs WHERE id = ? LIMIT 1", (job_id,))
-        job_row = cursor.fetchone()
-        if not job_row:
+        job = session.get(Job, job_id)
+        if job is None:
             missing.append(job_id)
             continue
 
+        if not dry_run:
+            job.tester_inputs = result["tester"]
+
+        # Move the job's runs to retyped parameter sets (shared rows stay as they are)
+        param_set_ids = retype_job_param_sets(session, job_id, result["inputs"], dry_run)
         if dry_run:
             updated[job_id] = {
                 "tester_inputs": result["tester"],
-                "params_json": result["inputs"],
+                "param_sets_retyped": sorted(param_set_ids),
             }
-        else:
-            cursor.execute(
-                "UPDATE jobs SET tester_inputs = ? WHERE id = ?",
-                (json.dumps(result["tester"], default=str), job_id),
-            )
-
-        # Update runs (params_json)
-        cursor.execute("SELECT id FROM runs WHERE job_id = ?", (job_id,))
-        for row in cursor.fetchall():
-            run_id = row[0]
-            if dry_run:
-                continue  # already captured in above
-            cursor.execute(
-                "UPDATE runs SET params_json = ? WHERE id = ?",
-                (json.dumps(result["inputs"], default=str), run_id),
-            )
+        touched |= param_set_ids
 
     if not dry_run:
-        conn.commit()
-    conn.close()
+        session.commit()
+        # Rollups follow the runs to their new sets; unused old sets are dropped
+        release_param_sets(session, touched)
+    session.close()
+    engine.dispose()
 
     print(f"🧠 Found {len(jobs)} job(s) in '{job_root}'")
     if missing:
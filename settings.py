@@ -1,22 +1,89 @@
 # File: settings.py
+# Notes: Settings are resolved on first access (settings.X or `from settings import X`),
+#        not at import: .env is read, the database URL is announced and the data folder
+#        is created only when something actually asks for a value.
 
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-
-load_dotenv()
+from typing import Any
 
 APP_ROOT = Path(__file__).parent
 DATA_DIR = APP_ROOT / ".optibatch"
-DATA_DIR.mkdir(exist_ok=True)
-
-_raw_url = os.getenv("DATABASE_URL")
-
-# Ensure type is always str (not str | None)
-if _raw_url and _raw_url.strip():
-    DATABASE_URL: str = _raw_url.strip()
-    print(f"🔌 Using PostgreSQL from {DATABASE_URL}")
-else:
-    sqlite_path = DATA_DIR / "optibatch.db"
-    DATABASE_URL = f"sqlite:///{sqlite_path.resolve()}"
-    print(f"⚠️  DATABASE_URL not set. Using SQLite fallback at {DATABASE_URL}")
+
+_resolved: dict[str, Any] | None = None
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() not in ("0", "false", "")
+
+
+def _resolve() -> dict[str, Any]:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    values: dict[str, Any] = {}
+
+    _raw_url = os.getenv("DATABASE_URL")
+
+    # Ensure type is always str (not str | None)
+    if _raw_url and _raw_url.strip():
+        values["DATABASE_URL"] = _raw_url.strip()
+        print(f"🔌 Using PostgreSQL from {values['DATABASE_URL']}")
+    else:
+        DATA_DIR.mkdir(exist_ok=True)
+        sqlite_path = DATA_DIR / "optibatch.db"
+        values["DATABASE_URL"] = f"sqlite:///{sqlite_path.resolve()}"
+        print(f"⚠️  DATABASE_URL not set. Using SQLite fallback at {values['DATABASE_URL']}")
+
+    # Ingest write path: rows per INSERT/COPY batch and how batches are written
+    # ("auto" = COPY on PostgreSQL, Core executemany elsewhere; "core"; "copy"; "orm")
+    values["INGEST_BATCH_SIZE"] = int(os.getenv("OPTIBATCH_INGEST_BATCH_SIZE", "5000"))
+    values["INGEST_WRITE_METHOD"] = (
+        os.getenv("OPTIBATCH_INGEST_WRITE_METHOD", "auto").strip().lower()
+    )
+    # Parser processes for folder ingest (1 = parse serially in the writer's process)
+    values["INGEST_WORKERS"] = int(os.getenv("OPTIBATCH_INGEST_WORKERS", "1"))
+
+    # Columnar (Parquet) copy of every ingested pass; OPTIBATCH_PARQUET_ROOT="" disables
+    _parquet_root = os.getenv("OPTIBATCH_PARQUET_ROOT", str(DATA_DIR / "passes"))
+    _parquet_root = _parquet_root.strip()
+    values["PARQUET_ROOT"] = Path(_parquet_root) if _parquet_root else None
+
+    # Write <report>.xml.passidx (byte offset of every pass row) next to ingested XMLs
+    values["PASS_INDEX"] = _flag("OPTIBATCH_PASS_INDEX", "1")
+
+    # SQLite connection profile, set on every connection (OPTIBATCH_SQLITE_PROFILE=0
+    # keeps SQLite's defaults). WAL lets the dashboard read while an ingest commits, and
+    # synchronous=NORMAL only fsyncs at checkpoints, which is safe in WAL mode.
+    values["SQLITE_PROFILE"] = _flag("OPTIBATCH_SQLITE_PROFILE", "1")
+    values["SQLITE_JOURNAL_MODE"] = (
+        os.getenv("OPTIBATCH_SQLITE_JOURNAL_MODE", "WAL").strip().upper()
+    )
+    values["SQLITE_SYNCHRONOUS"] = (
+        os.getenv("OPTIBATCH_SQLITE_SYNCHRONOUS", "NORMAL").strip().upper()
+    )
+    values["SQLITE_CACHE_SIZE_MB"] = int(os.getenv("OPTIBATCH_SQLITE_CACHE_SIZE_MB", "64"))
+    values["SQLITE_MMAP_SIZE_MB"] = int(os.getenv("OPTIBATCH_SQLITE_MMAP_SIZE_MB", "256"))
+    values["SQLITE_TEMP_STORE"] = (
+        os.getenv("OPTIBATCH_SQLITE_TEMP_STORE", "MEMORY").strip().upper()
+    )
+    values["SQLITE_BUSY_TIMEOUT_MS"] = int(
+        os.getenv("OPTIBATCH_SQLITE_BUSY_TIMEOUT_MS", "5000")
+    )
+    return values
+
+
+def resolve_settings() -> dict[str, Any]:
+    """Every setting by name, read from .env and the environment on the first call."""
+    global _resolved
+    if _resolved is None:
+        _resolved = _resolve()
+    return _resolved
+
+
+def __getattr__(name: str) -> Any:
+    values = resolve_settings()
+    if name not in values:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = values[name]  # plain module attribute from now on
+    return values[name]
@@ -1,39 +1,64 @@
 # streamlit_view/filters.py
 
+from dataclasses import dataclass
+
 import streamlit as st
 import pandas as pd
 
+SYMBOLS_KEY = "filter_symbols"
+MONTHS_KEY = "filter_months"
+
+
+@dataclass
+class RunFilters:
+    """Sidebar picks; a range is None while the slider spans every run."""
+
+    symbols: list[str]
+    months: list[str]
+    profit_range: tuple[float, float] | None = None
+    trade_range: tuple[int, int] | None = None
+
+    @property
+    def narrows_runs(self) -> bool:
+        """True when the ranges drop runs inside the picked groups."""
+        return self.profit_range is not None or self.trade_range is not None
 
-def apply_filters(df: pd.DataFrame) -> pd.DataFrame:
+
+def _narrowed(picked: tuple, bounds: tuple) -> tuple | None:
+    return None if tuple(picked) == tuple(bounds) else tuple(picked)
+
+
+def apply_filters(rollups: pd.DataFrame) -> RunFilters:
+    """
+    Build the sidebar from `rollups` (load_rollups) — one row per
+    (job, symbol, month) — so its options and bounds never read the runs.
+    """
     st.sidebar.header("🔎 Filter Runs")
 
     # Symbol filter
-    symbols = df["Symbol"].dropna().unique().tolist()
-    selected_symbols = st.sidebar.multiselect("Symbols", symbols, default=symbols)
+    symbols = sorted(rollups["Symbol"].dropna().unique())
+    selected_symbols = st.sidebar.multiselect(
+        "Symbols", symbols, default=symbols, key=SYMBOLS_KEY
+    )
 
     # Run Month range filter
-    run_months = sorted(df["Run Month"].dropna().unique())
-    selected_months = st.sidebar.multiselect("Run Months", run_months, default=run_months)
+    run_months = sorted(rollups["Run Month"].dropna().unique())
+    selected_months = st.sidebar.multiselect(
+        "Run Months", run_months, default=run_months, key=MONTHS_KEY
+    )
+
+    filters = RunFilters(selected_symbols, selected_months)
 
     # Profit filter
-    min_profit, max_profit = float(df["Profit"].min()), float(df["Profit"].max())
-    profit_range = st.sidebar.slider("Profit Range", min_profit, max_profit, (min_profit, max_profit))
+    if rollups["Profit N"].sum():
+        bounds = float(rollups["Profit Min"].min()), float(rollups["Profit Max"].max())
+        profit_range = st.sidebar.slider("Profit Range", *bounds, bounds)
+        filters.profit_range = _narrowed(profit_range, bounds)
 
     # Trades filter
-    if "Trades" in df.columns:
-        min_trades, max_trades = int(df["Trades"].min()), int(df["Trades"].max())
-        trade_range = st.sidebar.slider("Trades Range", min_trades, max_trades, (min_trades, max_trades))
-    else:
-        trade_range = (None, None)
-
-    # Apply filters
-    filtered_df = df[
-        df["Symbol"].isin(selected_symbols)
-        & df["Run Month"].isin(selected_months)
-        & df["Profit"].between(*profit_range)
-    ]
-
-    if trade_range[0] is not None:
-        filtered_df = filtered_df[filtered_df["Trades"].between(*trade_range)]
-
-    return filtered_df
\ No newline at end of file
+    if rollups["Trades N"].sum():
+        bounds = int(rollups["Trades Min"].min()), int(rollups["Trades Max"].max())
+        trade_range = st.sidebar.slider("Trades Range", *bounds, bounds)
+        filters.trade_range = _narrowed(trade_range, bounds)
+
+    return filters
@@ -4,46 +4,120 @@ from typing import Sequence
 from database.models import Job
 from database.session import get_engine, get_session
 import pandas as pd
-from database.models import Run
+from database.analytics import AnalyticsUnavailable, open_analytics
+from database.models import ParamSet, Run, RunRollup
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
 
-def load_and_prepare_dataframe() -> pd.DataFrame:
-    engine = get_engine()
-    rows: list[dict] = []
+# Dashboard column -> runs column, for the per-run frame
+RUN_COLUMNS = {
+    "Run ID": Run.id,
+    "Job ID": Run.job_id,
+    "Created": Job.created_at,
+    "Symbol": Run.symbol,
+    "Profit": Run.profit,
+    "Drawdown": Run.drawdown,
+    "Custom Score": Run.custom_score,
+    "Sharpe Ratio": Run.sharpe_ratio,
+    "Trades": Run.trades,
+    "Expected Payoff": Run.expected_payoff,
+    "Recovery Factor": Run.recovery_factor,
+    "Profit Factor": Run.profit_factor,
+    "Run Month": Run.run_month,
+    "params_json": ParamSet.params,
+}
+
 
+def load_runs(
+    symbols: Sequence[str],
+    months: Sequence[str],
+    profit_range: tuple[float, float] | None = None,
+    trade_range: tuple[int, int] | None = None,
+) -> pd.DataFrame:
+    """
+    The runs of the picked symbols and months, newest job first. The filters run
+    in SQL and only the shown columns are read, so unpicked runs never load.
+    """
+    query = (
+        select(*(column.label(name) for name, column in RUN_COLUMNS.items()))
+        .join(Job, Job.id == Run.job_id)
+        .outerjoin(ParamSet, ParamSet.id == Run.param_set_id)
+        .where(Run.symbol.in_(symbols), Run.run_month.in_(months))
+        .order_by(Job.created_at.desc(), Run.id)
+    )
+    if profit_range is not None:
+        query = query.where(Run.profit.between(*profit_range))
+    if trade_range is not None:
+        query = query.where(Run.trades.between(*trade_range))
+
+    engine = get_engine()
     with get_session(engine) as session:
-        stmt = (
-            select(Job).options(selectinload(Job.runs)).order_by(Job.created_at.desc())
-        )
-        jobs = session.scalars(stmt).all()
-
-        for job in jobs:
-            for run in job.runs:
-                rows.append(
-                    {
-                        "Run ID": run.id,
-                        "Job ID": job.id,
-                        "Created": job.created_at,
-                        "Symbol": run.symbol,
-                        "Profit": run.profit,
-                        "Drawdown": run.drawdown,
-                        "Custom Score": run.custom_score,
-                        "Sharpe Ratio": run.sharpe_ratio,
-                        "Trades": run.trades,
-                        "Expected Payoff": run.expected_payoff,
-                        "Recovery Factor": run.recovery_factor,
-                        "Profit Factor": run.profit_factor,
-                        "Run Month": run.run_month,
-                        "params_json": run.params_json,
-                    }
-                )
-
-    return pd.DataFrame(rows)
+        rows = session.execute(query).all()
+    return pd.DataFrame(rows, columns=list(RUN_COLUMNS))
 
 
 def load_jobs() -> Sequence[Job]:
     engine = get_engine()
     with get_session(engine) as session:
         return session.query(Job).order_by(Job.created_at.desc()).all()
+
+
+def load_rollups(
+    symbols: Sequence[str] | None = None, months: Sequence[str] | None = None
+) -> pd.DataFrame:
+    """Per (job, symbol, run_month) profit and trades stats from `run_rollups`, for these groups only."""
+    query = select(
+        RunRollup.job_id,
+        RunRollup.symbol,
+        RunRollup.run_month,
+        RunRollup.runs,
+        RunRollup.profit_n,
+        RunRollup.profit_sum,
+        RunRollup.profit_min,
+        RunRollup.profit_max,
+        RunRollup.trades_n,
+        RunRollup.trades_min,
+        RunRollup.trades_max,
+    )
+    if symbols is not None:
+        query = query.where(RunRollup.symbol.in_(symbols))
+    if months is not None:
+        query = query.where(RunRollup.run_month.in_(months))
+
+    engine = get_engine()
+    with get_session(engine) as session:
+        rows = session.execute(query).all()
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "Job ID",
+            "Symbol",
+            "Run Month",
+            "Runs",
+            "Profit N",
+            "Profit Sum",
+            "Profit Min",
+            "Profit Max",
+            "Trades N",
+            "Trades Min",
+            "Trades Max",
+        ],
+    )
+
+
+def load_top_runs(metric: str = "custom_score", n: int = 5) -> pd.DataFrame | None:
+    """Best `n` passes per (job, symbol) from DuckDB; None when it cannot run."""
+    try:
+        with open_analytics() as analytics:
+            return analytics.top_n(metric, n, per=["job_id", "symbol"])
+    except AnalyticsUnavailable:
+        return None
+
+
+def load_month_pivot(metric: str = "profit") -> pd.DataFrame | None:
+    """Total `metric` per symbol (rows) and run month (columns) from DuckDB."""
+    try:
+        with open_analytics() as analytics:
+            return analytics.month_pivot(metric, "sum", "symbol")
+    except AnalyticsUnavailable:
+        return None
@@ -2,14 +2,19 @@
 
 import streamlit as st
 from streamlit_view.layout import configure_page
-from streamlit_view.load_data import load_and_prepare_dataframe
+from streamlit_view.load_data import (
+    load_month_pivot,
+    load_rollups,
+    load_runs,
+    load_top_runs,
+)
 from streamlit_view.charts import (
         show_combined_symbol_chart,
         show_grouped_line_chart,
         show_profit_scatter,
         show_monthly_box_plot
     )
-from streamlit_view.tables import show_run_table
+from streamlit_view.tables import show_month_pivot, show_run_table, show_top_runs
 from streamlit_view.ini_export_controls import show_ini_export_controls
 from streamlit_view.summary import show_summary_insights
 from streamlit_view.filters import apply_filters
@@ -20,16 +25,23 @@ def main() -> None:
 
     st.title("📊 OptiBatch Dashboard")
 
-    df = load_and_prepare_dataframe()
-    if df.empty:
+    rollups = load_rollups()
+    if rollups.empty:
         st.warning("No jobs or runs found.")
         return
-    df = apply_filters(df)
+    filters = apply_filters(rollups)
+    df = load_runs(
+        filters.symbols, filters.months, filters.profit_range, filters.trade_range
+    )
 
     st.success(f"✅ Loaded {len(df)} runs.")
 
-    # Show insights before charts
-    show_summary_insights(df)
+    # Show insights before charts; whole groups are summed from run_rollups, runs
+    # cut by the profit or trades range from the loaded frame
+    picked = rollups[
+        rollups["Symbol"].isin(filters.symbols) & rollups["Run Month"].isin(filters.months)
+    ]
+    show_summary_insights(df, None if filters.narrows_runs else picked)
 
     chart_tabs = st.tabs(
         [
@@ -37,6 +49,8 @@ def main() -> None:
             "📊 Grouped Monthly Line Chart",
             "🟢 Profit Scatter",
             "📦 Monthly Box Plot",
+            "🗓️ Month Pivot",
+            "🏆 Top Runs",
         ]
     )
 
@@ -48,6 +62,11 @@ def main() -> None:
         show_profit_scatter(df)
     with chart_tabs[3]:
         show_monthly_box_plot(df)
+    # Aggregated by DuckDB over the whole database, not the filtered frame
+    with chart_tabs[4]:
+        show_month_pivot(load_month_pivot())
+    with chart_tabs[5]:
+        show_top_runs(load_top_runs())
 
     show_run_table(df)
     show_ini_export_controls()
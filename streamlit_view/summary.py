@@ -2,28 +2,44 @@ import streamlit as st
 import pandas as pd
 
 
-def show_summary_insights(df: pd.DataFrame) -> None:
+def show_summary_insights(df: pd.DataFrame, rollups: pd.DataFrame | None) -> None:
+    """
+    `rollups` are the run_rollups rows of the selected symbols and months
+    (load_rollups), one per (job, symbol, month), and the totals come from
+    them. Pass None when the profit or trades range drops runs inside those
+    groups: the totals are then summed over the filtered runs in `df`.
+    """
     st.markdown("### 🧠 Run Summary Insights")
 
     if df.empty:
         st.info("No data available to summarize.")
         return
 
-    symbol_perf = df.groupby("Symbol")["Profit"].sum().sort_values(ascending=False)
-    month_perf = df.groupby("Run Month")["Profit"].sum().sort_values(ascending=False)
-    avg_profit = df["Profit"].mean()
-    top_run = df.loc[df["Custom Score"].idxmax()] if "Custom Score" in df else None
+    if rollups is None:
+        symbol_perf = df.groupby("Symbol")["Profit"].sum()
+        month_perf = df.groupby("Run Month")["Profit"].sum()
+        avg_profit = df["Profit"].mean()
+    else:
+        symbol_perf = rollups.groupby("Symbol")["Profit Sum"].sum()
+        month_perf = rollups.groupby("Run Month")["Profit Sum"].sum()
+        profit_n = rollups["Profit N"].sum()
+        avg_profit = rollups["Profit Sum"].sum() / profit_n if profit_n else float("nan")
+
+    if symbol_perf.empty:
+        st.info("No rollups for this selection yet. Run `python -m database.rollups`.")
+    else:
+        st.write(
+            f"📌 **Top-performing Symbol**: `{symbol_perf.idxmax()}` with total profit of `{symbol_perf.max():,.2f}`"
+        )
+        st.write(
+            f"📉 **Worst Month**: `{month_perf.idxmin()}` with total loss of `{month_perf.min():,.2f}`"
+        )
+        st.write(
+            f"📈 **Best Month**: `{month_perf.idxmax()}` with total profit of `{month_perf.max():,.2f}`"
+        )
+        st.write(f"📊 **Average Profit per Run**: `{avg_profit:,.2f}`")
 
-    st.write(
-        f"📌 **Top-performing Symbol**: `{symbol_perf.idxmax()}` with total profit of `{symbol_perf.max():,.2f}`"
-    )
-    st.write(
-        f"📉 **Worst Month**: `{month_perf.idxmin()}` with total loss of `{month_perf.min():,.2f}`"
-    )
-    st.write(
-        f"📈 **Best Month**: `{month_perf.idxmax()}` with total profit of `{month_perf.max():,.2f}`"
-    )
-    st.write(f"📊 **Average Profit per Run**: `{avg_profit:,.2f}`")
+    top_run = df.loc[df["Custom Score"].idxmax()] if "Custom Score" in df else None
 
     if top_run is not None:
         st.markdown("🥇 **Top Run by Custom Score**")
@@ -50,3 +50,19 @@ def show_run_table(df: pd.DataFrame) -> None:
     # with st.expander("🔍 Table selection debug:"):
     #     st.write(selected_df)
     #     st.code(f"DEBUG: run_id = {run_id}")
+
+
+def show_top_runs(top_runs: pd.DataFrame | None) -> None:
+    st.markdown("### 🏆 Top Runs per Symbol")
+    if top_runs is None or top_runs.empty:
+        st.info("Top runs need DuckDB (pip install duckdb) and ingested runs.")
+        return
+    st.dataframe(top_runs, use_container_width=True, hide_index=True)
+
+
+def show_month_pivot(pivot: pd.DataFrame | None) -> None:
+    st.markdown("### 🗓️ Profit by Symbol and Month")
+    if pivot is None or pivot.empty:
+        st.info("The month pivot needs DuckDB (pip install duckdb) and ingested runs.")
+        return
+    st.dataframe(pivot.style.format("{:,.2f}", na_rep=""), use_container_width=True)
@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Seconds `import core.main_runner` may take (best of a few fresh interpreters);
+# it was ~1.5 s while the runner pulled in the database layer at import
+MAIN_RUNNER_BUDGET = 0.5
+
+# The runner drives MT5 through the Windows API; elsewhere these are stubbed so the
+# import can still be timed (the stubs are in place before the clock starts)
+WINDOWS_MODULES = ("win32api", "win32con", "win32gui", "win32process", "pyautogui")
+
+_PROBE = """
+import importlib.util, json, sys, time
+from unittest import mock
+for name in {stubs!r}:
+    if importlib.util.find_spec(name) is None:
+        sys.modules[name] = mock.MagicMock(name=name)
+t0 = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - t0
+import database.session as session
+print(json.dumps({{
+    "seconds": seconds,
+    "modules": [m for m in ("sqlalchemy", "numpy") if m in sys.modules],
+    "engine": session._engine is not None,
+    "settings": getattr(sys.modules.get("settings"), "_resolved", None) is not None,
+}}))
+"""
+
+
+def probe_import(
+    module: str, db_file: Path, runs: int = 1, stubs: tuple[str, ...] = ()
+) -> dict:
+    """
+    Import `module` in fresh interpreters; the fastest run's measurements.
+    `stubs` are modules replaced by mocks where they are not installed.
+    """
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_file}"}
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, stubs=stubs)],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(results, key=lambda r: r["seconds"])
+
+
+def test_importing_ingest_does_not_touch_the_database(tmp_path):
+    db_file = tmp_path / "never.db"
+    result = probe_import("database.ingest.ingest_job", db_file)
+
+    assert result["engine"] is False
+    assert result["settings"] is False  # no .env read, no print, no mkdir
+    assert not db_file.exists()
+
+
+def test_main_runner_imports_within_budget(tmp_path):
+    result = probe_import(
+        "core.main_runner", tmp_path / "never.db", runs=3, stubs=WINDOWS_MODULES
+    )
+
+    assert result["modules"] == []  # no SQLAlchemy / NumPy until a job ingests
+    assert result["engine"] is False
+    assert result["seconds"] < MAIN_RUNNER_BUDGET
@@ -0,0 +1,156 @@
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+import settings
+from database.models import Base, Job
+
+HEADERS = [
+    "Pass",
+    "Result",
+    "Profit",
+    "Expected Payoff",
+    "Profit Factor",
+    "Recovery Factor",
+    "Sharpe Ratio",
+    "Custom",
+    "Equity DD %",
+    "Trades",
+    "input_StopLoss",
+    "input_TakeProfit",
+    "input_UseTrail",
+]
+
+
+def spreadsheet_xml(title: str, headers: list[str], rows: list[list[str]]) -> str:
+    """Render a minimal MT5-style SpreadsheetML optimization report."""
+
+    def row_xml(cells: list[str]) -> str:
+        inner = "".join(
+            f'<Cell><Data ss:Type="String">{c}</Data></Cell>' for c in cells
+        )
+        return f"<Row>{inner}</Row>\n"
+
+    return (
+        '<?xml version="1.0"?>\n'
+        '<Workbook xmlns="urn:schemas-microsoft-com:office:spreadsheet" '
+        'xmlns:o="urn:schemas-microsoft-com:office:office" '
+        'xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet">\n'
+        '<DocumentProperties xmlns="urn:schemas-microsoft-com:office:office">\n'
+        f"<Title>{title}</Title>\n"
+        "</DocumentProperties>\n"
+        '<Worksheet ss:Name="Tester Optimizator Results">\n<Table>\n'
+        + row_xml(headers)
+        + "".join(row_xml(r) for r in rows)
+        + "</Table>\n</Worksheet>\n</Workbook>\n"
+    )
+
+
+def sample_rows(count: int, trades: int = 12) -> list[list[str]]:
+    rows = []
+    for i in range(count):
+        rows.append(
+            [
+                str(i),
+                f"{1000 + i}.5",
+                f"{100 + i}.25",
+                "1.5",
+                "1.2",
+                "0.8",
+                "0.3",
+                "0",
+                f"{i % 7}.5%",
+                str(trades),
+                str(10 + i),
+                f"{2.5 + i}",
+                "true" if i % 2 else "false",
+            ]
+        )
+    return rows
+
+
+@pytest.fixture
+def make_report(tmp_path: Path):
+    def _make(
+        name: str = "IndyTSL.EURUSD.2023-03.xml",
+        rows: list[list[str]] | None = None,
+        title: str = "IndyTSL EURUSD,H1 2023.03.01-2023.03.31",
+        folder: Path | None = None,
+    ) -> Path:
+        path = (folder or tmp_path) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        content = spreadsheet_xml(title, HEADERS, rows if rows is not None else sample_rows(5))
+        path.write_text(content, encoding="utf-8")
+        return path
+
+    return _make
+
+
+@pytest.fixture
+def job_config(tmp_path: Path) -> Path:
+    config = {
+        "tester": {
+            "Expert": "Shared Projects\\IndyTSL\\IndyTSL_v2.ex5",
+            "Model": 1,
+            "Period": "H1",
+            "Optimization": 2,
+            "OptimizationCriterion": 6,
+            "Deposit": 10000,
+            "Currency": "USD",
+            "Leverage": 100,
+        },
+        "inputs": {
+            "input_StopLoss": {"default": 10, "start": 10, "step": 1, "end": 50, "optimize": True},
+            "input_TakeProfit": {"default": 2.5, "start": 1.0, "step": 0.5, "end": 9.0, "optimize": True},
+            "input_UseTrail": {"value": "false"},
+        },
+    }
+    path = tmp_path / "job_config.json"
+    path.write_text(json.dumps(config), encoding="utf-8")
+    return path
+
+
+@pytest.fixture(autouse=True)
+def no_parquet_sidecar(monkeypatch):
+    # Keep ingest tests from writing into the real .optibatch/passes store
+    monkeypatch.setattr(settings, "PARQUET_ROOT", None)
+
+
+@pytest.fixture
+def db_engine():
+    # One shared in-memory connection, usable from ingest threads too
+    engine = create_engine(
+        "sqlite://",
+        future=True,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine, tmp_path: Path, monkeypatch):
+    # ingest writes generated/<job>/valid_symbols.csv relative to the cwd
+    monkeypatch.chdir(tmp_path)
+    with Session(db_engine) as session:
+        session.add(
+            Job(
+                id="job1",
+                job_name="job1",
+                expert_name="IndyTSL_v2",
+                expert_path="IndyTSL_v2.ex5",
+                period="H1",
+                deposit=10000.0,
+                currency="USD",
+                leverage="100",
+                tester_inputs={},
+            )
+        )
+        session.flush()
+        yield session
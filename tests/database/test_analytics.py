@@ -0,0 +1,108 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+import settings
+from database.ingest import ingest_job
+from database.ingest.ingest_job import ingest_job_folder
+from database.models import Base, Run
+from tests.database.conftest import sample_rows
+
+duckdb = pytest.importorskip("duckdb")
+
+from database.analytics import Analytics  # noqa: E402
+
+
+@pytest.fixture
+def ingested(make_report, job_config, monkeypatch):
+    """A two-symbol job ingested into a SQLite file and the Parquet store."""
+    folder = job_config.parent
+    engine = create_engine(f"sqlite:///{folder / 'optibatch.db'}")
+    Base.metadata.create_all(engine)
+    monkeypatch.chdir(folder)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: engine)
+    monkeypatch.setattr(settings, "PARQUET_ROOT", folder / "passes")
+    make_report("EURUSD/a.xml", rows=sample_rows(6), folder=folder)
+    make_report(
+        "GBPUSD/b.xml",
+        rows=sample_rows(4),
+        title="IndyTSL GBPUSD,H1 2023.04.01-2023.04.30",
+        folder=folder,
+    )
+    assert ingest_job_folder(folder) == 10
+    yield engine, folder
+    engine.dispose()
+
+
+def test_parquet_helpers_match_the_database(ingested):
+    engine, folder = ingested
+    with Session(engine) as session:
+        totals = dict(
+            session.execute(select(Run.symbol, func.sum(Run.profit)).group_by(Run.symbol)).all()
+        )
+
+    with Analytics.from_parquet(folder / "passes") as analytics:
+        assert analytics.param_columns == ["input_StopLoss", "input_TakeProfit", "input_UseTrail"]
+
+        top = analytics.top_n("profit", n=2, columns=["pass_number", "input_StopLoss"])
+        assert top[["symbol", "pass_number", "input_StopLoss"]].values.tolist() == [
+            ["EURUSD", 5, 15],
+            ["EURUSD", 4, 14],
+            ["GBPUSD", 3, 13],
+            ["GBPUSD", 2, 12],
+        ]
+
+        stats = analytics.param_stats("input_UseTrail", symbols=["EURUSD"])
+        assert stats["input_UseTrail"].tolist() == [False, True]
+        assert stats["runs"].tolist() == [3, 3]
+
+        pivot = analytics.month_pivot("profit", "sum")
+        assert list(pivot.columns) == ["2023-03", "2023-04"]
+        assert pivot.loc["EURUSD", "2023-03"] == pytest.approx(totals["EURUSD"])
+        assert pivot.loc["GBPUSD", "2023-04"] == pytest.approx(totals["GBPUSD"])
+
+        with pytest.raises(ValueError):
+            analytics.top_n("profit; DROP TABLE runs")
+
+
+def test_sqlite_view_matches_parquet(ingested):
+    engine, folder = ingested
+    try:
+        duckdb.connect().execute("LOAD sqlite")
+    except duckdb.Error:
+        pytest.skip("DuckDB's sqlite extension is not available offline")
+
+    with (
+        Analytics.from_sqlite(folder / "optibatch.db") as db,
+        Analytics.from_parquet(folder / "passes") as store,
+    ):
+        assert db.param_columns == store.param_columns
+        columns = ["pass_number", "profit", *store.param_columns]
+        assert db.top_n("profit", n=3, columns=columns).equals(
+            store.top_n("profit", n=3, columns=columns)
+        )
+
+
+def test_stats_endpoints_use_analytics(ingested, monkeypatch):
+    from backend.main import app
+    from backend.routers import stats_db_connected as stats
+
+    _, folder = ingested
+    monkeypatch.setattr(
+        stats, "open_analytics", lambda: Analytics.from_parquet(folder / "passes")
+    )
+    client = TestClient(app)
+
+    top = client.get("/stats/top", params={"metric": "profit", "n": 1}).json()
+    assert [(r["symbol"], r["pass_number"]) for r in top] == [("EURUSD", 5), ("GBPUSD", 3)]
+
+    months = client.get("/stats/months", params={"agg": "count"}).json()
+    assert months == [
+        {"symbol": "EURUSD", "2023-03": 6, "2023-04": None},
+        {"symbol": "GBPUSD", "2023-03": None, "2023-04": 4},
+    ]
+
+    params = client.get("/stats/params", params={"param": "input_UseTrail"}).json()
+    assert [r["runs"] for r in params] == [5, 5]
+    assert client.get("/stats/top", params={"metric": "nope"}).status_code == 400
@@ -0,0 +1,107 @@
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.ingest import archive as archive_module
+from database.ingest import ingest_job
+from database.ingest.archive import JobArchive, is_job_archive
+from database.ingest.forward import forward_report_path
+from database.ingest.ingest_job import ingest_job_folder
+from database.models import IngestedFile, Run
+from tests.database.conftest import sample_rows
+from tests.database.test_forward import write_forward
+
+
+@pytest.fixture
+def job_folder(tmp_path: Path, make_report, job_config) -> Path:
+    folder = tmp_path / "job_arch"
+    folder.mkdir()
+    (folder / "job_config.json").write_bytes(job_config.read_bytes())
+    xml_path = make_report("EURUSD/a.xml", rows=sample_rows(3), folder=folder)
+    write_forward(forward_report_path(xml_path), [0, 2])
+    make_report(
+        "GBPUSD/b.xml",
+        rows=sample_rows(4),
+        title="IndyTSL GBPUSD,H1 2023.02.01-2023.02.28",
+        folder=folder,
+    )
+    return folder
+
+
+def pack(folder: Path, name: str, reverse: bool = False) -> Path:
+    path = folder.parent / "archives" / name
+    path.parent.mkdir(exist_ok=True)
+    files = sorted((p for p in folder.rglob("*") if p.is_file()), reverse=reverse)
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for f in files:
+                zf.write(f, f.relative_to(folder.parent).as_posix())
+    else:
+        with tarfile.open(path, "w:gz") as tf:
+            for f in files:
+                tf.add(f, f.relative_to(folder).as_posix())  # contents only, no job folder
+    return path
+
+
+def test_archive_lists_reports_with_forward(job_folder: Path):
+    archive = JobArchive(pack(job_folder, "job_arch.zip"))
+
+    assert archive.job_id == "job_arch"
+    assert [str(m) for m in archive.reports] == [
+        "job_arch.zip!job_arch/EURUSD/a.xml",
+        "job_arch.zip!job_arch/GBPUSD/b.xml",
+    ]
+    assert archive.reports[0].forward.name == "a.fwd.xml"
+    assert archive.reports[1].forward is None
+    assert archive.read_config()["tester"]["Period"] == "H1"
+
+
+@pytest.mark.parametrize("name", ["job_arch.zip", "job_arch.tar.gz"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_archive_ingests_like_folder(db_engine, job_folder, monkeypatch, name, workers):
+    monkeypatch.chdir(job_folder.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    archive = pack(job_folder, name)
+    assert is_job_archive(archive)
+
+    assert ingest_job_folder(archive, workers=workers) == 7
+    assert not (archive.parent / "job_arch").exists()  # nothing was extracted
+    assert ingest_job_folder(archive, workers=workers) == 0  # deduplicated by hash
+
+    with Session(db_engine) as session:
+        runs = list(session.scalars(select(Run).where(Run.job_id == "job_arch")))
+        assert session.scalar(select(IngestedFile)) is None
+    assert sorted(r.symbol for r in runs) == ["EURUSD"] * 3 + ["GBPUSD"] * 4
+    forward = {
+        r.params_json["input_StopLoss"]: r.forward_result
+        for r in runs
+        if r.symbol == "EURUSD"
+    }
+    assert forward == {10: 500.0, 11: None, 12: 502.0}
+
+
+def test_tar_members_are_read_front_to_back(db_engine, job_folder, monkeypatch, make_report):
+    write_forward(forward_report_path(job_folder / "GBPUSD" / "b.xml"), [1])
+    monkeypatch.chdir(job_folder.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    archive = pack(job_folder, "job_arch.tar.gz", reverse=True)  # GBPUSD first, forwards after
+
+    assert [m.name for m in JobArchive(archive).reports] == ["b.xml", "a.xml"]
+
+    seeks: list[tuple[str, bool]] = []
+    member_reader = archive_module._MemberReader
+
+    def record(stream, offset, size, name):
+        seeks.append((name, offset >= stream.tell()))
+        return member_reader(stream, offset, size, name)
+
+    monkeypatch.setattr(archive_module, "_MemberReader", record)
+    assert ingest_job_folder(archive, workers=1) == 7
+
+    reports = [(name, forward) for name, forward in seeks if name.endswith(".xml")]
+    assert sorted(name for name, _ in reports) == ["a.fwd.xml", "a.xml", "b.fwd.xml", "b.xml"]
+    assert all(forward for _, forward in reports)
@@ -0,0 +1,123 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database.ingest import ingest_job
+from database.ingest.hashing import ResultHasher
+from database.ingest.ingest_job import ensure_job, ingest_job_folder, ingest_single_xml
+from database.ingest.plan import build_ingest_plan
+from database.models import IngestCheckpoint, IngestedFile, Job, QuarantinedPass, Run
+from tests.database.conftest import sample_rows
+
+
+@pytest.fixture
+def owned_ingest(db_engine, job_config, monkeypatch):
+    """ingest_single_xml with its own sessions on the test engine."""
+    monkeypatch.chdir(job_config.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    plan = build_ingest_plan(job_config)
+    with Session(db_engine) as session:
+        ensure_job(session, "job1", plan)
+        session.commit()
+
+    def _ingest(xml_path, batch_size=2):
+        return ingest_single_xml(
+            xml_path, job_config, job_id="job1", plan=plan, batch_size=batch_size
+        )
+
+    return _ingest
+
+
+def count(engine, model) -> int:
+    with Session(engine) as session:
+        return session.scalar(select(func.count()).select_from(model))
+
+
+def test_failed_ingest_resumes_after_checkpoint(db_engine, make_report, owned_ingest, monkeypatch):
+    xml_path = make_report(rows=sample_rows(5))
+    real_hash = ResultHasher.hash_canonical_pass
+    calls = []
+
+    def hash_pass(self, *args):
+        calls.append(args)
+        if len(calls) == 4:
+            raise ConnectionError("database went away")
+        return real_hash(self, *args)
+
+    monkeypatch.setattr(ResultHasher, "hash_canonical_pass", hash_pass)
+    with pytest.raises(ConnectionError):
+        owned_ingest(xml_path)
+
+    # The first batch (passes 0-1) survived the failure, with its checkpoint
+    assert count(db_engine, Run) == 2
+    with Session(db_engine) as session:
+        checkpoint = session.scalar(select(IngestCheckpoint))
+    assert checkpoint.last_pass == 1
+    assert checkpoint.runs_committed == 2
+
+    calls.clear()
+    assert owned_ingest(xml_path) == 3
+    assert len(calls) == 3  # passes 0-1 were skipped, not re-hashed
+    assert count(db_engine, Run) == 5
+    assert count(db_engine, IngestCheckpoint) == 0
+
+
+def test_changed_file_ignores_stale_checkpoint(db_engine, make_report, owned_ingest):
+    xml_path = make_report(rows=sample_rows(3))
+    with Session(db_engine) as session:
+        session.add(
+            IngestCheckpoint(
+                job_id="job1",
+                path=xml_path.resolve().as_posix(),
+                digest="0" * 64,
+                last_pass=1,
+            )
+        )
+        session.commit()
+
+    assert owned_ingest(xml_path) == 3
+    assert count(db_engine, IngestCheckpoint) == 0
+
+
+def test_unparsable_metrics_are_quarantined(db_engine, make_report, owned_ingest):
+    rows = sample_rows(4)
+    rows[1][2] = "n/a"  # Profit
+    rows[3][9] = "lots"  # Trades
+    xml_path = make_report(rows=rows)
+
+    assert owned_ingest(xml_path, batch_size=100) == 2
+
+    with Session(db_engine) as session:
+        quarantined = {q.pass_number: q for q in session.scalars(select(QuarantinedPass))}
+        stored = sorted(session.scalars(select(Run.pass_number)))
+    assert stored == [0, 2]
+    assert set(quarantined) == {1, 3}
+    assert quarantined[1].error == "unparsable profit"
+    assert quarantined[1].raw_values["Profit"] == "n/a"
+    assert quarantined[3].error == "unparsable trades"
+    assert quarantined[3].source == xml_path.name
+
+
+def test_empty_new_job_is_kept_only_for_its_quarantined_passes(
+    db_engine, make_report, job_config, monkeypatch
+):
+    folder = job_config.parent
+    monkeypatch.chdir(folder)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    rows = sample_rows(2)
+    for row in rows:
+        row[2] = "n/a"  # Profit
+    make_report("EURUSD/a.xml", rows=rows, folder=folder)
+
+    assert ingest_job_folder(folder, batch_size=1) == 0
+    assert count(db_engine, Job) == 1
+    assert count(db_engine, QuarantinedPass) == 2
+    assert count(db_engine, IngestCheckpoint) == 0
+
+    with Session(db_engine) as session:
+        for model in (QuarantinedPass, IngestedFile, Job):
+            session.query(model).delete()
+        session.commit()
+    make_report("EURUSD/a.xml", rows=sample_rows(2, trades=0), folder=folder)
+    assert ingest_job_folder(folder, batch_size=1, force=True) == 0
+    assert count(db_engine, Job) == 0
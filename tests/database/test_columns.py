@@ -0,0 +1,53 @@
+import math
+
+import numpy as np
+
+from database.ingest.columns import bool_column, float_column, int_column, percent_column
+from database.ingest.plan import build_ingest_plan
+from tests.database.conftest import HEADERS, sample_rows
+
+
+def test_columns_mask_unparsable_cells():
+    values, errors = float_column(["1.5", " 2 ", "abc", ""])
+    assert values[:2].tolist() == [1.5, 2.0]
+    assert math.isnan(values[2]) and math.isnan(values[3])
+    assert errors.tolist() == [False, False, True, True]
+
+    assert percent_column(["4.5%", " 12 % ", ""])[0].tolist() == [4.5, 12.0, 0.0]
+    assert bool_column([" TRUE", "false", "yes"])[0].tolist() == [True, False, False]
+
+    ints, errors = int_column(["3.0", "2.7", "inf", "x"])
+    assert ints.tolist() == [3, 2, 0, 0]
+    assert errors.tolist() == [False, False, True, True]
+    assert int_column(["2.5", "7"], exact=True)[1].tolist() == [True, False]
+
+
+def test_block_coercion_matches_row_coercion(job_config):
+    layout = build_ingest_plan(job_config).layout_for(HEADERS)
+    records = [tuple(row) for row in sample_rows(9)]
+
+    block = layout.coerce_block(records)
+    assert block.invalid_cells == 0
+    assert isinstance(block.metrics["custom_score"], np.ndarray)
+
+    rows = list(block.rows())
+    assert rows == [(layout.coerce_metrics(r), layout.coerce_inputs(r)) for r in records]
+    assert [type(v) for v in rows[1][1].values()] == [int, float, bool]
+
+
+def test_block_coercion_flags_bad_and_missing_cells(job_config):
+    layout = build_ingest_plan(job_config).layout_for(HEADERS)
+    records = sample_rows(3)
+    records[0][2] = "n/a"  # Profit
+    records[1][10] = "auto"  # input_StopLoss
+    records[2] = records[2][:11]  # trailing input cells missing
+
+    block = layout.coerce_block(records)
+    assert block.invalid_cells == 2
+    assert block.errors["profit"].tolist() == [True, False, False]
+    assert block.errors["custom_score"].tolist() == [True, False, False]
+
+    (m0, _), (_, i1), (_, i2) = block.rows()
+    assert m0["profit"] is None and m0["custom_score"] is None
+    assert i1["input_StopLoss"] == "auto"  # kept as text, like the row coercers
+    assert "input_TakeProfit" not in i2 and "input_UseTrail" not in i2
@@ -0,0 +1,149 @@
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.ingest import ingest_job
+from database.ingest.forward import (
+    back_report_path,
+    forward_report_path,
+    is_forward_report,
+)
+from database.ingest.ingest_job import ingest_job_folder, ingest_single_xml
+from database.models import IngestedFile, Run
+from tests.database.conftest import sample_rows, spreadsheet_xml
+
+FWD_HEADERS = [
+    "Pass",
+    "Forward Result",
+    "Back Result",
+    "Profit",
+    "Expected Payoff",
+    "Profit Factor",
+    "Recovery Factor",
+    "Sharpe Ratio",
+    "Custom",
+    "Equity DD %",
+    "Trades",
+    "input_StopLoss",
+    "input_TakeProfit",
+    "input_UseTrail",
+]
+FWD_TITLE = "IndyTSL EURUSD,H1 2023.03.23-2023.03.31"
+
+
+def write_forward(path: Path, stop_losses: list[int]) -> Path:
+    """Forward passes for the given sample_rows indexes (StopLoss = 10 + i), reversed."""
+    rows = []
+    for i in reversed(stop_losses):
+        rows.append(
+            [
+                str(i),
+                f"{500 + i}.0",
+                f"{1000 + i}.5",
+                f"{-5 - i}.0",
+                "0.5",
+                "0.9",
+                "0.1",
+                "-0.2",
+                "0",
+                "3.0%",
+                "4",
+                str(10 + i),
+                f"{2.5 + i}",
+                "true" if i % 2 else "false",
+            ]
+        )
+    path.write_text(spreadsheet_xml(FWD_TITLE, FWD_HEADERS, rows), encoding="utf-8")
+    return path
+
+
+def test_forward_report_paths(tmp_path: Path):
+    opt = tmp_path / "IndyTSL.EURUSD.H1.20230301_20230331.7.opt.xml"
+    plain = tmp_path / "EURUSD_2023_03.xml"
+
+    assert forward_report_path(opt).name == "IndyTSL.EURUSD.H1.20230301_20230331.7.fwd.xml"
+    assert forward_report_path(plain).name == "EURUSD_2023_03.fwd.xml"
+    assert is_forward_report(forward_report_path(plain))
+    assert not is_forward_report(plain)
+
+    fwd = forward_report_path(plain)
+    assert back_report_path(fwd) is None
+    plain.write_text("x")
+    assert back_report_path(fwd) == plain
+
+
+def test_forward_metrics_joined_on_ingest(db_session, make_report, job_config):
+    xml_path = make_report("EURUSD_2023_03.xml", rows=sample_rows(4))
+    write_forward(forward_report_path(xml_path), [0, 2, 3])
+
+    assert ingest_single_xml(xml_path, job_config, db_session, "job1") == 4
+
+    runs = {
+        r.params_json["input_StopLoss"]: r
+        for r in db_session.scalars(select(Run).where(Run.job_id == "job1"))
+    }
+    joined = runs[12]
+    assert joined.profit == 102.25  # back-test metrics untouched
+    assert joined.forward_result == 502.0
+    assert joined.forward_profit == -7.0
+    assert joined.forward_drawdown == 3.0
+    assert joined.forward_custom_score == -13.0
+    assert joined.forward_trades == 4
+    assert str(joined.forward_start_date) == "2023-03-23"
+    assert str(joined.forward_end_date) == "2023-03-31"
+
+    assert runs[11].forward_result is None  # no forward pass for this set
+    assert runs[11].forward_start_date is None
+    assert {sl for sl, r in runs.items() if r.forward_trades} == {10, 12, 13}
+
+
+def test_late_forward_report_links_existing_runs(db_engine, make_report, job_config, monkeypatch):
+    monkeypatch.chdir(job_config.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    folder = job_config.parent
+    xml_path = make_report("EURUSD/a.opt.xml", rows=sample_rows(3), folder=folder)
+
+    assert ingest_job_folder(folder) == 3
+
+    write_forward(forward_report_path(xml_path), [1, 2])
+    assert ingest_job_folder(folder) == 0  # nothing new inserted, forward linked
+
+    with Session(db_engine) as session:
+        forward = {
+            r.params_json["input_StopLoss"]: r.forward_result
+            for r in session.scalars(select(Run))
+        }
+        entry = session.scalar(
+            select(IngestedFile).where(IngestedFile.path == "EURUSD/a.fwd.xml")
+        )
+    assert forward == {10: None, 11: 501.0, 12: 502.0}
+    assert entry is not None and entry.passes == 2
+
+
+def test_folder_ingest_joins_and_records_forward(db_engine, make_report, job_config, monkeypatch):
+    monkeypatch.chdir(job_config.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    folder = job_config.parent
+    xml_path = make_report("EURUSD/a.xml", rows=sample_rows(3), folder=folder)
+    write_forward(forward_report_path(xml_path), [0, 1, 2])
+
+    linked = []
+    monkeypatch.setattr(
+        "database.ingest.forward.link_forward_report",
+        lambda *args: linked.append(args),
+    )
+
+    # The forward report is never ingested as back-test passes of its own
+    assert ingest_job_folder(folder) == 3
+    assert linked == []
+
+    with Session(db_engine) as session:
+        runs = list(session.scalars(select(Run)))
+        paths = set(session.scalars(select(IngestedFile.path)))
+    assert len(runs) == 3
+    assert all(r.forward_trades == 4 for r in runs)
+    assert paths == {"EURUSD/a.xml", "EURUSD/a.fwd.xml"}
+
+    assert ingest_job_folder(folder) == 0  # both files unchanged
+    assert linked == []
@@ -0,0 +1,129 @@
+import struct
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import settings
+from database.ingest import frames
+from database.ingest.frames import FrameFileReader, FrameFollower, ingest_frame_file
+from database.ingest.plan import build_ingest_plan
+from database.models import Run
+from database.parquet_store import read_passes
+from tests.database.conftest import HEADERS, sample_rows
+
+TITLE = "IndyTSL EURUSD,H1 2023.03.01-2023.03.31"
+
+
+def _csv_lines(rows):
+    return [f"# {TITLE}", ",".join(HEADERS)] + [",".join(r) for r in rows]
+
+
+def test_csv_reader_only_returns_complete_lines(tmp_path):
+    path = tmp_path / "EURUSD.frames.csv"
+    lines = _csv_lines(sample_rows(3))
+    path.write_text("\n".join(lines[:3]) + "\n" + lines[3][:10], encoding="utf-8")
+
+    reader = FrameFileReader(path)
+    first = reader.read_available()
+    assert reader.title == TITLE
+    assert [r.pass_number for r in first] == [0]
+
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    rest = reader.read_available()
+    assert [r.pass_number for r in rest] == [1, 2]
+    assert rest[0].get("Equity DD %") == "1.5%"
+    assert reader.read_available() == []
+
+
+def test_utf16_csv_as_written_by_mt5(tmp_path):
+    path = tmp_path / "EURUSD.frames.csv"
+    path.write_bytes(b"\xff\xfe" + ("\r\n".join(_csv_lines(sample_rows(2))) + "\r\n").encode("utf-16-le"))
+    assert [r.get("Trades") for r in FrameFileReader(path).read_available()] == ["12", "12"]
+
+
+def _binary_frames(rows):
+    kinds = [0] * 9 + [1, 1, 0, 2]  # Trades/StopLoss as long, UseTrail as bool
+    head = b"OBFR" + struct.pack("<H", 1)
+    head += struct.pack("<H", len(TITLE)) + TITLE.encode()
+    head += struct.pack("<H", len(HEADERS))
+    for name, kind in zip(HEADERS, kinds):
+        head += struct.pack("<BH", kind, len(name)) + name.encode()
+    body = b""
+    for row in rows:
+        values = [float(c.rstrip("%")) if k == 0 else int(c == "true" if k == 2 else c) for c, k in zip(row, kinds)]
+        fmt = "<q" + "".join("d" if k == 0 else "q" for k in kinds)
+        body += struct.pack(fmt, int(row[0]), *values)
+    return head, body
+
+
+def test_binary_reader_resumes_mid_record(tmp_path):
+    path = tmp_path / "EURUSD.frames.bin"
+    head, body = _binary_frames(sample_rows(3))
+    path.write_bytes(head + body[:-5])
+
+    reader = FrameFileReader(path)
+    assert [r.pass_number for r in reader.read_available()] == [0, 1]
+    path.write_bytes(head + body)
+    (last,) = reader.read_available()
+    assert last.get("input_UseTrail") == "false"
+    assert last.get("input_StopLoss") == "12"
+
+
+def test_frames_ingest_like_the_xml_report(db_session, job_config, tmp_path):
+    path = tmp_path / "EURUSD.frames.bin"
+    head, body = _binary_frames(sample_rows(4))
+    path.write_bytes(head + body)
+
+    stats = ingest_frame_file(path, build_ingest_plan(job_config), db_session, "job1")
+    assert stats.inserted == 4
+    run = db_session.scalars(select(Run).where(Run.pass_number == 1)).one()
+    assert run.params_json == {
+        "input_StopLoss": 11,
+        "input_TakeProfit": 3.5,
+        "input_UseTrail": True,
+    }
+
+
+def test_follower_commits_passes_while_file_grows(db_engine, job_config, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(frames, "get_engine", lambda: db_engine)
+    path = tmp_path / "EURUSD.frames.csv"
+    lines = _csv_lines(sample_rows(5))
+    path.write_text("\n".join(lines[:4]) + "\n", encoding="utf-8")
+
+    follower = FrameFollower([path], job_config, "job1", poll_interval=0.01).start()
+    with path.open("a", encoding="utf-8") as f:
+        f.write("\n".join(lines[4:]) + "\n")
+    stats = follower.finish()
+
+    assert follower.error is None
+    assert stats.inserted == 5
+    with Session(db_engine) as session:
+        assert session.scalar(select(func.count(Run.id))) == 5
+
+
+def test_follower_merges_its_parquet_parts(db_engine, job_config, tmp_path, monkeypatch):
+    store = tmp_path / "passes"
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(frames, "get_engine", lambda: db_engine)
+    monkeypatch.setattr(settings, "PARQUET_ROOT", store)
+    path = tmp_path / "EURUSD.frames.csv"
+    lines = _csv_lines(sample_rows(5))
+    path.write_text("\n".join(lines[:4]) + "\n", encoding="utf-8")
+
+    follower = FrameFollower([path], job_config, "job1", poll_interval=0.01).start()
+    deadline = time.monotonic() + 10
+    while follower.stats.inserted < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with path.open("a", encoding="utf-8") as f:
+        f.write("\n".join(lines[4:]) + "\n")
+    while follower.stats.inserted < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(list(store.rglob("*.parquet"))) == 2  # one part per poll while MT5 runs
+
+    follower.finish()
+    assert follower.error is None
+    assert [f.name for f in store.rglob("*.parquet")] == ["EURUSD.parquet"]
+    table = read_passes(store, columns=["pass_number"])
+    assert table.column("pass_number").to_pylist() == [0, 1, 2, 3, 4]
@@ -0,0 +1,62 @@
+import hashlib
+import json
+from datetime import date
+
+import pytest
+
+from database.ingest.hashing import (
+    ResultHasher,
+    parse_result_hash,
+    tag_result_hash,
+)
+from database.ingest.ingest_job import generate_result_hash
+
+
+def _legacy_hash(symbol, modeling_mode, start_date, end_date, inputs, strategy_version, summary):
+    # The pre-hashing-module implementation; stored result_hash values use it
+    key = {
+        "symbol": symbol,
+        "modeling_mode": modeling_mode,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "inputs": dict(sorted(inputs.items())),
+        "strategy_version": strategy_version,
+        "summary": summary,
+    }
+    encoded = json.dumps(key, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+PASSES = [
+    ({"input_B": 2, "input_A": 1.5, "input_C": True}, {"profit": 10.0, "drawdown": 1.25, "trades": 3}),
+    ({"input_Mode": "fast", "input_X": "é"}, {"profit": -3.5, "drawdown": 0.0, "trades": 1}),
+    ({}, {"profit": float("nan"), "drawdown": 2.0, "trades": 7}),
+]
+
+
+@pytest.mark.parametrize("strategy_version", ["1.2", None])
+def test_hasher_matches_legacy_digest(strategy_version):
+    args = ("GER40.cash", "Every tick", date(2023, 3, 1), date(2023, 3, 31))
+    hasher = ResultHasher(*args, strategy_version)
+
+    expected = [
+        _legacy_hash(*args, inputs, strategy_version, summary) for inputs, summary in PASSES
+    ]
+    assert [hasher.hash(inputs, summary) for inputs, summary in PASSES] == expected
+    assert hasher.hash_many(PASSES) == expected
+    assert [
+        hasher.hash_pass(inputs, s["profit"], s["drawdown"], s["trades"]) for inputs, s in PASSES
+    ] == expected
+    assert hasher.hash_pass({}, None, 1.0, None) == _legacy_hash(
+        *args, {}, strategy_version, {"profit": None, "drawdown": 1.0, "trades": None}
+    )
+    assert generate_result_hash(*args, PASSES[0][0], strategy_version, PASSES[0][1]) == expected[0]
+
+
+def test_result_hash_versions_are_recognised():
+    digest = "ab" * 32
+    assert parse_result_hash(tag_result_hash(digest)) == (1, digest)
+    assert tag_result_hash(digest, 2) == f"v2:{digest}"
+    assert parse_result_hash(f"v2:{digest}") == (2, digest)
+    with pytest.raises(ValueError):
+        parse_result_hash("not-a-hash")
@@ -0,0 +1,18 @@
+from check_indexes import expected_indexes, missing_indexes
+from database.models import Run
+
+
+def test_check_indexes_reports_missing_run_indexes(db_engine):
+    assert set(expected_indexes()) == {
+        "ix_runs_job_id",
+        "ix_runs_job_symbol_month",
+        "ix_runs_symbol_month_profit",
+        "ix_runs_job_custom_score",
+        "ix_runs_archived_status",
+        "ix_runs_param_set_id",
+    }
+    assert missing_indexes(db_engine) == []
+
+    index = next(ix for ix in Run.__table__.indexes if ix.name == "ix_runs_job_custom_score")
+    index.drop(db_engine)
+    assert missing_indexes(db_engine) == ["ix_runs_job_custom_score"]
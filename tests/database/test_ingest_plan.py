@@ -0,0 +1,40 @@
+from database.ingest.plan import build_ingest_plan, get_ingest_plan
+from tests.database.conftest import HEADERS
+
+
+def test_plan_resolves_types_once(job_config):
+    plan = build_ingest_plan(job_config)
+
+    assert plan.input_types == {
+        "input_StopLoss": int,
+        "input_TakeProfit": float,
+        "input_UseTrail": bool,
+    }
+    assert plan.job_meta["strategy_version"] == "2"
+    assert plan.layout_for(HEADERS) is plan.layout_for(tuple(HEADERS))
+
+
+def test_layout_coerces_inputs_and_metrics(job_config):
+    layout = build_ingest_plan(job_config).layout_for(HEADERS)
+    record = ("0", "1.5", "120", "1", "1", "1", "0.2", "0", "4.5%", "7", "3.0", "2.5", "true")
+
+    assert layout.coerce_inputs(record) == {
+        "input_StopLoss": 3,
+        "input_TakeProfit": 2.5,
+        "input_UseTrail": True,
+    }
+    metrics = layout.coerce_metrics(record)
+    assert metrics["drawdown"] == 4.5
+    assert metrics["trades"] == 7
+    assert metrics["custom_score"] == 120 - 9.0
+
+
+def test_missing_metric_columns_default_to_zero(job_config):
+    layout = build_ingest_plan(job_config).layout_for(["Profit", "Trades"])
+    metrics = layout.coerce_metrics(("10", "2"))
+    assert metrics["sharpe_ratio"] == 0.0
+    assert metrics["custom_score"] == 10.0
+
+
+def test_get_ingest_plan_is_cached(job_config):
+    assert get_ingest_plan(job_config) is get_ingest_plan(job_config)
@@ -0,0 +1,188 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+import settings
+from database.ingest import ingest_job
+from database.ingest.ingest_job import ingest_job_folder
+from database.maintenance import archive_job, delete_job, move_job
+from database.models import (
+    Base,
+    IngestedFile,
+    Job,
+    ParamSet,
+    ParamSetRollup,
+    Run,
+    RunRollup,
+)
+from database.rollups import check_rollups, rebuild_rollups
+from tests.database.conftest import sample_rows
+from tests.database.test_rollups import snapshot
+
+
+@pytest.fixture
+def two_jobs(db_engine, make_report, job_config, tmp_path, monkeypatch):
+    """jobA: EURUSD 2023-03 (6 passes) + GBPUSD 2023-04 (4); jobB: EURUSD 2023-05 (5)."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    monkeypatch.setattr(settings, "PARQUET_ROOT", tmp_path / "passes")
+    reports = {
+        "jobA": [
+            ("EURUSD", "2023.03.01-2023.03.31", 6),
+            ("GBPUSD", "2023.04.01-2023.04.30", 4),
+        ],
+        "jobB": [("EURUSD", "2023.05.01-2023.05.31", 5)],
+    }
+    for job_id, files in reports.items():
+        folder = tmp_path / job_id
+        for symbol, dates, passes in files:
+            make_report(
+                f"{symbol}/{symbol}.xml",
+                rows=sample_rows(passes),
+                title=f"IndyTSL {symbol},H1 {dates}",
+                folder=folder,
+            )
+        ingest_job_folder(folder, config_path=job_config)
+    return db_engine
+
+
+def count(session, model, *where) -> int:
+    return session.scalar(select(func.count()).select_from(model).where(*where))
+
+
+def test_delete_job_in_chunks_keeps_other_jobs_exact(two_jobs, tmp_path):
+    calls = []
+    store = tmp_path / "passes"
+    assert (store / "job_id=jobA").is_dir()
+
+    with Session(two_jobs) as session:
+        before = snapshot(session, RunRollup)
+        deleted = delete_job(
+            session,
+            "jobA",
+            chunk_size=3,
+            progress=lambda *call: calls.append(call),
+            parquet_root=store,
+        )
+
+        assert deleted["runs"] == 10 and deleted["jobs"] == 1
+        assert deleted["param_sets"] == 1  # pass 5's inputs; passes 0-4 are jobB's too
+        assert deleted[IngestedFile.__tablename__] == 2
+        # the job's 10 runs in id order, three at a time
+        assert calls == [("delete jobA", n, 10) for n in (3, 6, 9, 10)]
+
+        assert count(session, Run, Run.job_id == "jobA") == 0
+        assert session.get(Job, "jobA") is None
+        assert count(session, ParamSet) == 5
+        assert snapshot(session, RunRollup) == [r for r in before if r[0] == "jobB"]
+
+        remaining = snapshot(session, ParamSetRollup)
+        rebuild_rollups(session)
+        assert snapshot(session, ParamSetRollup) == remaining
+
+    assert not (store / "job_id=jobA").exists()
+    assert (store / "job_id=jobB").is_dir()
+
+
+def test_archive_job_flags_every_run(two_jobs):
+    with Session(two_jobs) as session:
+        assert archive_job(session, "jobA", chunk_size=4, progress=None) == 10
+        assert session.get(Job, "jobA").is_archived
+        assert count(session, Run, Run.is_archived) == 10
+
+        archive_job(session, "jobA", archived=False, progress=None)
+        session.expire_all()
+        assert not session.get(Job, "jobA").is_archived
+        assert count(session, Run, Run.is_archived) == 0
+
+        with pytest.raises(ValueError):
+            archive_job(session, "nope")
+
+
+def test_move_job_to_cold_storage(two_jobs):
+    cold_engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(cold_engine)
+
+    with Session(two_jobs) as session, Session(cold_engine) as cold:
+        hashes = set(session.scalars(select(Run.result_hash).where(Run.job_id == "jobA")))
+        params = dict(
+            session.execute(
+                select(Run.result_hash, ParamSet.params).join(Run.param_set)
+            ).all()
+        )
+        rollups = [r for r in snapshot(session, RunRollup) if r[0] == "jobA"]
+
+        moved = move_job(session, cold, "jobA", chunk_size=4, progress=None)
+        assert moved["runs"] == 10 and moved[IngestedFile.__tablename__] == 2
+
+        assert count(session, Run, Run.job_id == "jobA") == 0
+        assert session.get(Job, "jobA") is None
+        assert set(cold.scalars(select(Run.result_hash))) == hashes
+        assert all(run.params_json == params[run.result_hash] for run in cold.scalars(select(Run)))
+        assert snapshot(cold, RunRollup) == rollups
+
+        cold_rollups = snapshot(cold, ParamSetRollup)
+        rebuild_rollups(cold)
+        assert snapshot(cold, ParamSetRollup) == cold_rollups
+    cold_engine.dispose()
+
+
+def test_move_job_only_deletes_runs_cold_holds(two_jobs):
+    cold_engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(cold_engine)
+
+    with Session(two_jobs) as session, Session(cold_engine) as cold:
+        ids = session.scalars(select(Run.id).where(Run.job_id == "jobA").order_by(Run.id)).all()
+        session.execute(update(Run).where(Run.id.in_(ids[:2])).values(result_hash=None))
+        taken = session.get(Run, ids[2]).result_hash
+        session.commit()
+
+        # Another job in cold already holds one of jobA's result hashes
+        cold.add(
+            Job(
+                id="jobX",
+                job_name="jobX",
+                expert_name="IndyTSL_v2",
+                expert_path="IndyTSL_v2.ex5",
+                period="H1",
+                deposit=10000.0,
+                currency="USD",
+                leverage="100",
+                tester_inputs={},
+            )
+        )
+        cold.add(
+            Run(
+                job_id="jobX",
+                start_date=date(2023, 3, 1),
+                end_date=date(2023, 3, 31),
+                pass_number=0,
+                symbol="EURUSD",
+                run_month="2023-03",
+                is_full_month=True,
+                result_hash=taken,
+            )
+        )
+        cold.flush()
+        rebuild_rollups(cold)
+        cold.commit()
+
+        moved = move_job(session, cold, "jobA", chunk_size=4, progress=None)
+        assert (moved["runs"], moved["duplicates"], moved["kept"]) == (9, 0, 1)
+
+        # Both unhashed runs arrived; the clashing one is still here, with its job
+        assert count(cold, Run, Run.job_id == "jobA") == 9
+        assert count(cold, Run, Run.job_id == "jobA", Run.result_hash.is_(None)) == 2
+        assert session.scalars(select(Run.id).where(Run.job_id == "jobA")).all() == [ids[2]]
+        assert session.get(Job, "jobA") is not None
+
+        for db in (session, cold):
+            assert check_rollups(db) == {"run_rollups": [], "param_set_rollups": []}
+    cold_engine.dispose()
@@ -0,0 +1,43 @@
+import os
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.ingest import ingest_job
+from database.ingest.ingest_job import ingest_job_folder
+from database.models import IngestedFile
+from tests.database.conftest import sample_rows
+
+
+def test_reingest_skips_unchanged_files(db_engine, make_report, job_config, monkeypatch):
+    monkeypatch.chdir(job_config.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    folder = job_config.parent
+    a = make_report("EURUSD/a.xml", rows=sample_rows(3), folder=folder)
+    make_report("EURUSD/b.xml", rows=sample_rows(2), folder=folder)
+
+    assert ingest_job_folder(folder) == 3  # b.xml's passes duplicate a.xml's
+
+    parsed = []
+    real_ingest = ingest_job._ingest_xml_rows
+    monkeypatch.setattr(
+        ingest_job,
+        "_ingest_xml_rows",
+        lambda path, *args: parsed.append(path.name) or real_ingest(path, *args),
+    )
+
+    # Touched but identical: skipped after a digest check
+    st = os.stat(a)
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+    assert ingest_job_folder(folder) == 0
+    assert parsed == []
+
+    make_report("EURUSD/a.xml", rows=sample_rows(5), folder=folder)
+    assert ingest_job_folder(folder) == 2
+    assert parsed == ["a.xml"]
+
+    with Session(db_engine) as session:
+        entries = {e.path: e for e in session.scalars(select(IngestedFile))}
+    assert set(entries) == {"EURUSD/a.xml", "EURUSD/b.xml"}
+    assert entries["EURUSD/a.xml"].passes == 5
+    assert entries["EURUSD/b.xml"].duplicates == 2
@@ -0,0 +1,75 @@
+import json
+
+from alembic import command
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+
+from database.migrations import BASE_REVISION, alembic_config
+from database.models import Base, ParamSet, ParamSetRollup, Run, RunRollup
+from database.session import bootstrap_sqlite_schema
+
+PARAMS = [{"input_StopLoss": 10 + i, "input_UseTrail": i % 2 == 0} for i in range(3)]
+
+
+def baseline_database(path):
+    """A SQLite file laid out like the first release made it: create_all, no alembic_version."""
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), BASE_REVISION)
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(
+            text(
+                "INSERT INTO jobs (id, job_name, expert_name, expert_path, period,"
+                " deposit, currency, leverage, tester_inputs, is_archived)"
+                " VALUES ('old', 'old', 'IndyTSL', 'x.ex5', 'H1', 10000, 'USD',"
+                " '1:100', '{}', 0)"
+            )
+        )
+        for i, params in enumerate([*PARAMS, PARAMS[0]]):
+            connection.execute(
+                text(
+                    "INSERT INTO runs (job_id, start_date, end_date, pass_number,"
+                    " profit, symbol, run_month, is_full_month, params_json,"
+                    " result_hash, tags, status, is_archived) VALUES ('old',"
+                    " '2023-03-01', '2023-03-31', :i, :profit, 'EURUSD', '2023-03',"
+                    " 1, :params, :hash, '[]', 'new', 0)"
+                ),
+                {"i": i, "profit": 10.0 * i, "params": json.dumps(params), "hash": f"h{i}"},
+            )
+        # A later build's create_all added new tables but never touched `runs`
+        Base.metadata.tables["param_sets"].create(connection)
+    return engine
+
+
+def test_baseline_sqlite_file_is_migrated_to_head(tmp_path):
+    engine = baseline_database(tmp_path / "optibatch.db")
+    bootstrap_sqlite_schema(engine)
+
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    with engine.connect() as connection:
+        assert MigrationContext.configure(connection).get_current_revision() == head
+        assert "forward_start_date" in {c["name"] for c in inspect(connection).get_columns("runs")}
+
+    with Session(engine) as session:
+        runs = session.scalars(select(Run).order_by(Run.pass_number)).all()
+        assert [run.params_json for run in runs] == [*PARAMS, PARAMS[0]]
+        assert len(session.scalars(select(ParamSet)).all()) == 3
+        assert [(r.runs, r.profit_sum) for r in session.scalars(select(RunRollup))] == [(4, 60.0)]
+        assert sum(r.runs for r in session.scalars(select(ParamSetRollup))) == 4
+
+    # Already at head: a second engine init leaves the file alone
+    bootstrap_sqlite_schema(engine)
+    engine.dispose()
+
+
+def test_new_sqlite_file_is_created_at_head(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new' / 'optibatch.db'}")
+    bootstrap_sqlite_schema(engine)
+
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    with engine.connect() as connection:
+        revision = MigrationContext.configure(connection).get_current_revision()
+    assert revision == ScriptDirectory.from_config(alembic_config()).get_current_head()
+    engine.dispose()
@@ -0,0 +1,64 @@
+import pyarrow as pa
+
+import settings
+from database.ingest import ingest_job
+from database.ingest.ingest_job import ingest_job_folder, ingest_single_xml
+from database.parquet_store import read_passes
+from tests.database.conftest import sample_rows
+
+
+def test_ingest_writes_typed_partitioned_passes(
+    db_session, make_report, job_config, tmp_path, monkeypatch
+):
+    store = tmp_path / "passes"
+    monkeypatch.setattr(settings, "PARQUET_ROOT", store)
+    rows = sample_rows(6)
+    rows[2][9] = "0"  # zero-trade pass stays out of both stores
+    xml_path = make_report(rows=rows)
+
+    assert ingest_single_xml(xml_path, job_config, db_session, "job1") == 5
+    files = list(store.rglob("*.parquet"))
+    assert [f.relative_to(store).parent.as_posix() for f in files] == [
+        "job_id=job1/symbol=EURUSD/run_month=2023-03"
+    ]
+
+    table = read_passes(store, columns=["pass_number", "input_StopLoss", "input_UseTrail"])
+    assert table.schema.field("input_StopLoss").type == pa.int64()
+    assert table.schema.field("input_UseTrail").type == pa.bool_()
+    assert sorted(table.column("pass_number").to_pylist()) == [0, 1, 3, 4, 5]
+
+    filtered = read_passes(
+        store,
+        columns=["pass_number"],
+        filters=[("input_UseTrail", "==", True)],
+        job_id="job1",
+        months=["2023-03"],
+    )
+    assert sorted(filtered.column("pass_number").to_pylist()) == [1, 3, 5]
+    assert read_passes(store, symbols=["GBPUSD"]).num_rows == 0
+
+
+def test_folder_ingest_fills_one_partition_per_symbol(
+    db_engine, make_report, job_config, monkeypatch
+):
+    folder = job_config.parent
+    store = folder / "passes"
+    monkeypatch.chdir(folder)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    monkeypatch.setattr(settings, "PARQUET_ROOT", store)
+    make_report("EURUSD/a.xml", rows=sample_rows(4), folder=folder)
+    make_report(
+        "GBPUSD/b.xml",
+        rows=sample_rows(3),
+        title="IndyTSL GBPUSD,H1 2023.04.01-2023.04.30",
+        folder=folder,
+    )
+
+    assert ingest_job_folder(folder) == 7
+    table = read_passes(store, columns=["symbol", "run_month", "profit"])
+    assert table.num_rows == 7
+    assert set(zip(table.column("symbol").to_pylist(), table.column("run_month").to_pylist())) == {
+        ("EURUSD", "2023-03"),
+        ("GBPUSD", "2023-04"),
+    }
+    assert not list(store.rglob("*.tmp"))
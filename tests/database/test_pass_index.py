@@ -0,0 +1,65 @@
+import io
+import os
+
+import pytest
+
+from database.ingest.ingest_job import XmlPassStream, ingest_single_xml
+from database.ingest.pass_index import (
+    PassIndex,
+    RowOffsetTap,
+    StalePassIndex,
+    build_pass_index,
+    pass_index_path,
+    read_pass_row,
+)
+from tests.database.conftest import sample_rows
+
+
+def test_ingest_writes_index_for_random_access(db_session, make_report, job_config):
+    xml_path = make_report(rows=sample_rows(6))
+    ingest_single_xml(xml_path, job_config, db_session, "job1")
+    assert pass_index_path(xml_path).is_file()
+
+    with XmlPassStream(xml_path) as stream:
+        expected = list(stream)
+    with PassIndex(xml_path) as index:
+        assert len(index) == 6
+        assert index.read_pass(4) == expected[4]
+        assert index.read_passes(2, 99) == expected[2:]
+        assert index.row_bytes(0).startswith(b"<Row>")
+        assert index.row_bytes(0).endswith(b"</Row>")
+        with pytest.raises(IndexError):
+            index.read_pass(6)
+
+
+def test_row_offsets_survive_any_read_size(make_report):
+    xml_path = make_report(rows=sample_rows(5))
+    data = xml_path.read_bytes().replace(b"<Row>", b'<Row ss:Height="12">', 2)
+
+    def offsets(chunk: int) -> list[tuple[int, int]]:
+        tap = RowOffsetTap(io.BytesIO(data))
+        while tap.read(chunk):
+            pass
+        assert tap.complete
+        return list(zip(tap.offsets, tap.lengths))
+
+    whole = offsets(len(data))
+    assert len(whole) == 6  # header + 5 passes
+    assert all(data[o : o + n].startswith(b"<Row") for o, n in whole)
+    for chunk in (1, 3, 7, 64):
+        assert offsets(chunk) == whole
+
+
+def test_stale_index_is_rebuilt_on_read(make_report):
+    xml_path = make_report(rows=sample_rows(3))
+    build_pass_index(xml_path)
+
+    make_report(rows=sample_rows(4))  # same path, new content
+    os.utime(xml_path, ns=(0, 1))
+    with pytest.raises(StalePassIndex):
+        PassIndex(xml_path)
+
+    record = read_pass_row(xml_path, 3)
+    assert record.get("input_StopLoss") == "13"
+    with PassIndex(xml_path) as index:
+        assert len(index) == 4
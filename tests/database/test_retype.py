@@ -0,0 +1,93 @@
+import json
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import database.session as session_module
+from database.ingest.hashing import canonical_inputs, param_set_hash
+from database.models import Job, ParamSet, ParamSetRollup, Run
+from database.rollups import rebuild_rollups
+from database.session import init_engine
+from retype_params_json import retype_params, update_db_types
+from tests.database.test_rollups import snapshot
+
+UNTYPED = {"input_StopLoss": "10", "input_TakeProfit": "2.5", "input_UseTrail": "true"}
+TYPES = {"input_StopLoss": 10, "input_TakeProfit": 2.5, "input_UseTrail": False}
+
+
+def test_retype_params_casts_to_the_default_types():
+    assert retype_params({**UNTYPED, "other": "x"}, TYPES) == {
+        "input_StopLoss": 10,
+        "input_TakeProfit": 2.5,
+        "input_UseTrail": True,
+        "other": "x",
+    }
+    assert retype_params({"input_StopLoss": "ten"}, TYPES) == {"input_StopLoss": "ten"}
+
+
+def test_retyping_one_job_leaves_shared_param_sets_alone(tmp_path, monkeypatch):
+    db_path = tmp_path / "optibatch.db"
+    monkeypatch.setattr(session_module, "_engine", None)
+    engine = init_engine(f"sqlite:///{db_path}")
+
+    with Session(engine) as session:
+        shared = ParamSet(params_hash=param_set_hash(canonical_inputs(UNTYPED)), params=UNTYPED)
+        session.add(shared)
+        for job_id in ("jobA", "jobB"):
+            session.add(
+                Job(
+                    id=job_id,
+                    job_name=job_id,
+                    expert_name="IndyTSL_v2",
+                    expert_path="IndyTSL_v2.ex5",
+                    period="H1",
+                    deposit=10000.0,
+                    currency="USD",
+                    leverage="100",
+                    tester_inputs={},
+                )
+            )
+        session.flush()
+        for i, job_id in enumerate(["jobA", "jobA", "jobB"]):
+            session.add(
+                Run(
+                    job_id=job_id,
+                    start_date=date(2023, 3, 1),
+                    end_date=date(2023, 3, 31),
+                    pass_number=i,
+                    profit=float(i),
+                    symbol="EURUSD",
+                    run_month="2023-03",
+                    is_full_month=True,
+                    param_set_id=shared.id,
+                    result_hash=f"h{i}",
+                )
+            )
+        session.flush()
+        rebuild_rollups(session)
+        session.commit()
+        shared_id = shared.id
+
+    folder = tmp_path / "generated" / "jobA"
+    folder.mkdir(parents=True)
+    config = {"tester": {"Deposit": 10000}, "inputs": {k: {"default": v} for k, v in TYPES.items()}}
+    (folder / "job_config.json").write_text(json.dumps(config), encoding="utf-8")
+
+    update_db_types(str(db_path), str(tmp_path / "generated"))
+
+    engine = session_module.get_engine()
+    with Session(engine) as session:
+        assert session.get(ParamSet, shared_id).params == UNTYPED
+        assert session.get(Job, "jobA").tester_inputs == {"Deposit": 10000}
+
+        by_job = dict(session.execute(select(Run.job_id, Run.param_set_id)).all())
+        assert by_job["jobB"] == shared_id
+        retyped = session.get(ParamSet, by_job["jobA"])
+        assert retyped.params == {"input_StopLoss": 10, "input_TakeProfit": 2.5, "input_UseTrail": True}
+        assert retyped.params_hash == param_set_hash(canonical_inputs(retyped.params))
+
+        rollups = snapshot(session, ParamSetRollup)
+        rebuild_rollups(session)
+        assert snapshot(session, ParamSetRollup) == rollups
+    engine.dispose()
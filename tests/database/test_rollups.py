@@ -0,0 +1,117 @@
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database.ingest import ingest_job
+from database.ingest.ingest_job import ingest_job_folder
+from database.ingest.writer import RunWriter
+from database.models import ParamSetRollup, Run, RunRollup
+from database.rollups import check_rollups, rebuild_rollups
+from streamlit_view import load_data
+from tests.database.conftest import sample_rows
+
+
+def snapshot(session, model) -> list[tuple]:
+    table = model.__table__
+    rows = session.execute(select(table).order_by(*table.primary_key.columns)).all()
+    return [tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows]
+
+
+def test_ingest_keeps_rollups_equal_to_a_rebuild(db_engine, make_report, job_config, monkeypatch):
+    monkeypatch.chdir(job_config.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    folder = job_config.parent
+    make_report("EURUSD/a.xml", rows=sample_rows(4), folder=folder)
+    make_report(
+        "GBPUSD/b.xml",
+        rows=sample_rows(3),
+        title="IndyTSL GBPUSD,H1 2023.04.01-2023.04.30",
+        folder=folder,
+    )
+    assert ingest_job_folder(folder) == 7
+    assert ingest_job_folder(folder, force=True) == 0  # duplicates add nothing
+
+    with Session(db_engine) as session:
+        incremental = {m: snapshot(session, m) for m in (RunRollup, ParamSetRollup)}
+        rollup = session.get(RunRollup, (folder.name, "EURUSD", "2023-03"))
+        profits = session.scalars(select(Run.profit).where(Run.symbol == "EURUSD")).all()
+        assert rollup.runs == rollup.profit_n == 4
+        assert rollup.profit_sum == sum(profits)
+        assert (rollup.profit_min, rollup.profit_max) == (min(profits), max(profits))
+        assert rollup.profit_sumsq == sum(p * p for p in profits)
+
+        # Pass N has the same inputs in both reports: one param-set rollup per symbol
+        assert session.scalar(select(func.count()).select_from(ParamSetRollup)) == 7
+
+        written = rebuild_rollups(session)
+        assert written == {"run_rollups": 2, "param_set_rollups": 7}
+        assert {m: snapshot(session, m) for m in incremental} == incremental
+
+
+def test_dashboard_loads_only_the_picked_runs(db_engine, make_report, job_config, monkeypatch):
+    monkeypatch.chdir(job_config.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    monkeypatch.setattr(load_data, "get_engine", lambda: db_engine)
+    folder = job_config.parent
+    make_report("EURUSD/a.xml", rows=sample_rows(4), folder=folder)
+    make_report(
+        "GBPUSD/b.xml",
+        rows=sample_rows(3),
+        title="IndyTSL GBPUSD,H1 2023.04.01-2023.04.30",
+        folder=folder,
+    )
+    assert ingest_job_folder(folder) == 7
+
+    rollups = load_data.load_rollups()
+    assert rollups["Runs"].sum() == 7
+    low, high = rollups["Profit Min"].min(), rollups["Profit Max"].max()
+
+    runs = load_data.load_runs(["EURUSD"], ["2023-03"])
+    assert list(runs.columns) == list(load_data.RUN_COLUMNS)
+    assert len(runs) == 4 and set(runs["Job ID"]) == {folder.name}
+    assert runs["Profit"].sum() == rollups.loc[rollups["Symbol"] == "EURUSD", "Profit Sum"].sum()
+
+    narrowed = load_data.load_runs(["EURUSD", "GBPUSD"], ["2023-03", "2023-04"], (low, low))
+    assert list(narrowed["Profit"]) == [low] * len(narrowed) and 0 < len(narrowed) < 7
+
+
+def test_batches_merge_into_existing_rollups(db_session):
+    rows = [
+        {
+            "job_id": "job1",
+            "symbol": "EURUSD",
+            "start_date": date(2023, 3, 1),
+            "end_date": date(2023, 3, 31),
+            "run_month": "2023-03",
+            "is_full_month": True,
+            "pass_number": i,
+            "profit": profit,
+            "trades": trades,
+            "params_json": {"input_A": i % 2},
+            "result_hash": f"h{i}",
+        }
+        for i, (profit, trades) in enumerate([(5.0, 3), (-2.0, 7), (None, 1), (9.5, 2)])
+    ]
+
+    writer = RunWriter(db_session, batch_size=1)  # every row is its own upsert
+    writer.extend(rows)
+    writer.flush()
+
+    rollup = db_session.get(RunRollup, ("job1", "EURUSD", "2023-03"))
+    assert (rollup.runs, rollup.profit_n) == (4, 3)
+    assert (rollup.profit_min, rollup.profit_max, rollup.profit_sum) == (-2.0, 9.5, 12.5)
+    assert (rollup.trades_min, rollup.trades_max, rollup.trades_sumsq) == (1, 7, 63)
+    assert rollup.custom_score_n == 0 and rollup.custom_score_min is None
+
+    incremental = snapshot(db_session, ParamSetRollup)
+    rebuild_rollups(db_session, job_id="job1")
+    assert snapshot(db_session, ParamSetRollup) == incremental
+
+    assert check_rollups(db_session) == {"run_rollups": [], "param_set_rollups": []}
+    rollup.profit_sum += 1
+    db_session.delete(db_session.scalars(select(ParamSetRollup)).first())
+    db_session.flush()
+    stale = check_rollups(db_session, job_id="job1")
+    assert stale["run_rollups"] == [("job1", "EURUSD", "2023-03")]
+    assert len(stale["param_set_rollups"]) == 1
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import create_engine
+
+import settings
+from database.sqlite_profile import (
+    SqliteProfile,
+    apply_sqlite_profile,
+    read_sqlite_pragmas,
+    sqlite_profile_from_settings,
+)
+
+
+def test_profile_is_set_on_every_connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_profile(engine, SqliteProfile(cache_size_mb=32, busy_timeout_ms=1500))
+    try:
+        with engine.connect():  # a second connection gets the profile too
+            pragmas = read_sqlite_pragmas(engine)
+    finally:
+        engine.dispose()
+
+    assert pragmas == {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "cache_size": -32 * 1024,
+        "mmap_size": 256 * 2**20,
+        "temp_store": 2,  # MEMORY
+        "busy_timeout": 1500,
+    }
+
+
+def test_profile_follows_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SQLITE_SYNCHRONOUS", "full")
+    assert sqlite_profile_from_settings().synchronous == "FULL"
+
+    monkeypatch.setattr(settings, "SQLITE_PROFILE", False)
+    assert sqlite_profile_from_settings() is None
+
+    with pytest.raises(ValueError, match="journal_mode"):
+        SqliteProfile(journal_mode="wal; DROP TABLE runs")
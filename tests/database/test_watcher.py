@@ -0,0 +1,46 @@
+import shutil
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database.ingest import ingest_job
+from database.ingest.watcher import IngestWatcher
+from database.models import Run
+from tests.database.conftest import sample_rows
+
+
+def test_watcher_debounces_and_ingests_once(tmp_path, db_engine, make_report, job_config, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    job_folder = tmp_path / "generated" / "20250101_000000_IndyTSL"
+    job_folder.mkdir(parents=True)
+    shutil.copy(job_config, job_folder / "job_config.json")
+    make_report("EURUSD/a.xml", rows=sample_rows(4), folder=job_folder)
+
+    watcher = IngestWatcher(tmp_path / "generated", settle_seconds=2.0)
+    assert watcher.scan_once(now=100.0) == 0  # first sighting only
+    assert watcher.scan_once(now=101.0) == 0  # not settled yet
+    assert watcher.scan_once(now=102.5) == 1
+
+    assert watcher.process_one(watcher._queue.get_nowait())
+    assert watcher.scan_once(now=200.0) == 0  # done, unchanged
+
+    # A fresh watcher (restart) re-queues the file, but the manifest skips it
+    restarted = IngestWatcher(tmp_path / "generated", settle_seconds=0.0)
+    restarted.scan_once(now=0.0)
+    assert restarted.scan_once(now=1.0) == 1
+    assert restarted.process_one(restarted._queue.get_nowait())
+
+    with Session(db_engine) as session:
+        assert session.scalar(select(func.count(Run.id))) == 4
+
+
+def test_watcher_applies_back_pressure(tmp_path, make_report):
+    root = tmp_path / "generated"
+    for i in range(3):
+        make_report(f"job{i}/EURUSD/a.xml", folder=root)
+
+    watcher = IngestWatcher(root, settle_seconds=0.0, max_pending=2)
+    watcher.scan_once(now=0.0)
+    assert watcher.scan_once(now=1.0) == 2
+    assert watcher.scan_once(now=2.0) == 0  # queue full; third file waits on disk
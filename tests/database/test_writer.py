@@ -0,0 +1,135 @@
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database.ingest import ingest_job
+from database.ingest.ingest_job import ingest_job_folder, ingest_single_xml
+from database.ingest.writer import RunWriter, find_existing_hashes
+from database.models import ParamSet, Run
+from tests.database.conftest import sample_rows
+
+
+def _row(result_hash: str, pass_number: int = 0) -> dict:
+    return {
+        "job_id": "job1",
+        "symbol": "EURUSD",
+        "start_date": date(2023, 3, 1),
+        "end_date": date(2023, 3, 31),
+        "run_month": "2023-03",
+        "is_full_month": True,
+        "pass_number": pass_number,
+        "profit": 1.0,
+        "params_json": {},
+        "result_hash": result_hash,
+    }
+
+
+def test_writer_skips_db_and_in_batch_duplicates(db_session):
+    writer = RunWriter(db_session, batch_size=3)
+    writer.extend([_row("a"), _row("b"), _row("a"), _row("c")])
+    writer.flush()
+    assert (writer.stats.inserted, writer.stats.duplicates) == (3, 1)
+
+    again = RunWriter(db_session)
+    again.extend([_row("b"), _row("d")])
+    again.flush()
+    assert (again.stats.inserted, again.stats.duplicates) == (1, 1)
+    assert find_existing_hashes(db_session, ["a", "x", "d"]) == {"a", "d"}
+
+
+def test_ingest_single_xml_dedups_on_reingest(db_session, make_report, job_config):
+    rows = sample_rows(6)
+    rows[2][9] = "0"  # zero-trade pass is skipped
+    xml_path = make_report(rows=rows)
+
+    assert ingest_single_xml(xml_path, job_config, db_session, "job1") == 5
+    assert ingest_single_xml(xml_path, job_config, db_session, "job1") == 0
+    assert db_session.scalar(select(func.count(Run.id))) == 5
+
+    run = db_session.scalars(select(Run).where(Run.pass_number == 1)).one()
+    assert run.params_json == {
+        "input_StopLoss": 11,
+        "input_TakeProfit": 3.5,
+        "input_UseTrail": True,
+    }
+    assert run.custom_score == run.profit - 2 * run.drawdown
+
+
+def test_ingest_job_folder_creates_job_once(db_engine, make_report, job_config, monkeypatch):
+    monkeypatch.chdir(job_config.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    folder = job_config.parent
+    make_report("EURUSD/a.xml", rows=sample_rows(4), folder=folder)
+    make_report(
+        "GBPUSD/b.xml",
+        rows=sample_rows(3),
+        title="IndyTSL GBPUSD,H1 2023.04.01-2023.04.30",
+        folder=folder,
+    )
+
+    assert ingest_job_folder(folder) == 7
+    assert ingest_job_folder(folder) == 0
+
+    with Session(db_engine) as session:
+        assert session.scalar(select(func.count(Run.id))) == 7
+        assert set(session.scalars(select(Run.job_id).distinct())) == {folder.name}
+
+
+def test_runs_share_param_sets_across_symbols(db_engine, make_report, job_config, monkeypatch):
+    monkeypatch.chdir(job_config.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    folder = job_config.parent
+    make_report("EURUSD/a.xml", rows=sample_rows(4), folder=folder)
+    make_report(
+        "GBPUSD/b.xml",
+        rows=sample_rows(3),
+        title="IndyTSL GBPUSD,H1 2023.04.01-2023.04.30",
+        folder=folder,
+    )
+
+    assert ingest_job_folder(folder) == 7
+
+    with Session(db_engine) as session:
+        # sample_rows() gives pass N the same inputs in both reports
+        assert session.scalar(select(func.count(ParamSet.id))) == 4
+        runs = session.scalars(select(Run).where(Run.pass_number == 1)).all()
+        assert {run.symbol for run in runs} == {"EURUSD", "GBPUSD"}
+        assert len({run.param_set_id for run in runs}) == 1
+        assert runs[0].params_json == runs[1].params_json == {
+            "input_StopLoss": 11,
+            "input_TakeProfit": 3.5,
+            "input_UseTrail": True,
+        }
+
+
+def test_orm_fallback_matches_core_path(db_session):
+    writer = RunWriter(db_session, batch_size=2, method="orm")
+    writer.extend([_row("a"), _row("b"), _row("c"), _row("a")])
+    writer.flush()
+    assert (writer.stats.inserted, writer.stats.duplicates) == (3, 1)
+    assert db_session.scalar(select(func.count(Run.id))) == 3
+
+
+def test_copy_method_falls_back_off_postgres(db_session):
+    assert RunWriter(db_session, method="copy").method == "core"
+    assert RunWriter(db_session).method == "core"
+
+
+def test_parallel_folder_ingest_matches_serial(db_engine, make_report, job_config, monkeypatch):
+    monkeypatch.chdir(job_config.parent)
+    monkeypatch.setattr(ingest_job, "get_engine", lambda: db_engine)
+    folder = job_config.parent
+    for i, symbol in enumerate(["AUDUSD", "EURUSD", "GBPUSD"]):
+        make_report(
+            f"{symbol}/{symbol}.xml",
+            rows=sample_rows(4 + i),
+            title=f"IndyTSL {symbol},H1 2023.03.01-2023.03.31",
+            folder=folder,
+        )
+
+    assert ingest_job_folder(folder, workers=2) == 15
+
+    with Session(db_engine) as session:
+        symbols = session.scalars(select(Run.symbol).order_by(Run.id)).all()
+    assert symbols == ["AUDUSD"] * 4 + ["EURUSD"] * 5 + ["GBPUSD"] * 6
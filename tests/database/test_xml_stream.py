@@ -0,0 +1,65 @@
+from datetime import date
+
+from database.ingest.ingest_job import (
+    XmlPassStream,
+    extract_runs_from_xml,
+    extract_symbol_and_dates_from_xml,
+    header_signature,
+    iter_runs_from_xml,
+    xml_has_traded_pass,
+)
+from tests.database.conftest import HEADERS, sample_rows
+
+
+def test_stream_reads_title_and_passes_in_one_pass(make_report):
+    xml_path = make_report(rows=sample_rows(3))
+
+    with XmlPassStream(xml_path) as stream:
+        assert stream.read_title() == "IndyTSL EURUSD,H1 2023.03.01-2023.03.31"
+        records = list(stream)
+
+    assert [r.pass_number for r in records] == [0, 1, 2]
+    assert records[1].get("Profit") == "101.25"
+    assert records[2].get("input_UseTrail") == "false"
+    assert stream.headers is not None and stream.headers[0] == "Pass"
+    assert records[0].cells[0] == "0"
+    assert records[0].header is records[2].header
+
+
+def test_iter_runs_is_lazy(make_report):
+    xml_path = make_report(rows=sample_rows(50))
+    passes = iter_runs_from_xml(xml_path)
+
+    first = next(passes)
+    assert first.pass_number == 0
+    assert sum(1 for _ in passes) == 49
+
+
+def test_extract_symbol_and_dates(make_report):
+    xml_path = make_report()
+    symbol, start, end, run_month = extract_symbol_and_dates_from_xml(xml_path)
+    assert symbol == "EURUSD"
+    assert (start, end) == (date(2023, 3, 1), date(2023, 3, 31))
+    assert run_month == "2023-03"
+
+
+def test_extract_runs_returns_positional_records(make_report):
+    rows = extract_runs_from_xml(make_report(rows=sample_rows(2)))
+    assert rows[1].pass_number == 1
+    assert rows[1].get("Trades") == "12"
+    assert rows[1].as_dict()["input_StopLoss"] == "11"
+
+
+def test_reports_with_the_same_headers_share_a_signature(make_report, tmp_path):
+    a = extract_runs_from_xml(make_report("a.xml", rows=sample_rows(1)))
+    b = extract_runs_from_xml(make_report("b.xml", rows=sample_rows(1)))
+    assert a[0].header is b[0].header
+    assert a[0].header is header_signature(tuple(HEADERS))
+    assert a[0].header.positions["Trades"] == 9
+
+
+def test_traded_pass_check_reads_pass_records(make_report, tmp_path):
+    traded, idle = sample_rows(2, trades=0)
+    traded[9] = "4"
+    assert xml_has_traded_pass(make_report("mixed.xml", rows=[idle, traded]))
+    assert not xml_has_traded_pass(make_report("idle.xml", rows=[idle]))
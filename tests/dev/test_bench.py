@@ -0,0 +1,66 @@
+import settings
+from database.ingest.ingest_job import XmlPassStream, extract_symbol_and_dates_from_xml
+from database.ingest.plan import build_ingest_plan
+from dev.bench.ingest_bench import PHASES, profile_phases
+from dev.bench.mt5_xml import METRIC_HEADERS, write_job_folder, write_report
+from dev.bench.query_bench import QUERIES
+from dev.bench.query_bench import main as query_bench
+from dev.bench.sqlite_bench import main as sqlite_bench
+
+
+def test_generated_report_reads_like_an_mt5_export(tmp_path):
+    xml_path = tmp_path / "EURUSD.xml"
+    write_report(xml_path, 50, seed=3)
+
+    with XmlPassStream(xml_path) as stream:
+        title = stream.read_title()
+        records = list(stream)
+    assert title == "IndyTSL EURUSD,H1 2023.03.01-2023.03.31"
+    assert list(stream.headers[: len(METRIC_HEADERS)]) == METRIC_HEADERS
+    assert [r.pass_number for r in records] == list(range(50))
+    assert all(r.get("Equity DD %").endswith("%") for r in records)
+
+    again = tmp_path / "again.xml"
+    write_report(again, 50, seed=3)
+    assert again.read_bytes() == xml_path.read_bytes()
+
+
+def test_job_folder_spreads_passes_and_profiles(tmp_path):
+    folder = tmp_path / "bench_job"
+    paths = write_job_folder(folder, 101, symbols=("EURUSD", "GBPUSD"), months=2)
+
+    assert len(paths) == 4
+    assert {extract_symbol_and_dates_from_xml(p)[3] for p in paths} == {"2023-01", "2023-02"}
+
+    plan = build_ingest_plan(folder / "job_config.json")
+    assert plan.input_types["input_StopLoss"] is int
+    assert plan.input_types["input_UseTrail"] is bool
+
+    phases = profile_phases(paths, plan)
+    assert set(phases) == set(PHASES) - {"dedup", "write"}
+    assert all(seconds >= 0 for seconds in phases.values())
+
+
+def test_query_bench_uses_the_run_indexes(tmp_path):
+    report = query_bench(["--rows", "2000", "--repeat", "1", "--db-file", str(tmp_path / "q.db")])
+
+    assert report["rows"] == 2000
+    assert set(report["queries"]) == set(QUERIES)
+    for name, result in report["queries"].items():
+        assert not any("INDEX ix_runs" in step for step in result["without_indexes"]["plan"])
+        assert any("INDEX ix_runs" in step for step in result["with_indexes"]["plan"]), name
+
+
+def test_sqlite_bench_compares_default_and_tuned(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PARQUET_ROOT", None)
+    report = sqlite_bench(
+        ["--passes", "300", "--batch-size", "100", "--repeat", "2", "--workdir", str(tmp_path)]
+    )
+
+    results = {r["profile"]: r for r in report["results"]}
+    assert set(results) == {"default", "tuned"}
+    assert results["default"]["pragmas"]["journal_mode"] == "delete"
+    assert results["tuned"]["pragmas"]["journal_mode"] == "wal"
+    assert results["default"]["inserted"] == results["tuned"]["inserted"] > 0
+    for result in results.values():
+        assert result["read_during_ingest"]["locked_errors"] == 0
@@ -5,6 +5,8 @@ from core.state import registry
 # Define your toggle options here
 TOGGLE_OPTIONS = [
     ("Use Month-to-Month Windows", "use_discrete_months"),
+    ("Defer Ingest to Watcher", "deferred_ingest"),
+    ("Ingest EA Frame Files Live", "ingest_frames"),
 
 ]
 